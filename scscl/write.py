@@ -9,6 +9,7 @@
 
 import sys
 import os
+import time
 
 sys.path.append("..")
 from scservo_sdk import *                      # Uses FTServo SDK library
@@ -1,5 +1,7 @@
 #!/usr/bin/env python
 
+import sys
+
 from .port_handler import *
 from .protocol_packet_handler import *
 from .group_sync_write import *
@@ -7,3 +9,90 @@ from .group_sync_read import *
 from .sms_sts import *
 from .scscl import *
 from .hls import *
+
+# 扩展模块在首次访问其中的名称时才导入（按此顺序查找）
+_LAZY_MODULES = (
+    'telemetry',
+    'instrumentation',
+    'packet_capture',
+    'retry_policy',
+    'bus_discovery',
+    'memory_mirror',
+    'write_dedup',
+    'read_coalescer',
+    'sim_port_handler',
+    'command_aggregator',
+    'clock',
+    'compiled_cycle',
+    'fleet_state',
+    'fleet_config',
+    'latency_profiler',
+    'baud_upgrade',
+    'register_map',
+    'read_planner',
+    'write_planner',
+)
+
+_loaded = set()  # 已导入的扩展模块
+
+
+def _loadModule(module_name):
+    """
+    导入扩展模块
+    输入参数: module_name - 子模块名称
+    输出: 无
+    功能: 与from .module import *相同，把模块的公开名称加入包的命名空间
+    """
+    if module_name in _loaded:
+        return
+    __import__(__name__ + '.' + module_name)
+    module = sys.modules[__name__ + '.' + module_name]
+    namespace = globals()
+    for name, value in vars(module).items():
+        if not name.startswith('_'):
+            namespace[name] = value
+    _loaded.add(module_name)
+
+
+def _loadAll():
+    """
+    导入所有扩展模块
+    输入参数: 无
+    输出: 列表，包的所有公开名称
+    """
+    for module_name in _LAZY_MODULES:
+        _loadModule(module_name)
+    return sorted(name for name in globals() if not name.startswith('_'))
+
+
+def __getattr__(name):
+    """
+    按需导入扩展模块（Python 3.7及以上）
+    输入参数: name - 访问的名称
+    输出: 名称对应的对象
+    功能: 依次导入扩展模块直到找到该名称；from scservo_sdk import *会访问__all__，
+          此时导入所有扩展模块，导出的名称与直接导入所有模块时相同
+    """
+    if name == '__all__':
+        global __all__
+        __all__ = _loadAll()
+        return __all__
+    if name.startswith('__'):
+        raise AttributeError("module %r has no attribute %r" % (__name__, name))
+
+    namespace = globals()
+    for module_name in _LAZY_MODULES:
+        _loadModule(module_name)
+        if name in namespace:
+            return namespace[name]
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
+
+
+def __dir__():
+    _loadAll()
+    return sorted(globals())
+
+
+if sys.version_info < (3, 7):
+    # 不支持模块__getattr__，直接导入所有扩展模块
+    _loadAll()
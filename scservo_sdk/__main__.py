@@ -0,0 +1,402 @@
+#!/usr/bin/env python
+
+import sys
+import json
+import time
+import argparse
+
+from .scservo_def import *
+from .port_handler import *
+from .sms_sts import *
+from .scscl import *
+from .hls import *
+from .group_sync_read import *
+from .sim_port_handler import *
+from .bus_discovery import *
+from .instrumentation import *
+from .fleet_state import *
+from .latency_profiler import *
+from .baud_upgrade import *
+from . import bench
+
+# 协议名称 -> 协议类
+PROTOCOLS = {
+    'sms_sts': sms_sts,
+    'scscl': scscl,
+    'hls': hls,
+}
+
+# 内存表转储的长度（地址0到当前电流高字节）
+DUMP_LENGTH = SMS_STS_PRESENT_CURRENT_H + 1
+
+# 同步读取每组的舵机数（指令包长度8 + 舵机数不能超过TXPACKET_MAX_LEN）
+DUMP_BLOCK_SIZE = 32
+
+# 监视表格的列：(标题, FleetState字段)
+MONITOR_COLUMNS = (
+    ('pos', 'position'),
+    ('speed', 'speed'),
+    ('load', 'load'),
+    ('volt', 'voltage'),
+    ('temp', 'temperature'),
+    ('cur', 'current'),
+    ('err', 'error'),
+)
+
+
+def parseIds(text):
+    """
+    解析舵机ID列表
+    输入参数: text - 逗号分隔的ID或范围，如"1-6,9"
+    输出: 舵机ID列表（升序，去重）
+    """
+    scs_ids = set()
+    for part in text.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        if '-' in part:
+            first, last = part.split('-', 1)
+            scs_ids.update(range(int(first), int(last) + 1))
+        else:
+            scs_ids.add(int(part))
+    for scs_id in scs_ids:
+        if not 0 <= scs_id <= MAX_ID:
+            raise argparse.ArgumentTypeError('servo id out of range: %d' % scs_id)
+    return sorted(scs_ids)
+
+
+def openBus(args):
+    """
+    打开总线
+    输入参数: args - 命令行参数（port、sim、baudrate、protocol）
+    输出: (端口对象, 协议对象) 元组
+    功能: 指定--sim时使用仿真总线，否则打开串口并设置波特率；失败时退出
+    """
+    if args.sim is not None:
+        portHandler = SimPortHandler(args.sim)
+    else:
+        portHandler = PortHandler(args.port)
+        if not portHandler.openPort():
+            sys.exit('Failed to open the port %s' % args.port)
+    if not portHandler.setBaudRate(args.baudrate):
+        sys.exit('Failed to change the baudrate to %d' % args.baudrate)
+    return portHandler, PROTOCOLS[args.protocol](portHandler)
+
+
+def syncReadBlocks(packetHandler, scs_ids, start_address, data_length, block_size=DUMP_BLOCK_SIZE):
+    """
+    分组同步读取
+    输入参数:
+        packetHandler - 协议对象
+        scs_ids - 舵机ID列表
+        start_address - 起始地址
+        data_length - 每个舵机读取的字节数
+        block_size - 每组的舵机数
+    输出: 字典，舵机ID -> 数据字节列表（只包含有效应答）
+    """
+    data = {}
+    for index in range(0, len(scs_ids), block_size):
+        block = scs_ids[index:index + block_size]
+        groupSyncRead = GroupSyncRead(packetHandler, start_address, data_length)
+        for scs_id in block:
+            groupSyncRead.addParam(scs_id)
+        groupSyncRead.txRxPacket()
+        for scs_id in block:
+            if groupSyncRead.isAvailable(scs_id, start_address, data_length)[0]:
+                data[scs_id] = groupSyncRead.getBytes(scs_id, start_address, data_length)
+    return data
+
+
+def commandScan(args):
+    """
+    scan子命令：发现总线上的舵机
+    输入参数: args - 命令行参数
+    输出: 整数，退出码；没有发现舵机时为1
+    功能: 用同步读取分组探测候选ID并读取型号，可依次扫描多个波特率
+    """
+    portHandler, packetHandler = openBus(args)
+    try:
+        scanner = BusScanner(portHandler, packetHandler.scs_end, args.turnaround)
+        found, conflicts = scanner.scan(args.ids, args.scan_baudrates or [args.baudrate], args.block)
+    finally:
+        portHandler.closePort()
+
+    for scs_id in sorted(found):
+        baudrate, model = found[scs_id]
+        print('[ID:%03d] baudrate %d model %d' % (scs_id, baudrate, model))
+    for scs_id, baudrate, model in conflicts:
+        print('[ID:%03d] also answered at baudrate %d model %d' % (scs_id, baudrate, model))
+    print('%d servo(s) found' % len(found))
+    return 0 if found else 1
+
+
+def commandMonitor(args):
+    """
+    monitor子命令：实时监视舵机状态
+    输入参数: args - 命令行参数
+    输出: 整数，退出码
+    功能: 以目标频率同步读取全部状态字段并解码到FleetState，按刷新间隔打印状态表，
+          包括每个舵机的同步读取失败率和实际轮询频率；Ctrl+C结束
+    """
+    portHandler, packetHandler = openBus(args)
+    metrics = MetricsRegistry()
+    packetHandler.setMetrics(metrics)
+    fleet = FleetState()
+    groupSyncRead = GroupSyncRead(packetHandler, FLEET_START_ADDRESS, FLEET_DATA_LENGTH)
+    for scs_id in args.ids:
+        groupSyncRead.addParam(scs_id)
+        fleet.add(scs_id)
+
+    period = 1.0 / args.rate
+    cycles = 0
+    start = next_poll = next_print = time.perf_counter()
+    try:
+        while args.cycles == 0 or cycles < args.cycles:
+            groupSyncRead.txRxPacket()
+            fleet.update(groupSyncRead)
+            cycles += 1
+
+            now = time.perf_counter()
+            if now >= next_print:
+                next_print = now + args.refresh
+                printMonitor(fleet, metrics, args.ids, cycles / max(now - start, 1e-9))
+
+            next_poll += period
+            if next_poll > now:
+                time.sleep(next_poll - now)
+            else:
+                next_poll = now  # 跟不上目标频率时不累积欠下的周期
+    except KeyboardInterrupt:
+        pass
+    finally:
+        portHandler.closePort()
+    printMonitor(fleet, metrics, args.ids, cycles / max(time.perf_counter() - start, 1e-9))
+    return 0
+
+
+def printMonitor(fleet, metrics, scs_ids, rate):
+    """
+    打印监视状态表
+    输入参数:
+        fleet - FleetState对象
+        metrics - MetricsRegistry对象
+        scs_ids - 舵机ID列表
+        rate - 实际轮询频率（Hz）
+    输出: 无
+    """
+    lines = ['%5s' % 'id' + ''.join('%8s' % title for title, _ in MONITOR_COLUMNS) + '%8s' % 'fail%']
+    for scs_id in scs_ids:
+        servo = fleet.get(scs_id)
+        stats = metrics.getStats(scs_id, INST_SYNC_READ)
+        failures = stats.timeouts + stats.deadline_misses + stats.checksum_failures + stats.other_failures
+        fail_rate = 100.0 * failures / stats.responses if stats.responses else 0.0
+        if servo.timestamp:
+            values = ''.join('%8d' % getattr(servo, field) for _, field in MONITOR_COLUMNS)
+        else:
+            values = ''.join('%8s' % '-' for _ in MONITOR_COLUMNS)
+        lines.append('%5d' % scs_id + values + '%8.1f' % fail_rate)
+    lines.append('%.1f Hz' % rate)
+    print('\n'.join(lines) + '\n')
+
+
+def commandProfile(args):
+    """
+    profile子命令：测量每个舵机的往返延迟
+    输入参数: args - 命令行参数
+    输出: 整数，退出码；没有舵机应答时为1
+    功能: 在每个波特率下测量PING、READ和WRITE（写回原值）的应答延迟，打印分布、离群值、
+          慢舵机和推荐的latency_timer
+    """
+    portHandler, packetHandler = openBus(args)
+    profiler = LatencyProfiler(packetHandler, args.timeout)
+    try:
+        found = profiler.profile(args.ids, args.scan_baudrates or [args.baudrate], args.samples)
+    finally:
+        portHandler.closePort()
+
+    report = profiler.report()
+    print('%5s %8s %6s' % ('id', 'baud', 'instr') + ''.join('%8s' % title for title in
+                                                             ('p50', 'p90', 'p99', 'max', 'rtt50', 'fail', 'outl')))
+    for key in sorted(report):
+        scs_id, baudrate, name = key
+        turnaround = report[key]['turnaround']
+        print('%5d %8d %6s' % (scs_id, baudrate, name) +
+              ''.join('%8.3f' % turnaround[field] for field in ('p50', 'p90', 'p99', 'max')) +
+              '%8.3f%8d%8d' % (report[key]['roundtrip']['p50'], report[key]['failures'], len(turnaround['outliers'])))
+    for baudrate in sorted(found):
+        if not found[baudrate]:
+            continue
+        print('baudrate %d: %d servo(s), slow: %s, recommended latency timer %.3f ms' % (
+            baudrate, len(found[baudrate]), ','.join('%d' % scs_id for scs_id in profiler.slowServos(baudrate)) or
+            'none', profiler.recommendLatencyTimer(baudrate)))
+    return 0 if any(found.values()) else 1
+
+
+def commandBench(args):
+    """
+    bench子命令：运行基准测试
+    输入参数: args - 命令行参数
+    输出: 整数，退出码；有基准测试失败时为1
+    功能: 指定--port或--sim时在该总线上对--ids的舵机运行只读事务测试，否则运行全部仿真基准测试
+    """
+    if args.port is None and args.sim is None:
+        return bench.main(args.names)
+
+    portHandler, packetHandler = openBus(args)
+    try:
+        print('transactions:')
+        print(bench.formatResult(bench.runTransactions(packetHandler, args.ids, args.duration), 2))
+    finally:
+        portHandler.closePort()
+    return 0
+
+
+def commandDump(args):
+    """
+    dump子命令：保存舵机内存表快照
+    输入参数: args - 命令行参数
+    输出: 整数，退出码；有舵机没有应答时为1
+    功能: 分组同步读取每个舵机地址0到DUMP_LENGTH-1的内存，写入JSON文件（-表示标准输出）
+    """
+    portHandler, packetHandler = openBus(args)
+    try:
+        memory = syncReadBlocks(packetHandler, args.ids, 0, args.length, args.block or DUMP_BLOCK_SIZE)
+        timestamp = time.time()
+    finally:
+        portHandler.closePort()
+
+    snapshot = {
+        'port': portHandler.getPortName(),
+        'baudrate': args.baudrate,
+        'protocol': args.protocol,
+        'timestamp': timestamp,
+        'start_address': 0,
+        'servos': dict(('%d' % scs_id, memory[scs_id]) for scs_id in sorted(memory)),
+        'missing': [scs_id for scs_id in args.ids if scs_id not in memory],
+    }
+    text = json.dumps(snapshot, sort_keys=True)
+    if args.output == '-':
+        print(text)
+    else:
+        with open(args.output, 'w') as output:
+            output.write(text + '\n')
+        print('%d servo(s) written to %s' % (len(memory), args.output))
+    for scs_id in snapshot['missing']:
+        print('[ID:%03d] no response' % scs_id, file=sys.stderr)
+    return 0 if not snapshot['missing'] else 1
+
+
+def commandUpgrade(args):
+    """
+    upgrade子命令：把总线升级到最快的公共波特率
+    输入参数: args - 命令行参数
+    输出: 整数，退出码；升级失败或回滚时为1，已经是最快波特率时为0
+    功能: 扫描允许的波特率发现舵机，写入新波特率并逐个校验，失败时回滚；打印升级前后的读取吞吐量
+    """
+    portHandler, packetHandler = openBus(args)
+    upgrader = BaudRateUpgrader(packetHandler, args.scan_baudrates, block_size=args.block)
+    try:
+        report = upgrader.upgrade(args.ids, args.cycles)
+    finally:
+        portHandler.closePort()
+
+    for scs_id in sorted(report['servos']):
+        print('[ID:%03d] baudrate %d' % (scs_id, report['servos'][scs_id]))
+    for scs_id, baudrate, model in report['conflicts']:
+        print('[ID:%03d] also answered at baudrate %d model %d' % (scs_id, baudrate, model))
+    for scs_id in report['failed']:
+        print('[ID:%03d] failed verification at baudrate %d' % (scs_id, report['to']))
+    for scs_id in report['unrecovered']:
+        print('[ID:%03d] no response after rollback' % scs_id)
+    print('%s: target baudrate %s' % (report['status'], report['to']))
+    if report['gain'] is not None:
+        print('throughput %.0f -> %.0f servo reads/s (x%.2f)' % (
+            report['throughput_before'], report['throughput_after'], report['gain']))
+    return 0 if report['status'] in (UPGRADE_UPGRADED, UPGRADE_UNCHANGED) else 1
+
+
+def makeParser():
+    """
+    生成命令行解析器
+    输入参数: 无
+    输出: argparse.ArgumentParser对象
+    """
+    parser = argparse.ArgumentParser(prog='python -m scservo_sdk', description='FTServo bus tool')
+    bus = argparse.ArgumentParser(add_help=False)
+    bus.add_argument('-p', '--port', help='serial port, e.g. /dev/ttyUSB0 or COM1')
+    bus.add_argument('--sim', type=parseIds, metavar='IDS', help='use a simulated bus with these servo ids')
+    bus.add_argument('-b', '--baudrate', type=int, default=1000000, help='port baudrate (default 1000000)')
+    bus.add_argument('--protocol', choices=sorted(PROTOCOLS), default='sms_sts', help='servo protocol')
+    bus.add_argument('-i', '--ids', type=parseIds, default=None, help='servo ids, e.g. 1-6,9')
+    commands = parser.add_subparsers(dest='command')
+
+    scan = commands.add_parser('scan', parents=[bus], help='discover servos')
+    scan.add_argument('--scan-baudrates', type=lambda text: [int(value) for value in text.split(',')],
+                      help='comma separated baudrates to scan (default: the port baudrate)')
+    scan.add_argument('--all-baudrates', dest='scan_baudrates', action='store_const', const=DEFAULT_SCAN_BAUDRATES,
+                      help='scan every baudrate the servos support')
+    scan.add_argument('--block', type=int, default=16, help='ids per sync read probe, 0 pings one by one')
+    scan.add_argument('--turnaround', type=float, default=DEFAULT_SCAN_TURNAROUND, help='response margin (ms)')
+    scan.set_defaults(function=commandScan)
+
+    monitor = commands.add_parser('monitor', parents=[bus], help='stream a live status table')
+    monitor.add_argument('-r', '--rate', type=float, default=50.0, help='target poll rate (Hz)')
+    monitor.add_argument('--refresh', type=float, default=0.5, help='table print interval (s)')
+    monitor.add_argument('-n', '--cycles', type=int, default=0, help='stop after this many polls (0: run until Ctrl+C)')
+    monitor.set_defaults(function=commandMonitor)
+
+    profile = commands.add_parser('profile', parents=[bus], help='measure round-trip latency per servo')
+    profile.add_argument('--scan-baudrates', type=lambda text: [int(value) for value in text.split(',')],
+                         help='comma separated baudrates to profile (default: the port baudrate)')
+    profile.add_argument('--all-baudrates', dest='scan_baudrates', action='store_const',
+                         const=DEFAULT_SCAN_BAUDRATES, help='profile every baudrate the servos support')
+    profile.add_argument('-s', '--samples', type=int, default=20, help='samples per servo and instruction')
+    profile.add_argument('--timeout', type=float, default=DEFAULT_PROFILE_TIMEOUT, help='response timeout (ms)')
+    profile.set_defaults(function=commandProfile)
+
+    benchmark = commands.add_parser('bench', parents=[bus], help='run benchmarks on a port or the simulator')
+    benchmark.add_argument('names', nargs='*', help='simulator benchmarks to run (default: all)')
+    benchmark.add_argument('-d', '--duration', type=float, default=1.0, help='seconds per transaction type on a port')
+    benchmark.set_defaults(function=commandBench)
+
+    upgrade = commands.add_parser('upgrade', parents=[bus], help='switch every servo to the fastest common baudrate')
+    upgrade.add_argument('--scan-baudrates', type=lambda text: [int(value) for value in text.split(',')],
+                         default=None, help='comma separated baudrates allowed as the target (default: all)')
+    upgrade.add_argument('--block', type=int, default=16, help='ids per sync read probe, 0 pings one by one')
+    upgrade.add_argument('--cycles', type=int, default=DEFAULT_THROUGHPUT_CYCLES,
+                         help='sync reads before and after to measure throughput (0: skip)')
+    upgrade.set_defaults(function=commandUpgrade)
+
+    dump = commands.add_parser('dump', parents=[bus], help='snapshot memory tables to a JSON file')
+    dump.add_argument('-o', '--output', default='-', help='output file (default: stdout)')
+    dump.add_argument('--length', type=int, default=DUMP_LENGTH, help='bytes per servo from address 0')
+    dump.add_argument('--block', type=int, default=DUMP_BLOCK_SIZE, help='servos per sync read')
+    dump.set_defaults(function=commandDump)
+    return parser
+
+
+def main(argv=None):
+    """
+    命令行入口
+    输入参数: argv - 命令行参数列表，None表示sys.argv[1:]
+    输出: 整数，退出码
+    功能: python -m scservo_sdk {scan,monitor,profile,bench,upgrade,dump} ...
+    """
+    parser = makeParser()
+    args = parser.parse_args(argv)
+    if args.command is None:
+        parser.print_help()
+        return 2
+    if args.command != 'bench' or args.port is not None or args.sim is not None:
+        if args.port is None and args.sim is None:
+            parser.error('one of --port or --sim is required')
+        if args.ids is None:
+            args.ids = list(range(0, MAX_ID + 1)) if args.command in ('scan', 'upgrade') else args.sim
+        if not args.ids:
+            parser.error('--ids is required')
+    return args.function(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
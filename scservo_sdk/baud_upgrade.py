@@ -0,0 +1,270 @@
+#!/usr/bin/env python
+
+from .scservo_def import *
+from .group_sync_read import *
+from .sms_sts import *
+from .bus_discovery import BAUDRATE_TABLE, DEFAULT_SCAN_BAUDRATES, DEFAULT_SCAN_TURNAROUND, BusScanner
+from .fleet_config import DEFAULT_EPROM_DELAY, FleetConfigurator
+from .fleet_state import FLEET_START_ADDRESS, FLEET_DATA_LENGTH
+
+# 波特率 -> 舵机波特率代码
+BAUDRATE_CODES = dict((baudrate, code) for code, baudrate in BAUDRATE_TABLE.items())
+
+# 波特率寄存器地址（SMS/STS、HLS和SCSCL相同）
+BAUD_RATE_ADDRESS = SMS_STS_BAUD_RATE
+
+# 测量吞吐量时同步读取的周期数
+DEFAULT_THROUGHPUT_CYCLES = 20
+
+# 升级结果
+UPGRADE_UPGRADED = 'upgraded'  # 所有舵机已切换到新波特率并校验通过
+UPGRADE_UNCHANGED = 'unchanged'  # 所有舵机已经在最快的可用波特率，没有写入
+UPGRADE_ROLLED_BACK = 'rolled_back'  # 写入或校验失败，所有舵机已恢复原波特率
+UPGRADE_FAILED = 'failed'  # 发现结果不安全（ID冲突或没有舵机）或回滚后仍有舵机没有应答
+
+
+class BaudRateUpgrader(object):
+    def __init__(self, ph, baudrates=None, supported=None, eprom_delay=DEFAULT_EPROM_DELAY,
+                 turnaround=DEFAULT_SCAN_TURNAROUND, block_size=0):
+        """
+        初始化总线波特率升级器
+        输入参数:
+            ph - 协议包处理器对象（sms_sts/hls/scscl）
+            baudrates - 允许切换到的波特率列表，None表示所有舵机支持的波特率；可用于按线缆长度限制最高波特率
+            supported - 字典，型号 -> 该型号支持的波特率列表；不在字典中的型号视为支持BAUDRATE_TABLE中的所有波特率
+            eprom_delay - 写入波特率后等待舵机保存的时间（毫秒）
+            turnaround - 扫描时的应答延迟余量（毫秒）
+            block_size - 扫描时同步读取探测的分组大小，0表示逐个探测
+        功能: 发现总线上的舵机，选出所有舵机和串口都支持的最快波特率，逐个写入波特率寄存器，
+              切换串口后校验每个ID；失败时把已切换的舵机写回原波特率
+        """
+        self.ph = ph
+        self.port = ph.portHandler
+        self.baudrates = list(baudrates) if baudrates is not None else list(DEFAULT_SCAN_BAUDRATES)
+        self.supported = supported or {}
+        self.turnaround = turnaround
+        self.block_size = block_size
+        self.configurator = FleetConfigurator(ph, eprom_delay=eprom_delay)
+
+    def discover(self, scs_ids=None):
+        """
+        发现总线上的舵机
+        输入参数: scs_ids - 候选舵机ID列表，None表示0到MAX_ID
+        输出: (发现结果, 冲突列表) 元组，格式同BusScanner.scan
+        功能: 扫描所有舵机支持的波特率，不受允许列表限制
+        """
+        scanner = BusScanner(self.port, self.ph.scs_end, self.turnaround)
+        return scanner.scan(scs_ids, DEFAULT_SCAN_BAUDRATES, self.block_size)
+
+    def candidates(self, found):
+        """
+        列出所有舵机都支持的波特率
+        输入参数: found - 字典，舵机ID -> (波特率, 型号)
+        输出: 列表，所有舵机型号都支持的允许波特率（从快到慢）
+        """
+        rates = set(baudrate for baudrate in self.baudrates if baudrate in BAUDRATE_CODES)
+        for _, model in found.values():
+            rates &= set(self.supported.get(model, BAUDRATE_CODES))
+        return sorted(rates, reverse=True)
+
+    def selectBaudRate(self, found):
+        """
+        选择目标波特率
+        输入参数: found - 字典，舵机ID -> (波特率, 型号)
+        输出: 整数，最快的、串口也能设置的公共波特率；没有时返回None
+        功能: 从快到慢尝试设置串口，结束后恢复串口原波特率
+        """
+        port = self.port
+        original_baudrate = port.getBaudRate()
+        try:
+            for baudrate in self.candidates(found):
+                if port.setBaudRate(baudrate):
+                    return baudrate
+        finally:
+            port.setBaudRate(original_baudrate)
+        return None
+
+    def groups(self, found):
+        """
+        按当前波特率分组
+        输入参数: found - 字典，舵机ID -> (波特率, 型号)
+        输出: 字典，波特率 -> 舵机ID列表（升序）
+        """
+        groups = {}
+        for scs_id in sorted(found):
+            groups.setdefault(found[scs_id][0], []).append(scs_id)
+        return groups
+
+    def verify(self, scs_ids, baudrate):
+        """
+        校验舵机的波特率
+        输入参数:
+            scs_ids - 舵机ID列表
+            baudrate - 期望的波特率
+        输出: 列表，在该波特率下没有应答或波特率寄存器与期望不符的舵机ID
+        功能: 把串口切换到该波特率，用一次同步读取读回所有舵机的波特率寄存器
+        """
+        if not self.port.setBaudRate(baudrate):
+            return list(scs_ids)
+        groupSyncRead = GroupSyncRead(self.ph, BAUD_RATE_ADDRESS, 1)
+        for scs_id in scs_ids:
+            groupSyncRead.addParam(scs_id)
+        groupSyncRead.txRxPacket()
+
+        code = BAUDRATE_CODES[baudrate]
+        return [scs_id for scs_id in scs_ids
+                if not groupSyncRead.isAvailable(scs_id, BAUD_RATE_ADDRESS, 1)[0] or
+                groupSyncRead.getData(scs_id, BAUD_RATE_ADDRESS, 1) != code]
+
+    def writeBaudRate(self, groups, target):
+        """
+        把舵机切换到目标波特率
+        输入参数:
+            groups - 字典，当前波特率 -> 舵机ID列表
+            target - 目标波特率
+        输出: (已写入的舵机ID列表, 第一个没有确认写入的舵机ID) 元组，全部确认时后者为None
+        功能: 在每组舵机的原波特率下先用一帧同步写入解锁EPROM，再逐个写入波特率寄存器并等待应答；
+              遇到第一个没有确认的舵机立即停止，不再切换其他舵机，已写入的舵机保持解锁，
+              回滚时不需要再次解锁
+        """
+        code = BAUDRATE_CODES[target]
+        written = []
+        for baudrate in sorted(groups):
+            if baudrate == target:
+                continue
+            scs_ids = groups[baudrate]
+            self.port.setBaudRate(baudrate)
+            self.configurator.syncWrite(self.configurator.lock_address, 1, [(scs_id, [0]) for scs_id in scs_ids])
+            for scs_id in scs_ids:
+                written.append(scs_id)  # 没有确认的舵机也可能已经切换，回滚时一并处理
+                result, _ = self.ph.write1ByteTxRx(scs_id, BAUD_RATE_ADDRESS, code)
+                if result != COMM_SUCCESS:
+                    return written, scs_id
+        return written, None
+
+    def lock(self, scs_ids, baudrate):
+        """
+        加锁EPROM
+        输入参数:
+            scs_ids - 舵机ID列表
+            baudrate - 舵机当前的波特率
+        输出: 通信结果代码
+        """
+        self.port.setBaudRate(baudrate)
+        return self.configurator.syncWrite(self.configurator.lock_address, 1, [(scs_id, [1]) for scs_id in scs_ids])
+
+    def rollback(self, found, written, target):
+        """
+        回滚
+        输入参数:
+            found - 字典，舵机ID -> (原波特率, 型号)
+            written - 已写入目标波特率的舵机ID列表
+            target - 目标波特率
+        输出: 列表，回滚后仍不在原波特率下应答的舵机ID
+        功能: 在目标波特率下用一帧同步写入把每个舵机写回各自的原波特率代码（没有切换的舵机不会收到），
+              等待保存后在原波特率下校验并加锁
+        """
+        self.port.setBaudRate(target)
+        self.configurator.syncWrite(BAUD_RATE_ADDRESS, 1,
+                                    [(scs_id, [BAUDRATE_CODES[found[scs_id][0]]]) for scs_id in written])
+        self.configurator.wait()
+
+        missing = []
+        groups = self.groups(dict((scs_id, found[scs_id]) for scs_id in written))
+        for baudrate, scs_ids in sorted(groups.items()):
+            missing.extend(self.verify(scs_ids, baudrate))
+            self.lock(scs_ids, baudrate)
+        return sorted(missing)
+
+    def measureThroughput(self, groups, cycles=DEFAULT_THROUGHPUT_CYCLES):
+        """
+        测量读取吞吐量
+        输入参数:
+            groups - 字典，波特率 -> 舵机ID列表
+            cycles - 每组同步读取的周期数
+        输出: 浮点数，每秒成功读取的舵机数（按端口时钟计时，仿真时为虚拟总线时间）
+        功能: 每组在各自的波特率下同步读取反馈数据（位置到电流），多组的时间相加
+        """
+        port = self.port
+        clock = port.clock
+        reads = 0
+        elapsed = 0
+        for baudrate, scs_ids in sorted(groups.items()):
+            if not port.setBaudRate(baudrate):
+                continue
+            groupSyncRead = GroupSyncRead(self.ph, FLEET_START_ADDRESS, FLEET_DATA_LENGTH)
+            for scs_id in scs_ids:
+                groupSyncRead.addParam(scs_id)
+            start = clock.now()
+            for _ in range(cycles):
+                groupSyncRead.txRxPacket()
+                reads += len([scs_id for scs_id in scs_ids
+                              if groupSyncRead.isAvailable(scs_id, FLEET_START_ADDRESS, FLEET_DATA_LENGTH)[0]])
+            elapsed += clock.now() - start
+        return reads * 1000000000.0 / elapsed if elapsed > 0 else 0.0
+
+    def upgrade(self, scs_ids=None, cycles=DEFAULT_THROUGHPUT_CYCLES):
+        """
+        升级总线波特率
+        输入参数:
+            scs_ids - 候选舵机ID列表，None表示0到MAX_ID
+            cycles - 升级前后测量吞吐量的同步读取周期数，0表示不测量
+        输出: 报告字典，包括结果（UPGRADE_*）、原波特率（舵机ID -> 波特率）、目标波特率、
+              没有通过校验的舵机、回滚后仍没有应答的舵机，以及升级前后的读取吞吐量（舵机/秒）和提升倍数
+        功能: 发现 -> 选择波特率 -> 解锁并逐个写入 -> 串口切换到新波特率 -> 同步读取校验每个ID ->
+              加锁；写入或校验失败时回滚，串口恢复原波特率。成功时串口保持在新波特率
+        """
+        port = self.port
+        original_baudrate = port.getBaudRate()
+        found, conflicts = self.discover(scs_ids)
+        report = {'status': UPGRADE_FAILED, 'servos': dict((scs_id, found[scs_id][0]) for scs_id in found),
+                  'from': original_baudrate, 'to': None, 'failed': [], 'unrecovered': [], 'conflicts': conflicts,
+                  'throughput_before': None, 'throughput_after': None, 'gain': None}
+        if not found or conflicts:
+            return report  # 没有舵机或有ID在多个波特率下应答，不做任何写入
+
+        target = self.selectBaudRate(found)
+        report['to'] = target
+        groups = self.groups(found)
+        if target is None or list(groups) == [target]:
+            report['status'] = UPGRADE_UNCHANGED if target is not None else UPGRADE_FAILED
+            return report
+
+        if cycles > 0:
+            report['throughput_before'] = self.measureThroughput(groups, cycles)
+            port.setBaudRate(original_baudrate)
+
+        written, unconfirmed = self.writeBaudRate(groups, target)
+        failed = [unconfirmed] if unconfirmed is not None else []
+        if not failed:
+            self.configurator.wait()
+            failed = self.verify(sorted(found), target)
+        report['failed'] = failed
+
+        if failed:
+            report['unrecovered'] = self.rollback(found, written, target)
+            report['status'] = UPGRADE_ROLLED_BACK if not report['unrecovered'] else UPGRADE_FAILED
+            port.setBaudRate(original_baudrate)
+            return report
+
+        self.lock(sorted(found), target)
+        report['status'] = UPGRADE_UPGRADED
+        if cycles > 0:
+            report['throughput_after'] = self.measureThroughput({target: sorted(found)}, cycles)
+            report['gain'] = report['throughput_after'] / max(report['throughput_before'], 1e-9)
+        return report
+
+
+def upgradeBaudRate(ph, scs_ids=None, baudrates=None, supported=None, cycles=DEFAULT_THROUGHPUT_CYCLES):
+    """
+    升级总线波特率
+    输入参数:
+        ph - 协议包处理器对象
+        scs_ids - 候选舵机ID列表，None表示0到MAX_ID
+        baudrates - 允许切换到的波特率列表，None表示所有舵机支持的波特率
+        supported - 字典，型号 -> 支持的波特率列表
+        cycles - 测量吞吐量的同步读取周期数
+    输出: 报告字典，格式见BaudRateUpgrader.upgrade
+    功能: BaudRateUpgrader.upgrade的简便封装
+    """
+    return BaudRateUpgrader(ph, baudrates, supported).upgrade(scs_ids, cycles)
@@ -0,0 +1,1168 @@
+#!/usr/bin/env python
+
+import gc
+import math
+import os
+import sys
+import time
+import itertools
+import threading
+import tracemalloc
+
+from .scservo_def import *
+from .sms_sts import *
+from .sim_port_handler import *
+from .read_coalescer import *
+from .command_aggregator import *
+from .clock import *
+from .compiled_cycle import *
+from .fleet_state import *
+from .fleet_config import *
+from .latency_profiler import *
+from .baud_upgrade import *
+from .register_map import *
+from .read_planner import *
+from .write_planner import *
+
+# 基准测试名称 -> 测试函数
+BENCHMARKS = {}
+
+# 基准测试默认使用的USB转串口接收延迟（毫秒），与常见转接器设置为1毫秒时相当
+BENCH_LATENCY = 1.0
+
+# import scservo_sdk的耗时上限（毫秒），超过时import_time基准测试失败
+IMPORT_TIME_BUDGET = 10.0
+
+# import scservo_sdk时不应加载的模块
+IMPORT_FORBIDDEN_MODULES = ('serial', 'platform')
+
+
+def benchmark(name):
+    """
+    注册基准测试
+    输入参数: name - 基准测试名称
+    输出: 装饰器
+    功能: 将测试函数登记到BENCHMARKS，测试函数返回结果字典
+    """
+    def register(function):
+        BENCHMARKS[name] = function
+        return function
+    return register
+
+
+def makeSimBus(scs_ids, baudrate=1000000, protocol=sms_sts, **options):
+    """
+    建立一条仿真总线
+    输入参数:
+        scs_ids - 舵机ID列表
+        baudrate - 波特率
+        protocol - 协议类（sms_sts/hls/scscl）
+        options - 传给SimPortHandler的其他参数（turnaround、latency、drop_rate等）
+    输出: (SimPortHandler对象, 协议对象) 元组
+    功能: 仿真舵机的波特率设置为与端口一致
+    """
+    options.setdefault('latency', BENCH_LATENCY)
+    portHandler = SimPortHandler(scs_ids, **options)
+    for servo in portHandler.servos.values():
+        servo.memory[SMS_STS_BAUD_RATE] = SIM_BAUDRATES.index(baudrate)
+    portHandler.setBaudRate(baudrate)
+    return portHandler, protocol(portHandler)
+
+
+class StaticSerial(object):
+    def __init__(self, response):
+        """
+        初始化固定应答的串口
+        输入参数: response - 每次收到同步读取指令后返回的应答字节
+        功能: 写入和读取都不创建新对象（read除外），用于测量SDK自身的内存分配
+        """
+        self.response = bytes(response)
+        self.size = len(self.response)
+        self.available = False
+
+    def close(self):
+        pass
+
+    def flush(self):
+        pass
+
+    def reset_input_buffer(self):
+        self.available = False
+
+    @property
+    def in_waiting(self):
+        return self.size if self.available else 0
+
+    def write(self, packet):
+        self.available = packet[PKT_INSTRUCTION] == INST_SYNC_READ
+        return len(packet)
+
+    def read(self, length):
+        if not self.available:
+            return b''
+        self.available = False
+        return self.response[:length]
+
+    def readinto(self, buffer):
+        if not self.available:
+            return 0
+        self.available = False
+        buffer[:self.size] = self.response
+        return self.size
+
+
+def measureAllocations(function, cycles):
+    """
+    测量稳定运行时的内存分配
+    输入参数:
+        function - 无参数的测试函数
+        cycles - 调用次数
+    输出: (保留字节数, 瞬时峰值字节数) 元组，由tracemalloc统计
+    功能: 预热后调用cycles次；保留字节数为结束时新增的内存，瞬时峰值为调用过程中
+          新增内存的最大值（含tracemalloc自身的少量开销）
+    """
+    for _ in itertools.repeat(None, 100):
+        function()
+    tracemalloc.start()
+    try:
+        for _ in itertools.repeat(None, 10):
+            function()
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        for _ in itertools.repeat(None, cycles):
+            function()
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return current - base, peak - base
+
+
+def runBenchmark(name, **kwargs):
+    """
+    运行一个基准测试
+    输入参数:
+        name - 基准测试名称
+        kwargs - 传给测试函数的参数
+    输出: 结果字典
+    """
+    return BENCHMARKS[name](**kwargs)
+
+
+def formatResult(result, indent=0):
+    """
+    格式化结果字典
+    输入参数:
+        result - 结果字典
+        indent - 缩进空格数
+    输出: 字符串，每行一个键值
+    """
+    lines = []
+    for key in sorted(result):
+        value = result[key]
+        if isinstance(value, dict):
+            lines.append('%s%s:' % (' ' * indent, key))
+            lines.append(formatResult(value, indent + 2))
+        elif isinstance(value, float):
+            lines.append('%s%s: %.3f' % (' ' * indent, key, value))
+        else:
+            lines.append('%s%s: %s' % (' ' * indent, key, value))
+    return '\n'.join(lines)
+
+
+def runThreads(count, target, duration):
+    """
+    在多个线程中循环执行测试函数
+    输入参数:
+        count - 线程数
+        target - 测试函数，参数为线程序号，返回(成功次数, 失败次数)
+        duration - 运行时间（秒）
+    输出: (成功次数, 失败次数, 实际运行时间（秒）) 元组
+    """
+    stop = threading.Event()
+    totals = [[0, 0] for _ in range(count)]
+
+    def worker(index):
+        while not stop.is_set():
+            ok, failed = target(index)
+            totals[index][0] += ok
+            totals[index][1] += failed
+
+    threads = [threading.Thread(target=worker, args=(index,)) for index in range(count)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    time.sleep(duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    return sum(total[0] for total in totals), sum(total[1] for total in totals), elapsed
+
+
+@benchmark('read_coalescing')
+def benchReadCoalescing(threads=8, servos_per_thread=5, duration=1.0, window=DEFAULT_COALESCE_WINDOW,
+                        baudrate=1000000):
+    """
+    多线程读取合并基准测试
+    输入参数:
+        threads - 线程数
+        servos_per_thread - 每个线程轮询的舵机数
+        duration - 每种方式的运行时间（秒）
+        window - 合并窗口（毫秒）
+        baudrate - 波特率
+    输出: 结果字典，包含逐个读取和合并读取的总读取速率
+    功能: 每个线程轮询自己的舵机的ReadPosSpeed；逐个读取时每次调用独占总线完成一次
+          往返，合并读取时通过ReadCoalescer共享同步读取
+    """
+    scs_ids = list(range(1, threads * servos_per_thread + 1))
+
+    def servos(index):
+        return scs_ids[index * servos_per_thread:(index + 1) * servos_per_thread]
+
+    portHandler, packetHandler = makeSimBus(scs_ids, baudrate)
+
+    def direct(index):
+        ok = failed = 0
+        for scs_id in servos(index):
+            with portHandler.bus_lock:
+                _, _, result, _ = packetHandler.ReadPosSpeed(scs_id)
+            if result == COMM_SUCCESS:
+                ok += 1
+            else:
+                failed += 1
+        return ok, failed
+
+    coalescer = ReadCoalescer(packetHandler, window)
+
+    def coalesced(index):
+        ok = failed = 0
+        for scs_id in servos(index):
+            _, _, result, _ = coalescer.ReadPosSpeed(scs_id)
+            if result == COMM_SUCCESS:
+                ok += 1
+            else:
+                failed += 1
+        return ok, failed
+
+    results = {}
+    for name, target in (('direct', direct), ('coalesced', coalesced)):
+        ok, failed, elapsed = runThreads(threads, target, duration)
+        results[name] = {'reads': ok, 'failures': failed, 'reads_per_second': ok / elapsed}
+
+    results['coalesced']['transactions'] = coalescer.transactions
+    results['coalesced']['reads_per_transaction'] = float(coalescer.requests) / max(coalescer.transactions, 1)
+    results['speedup'] = results['coalesced']['reads_per_second'] / max(results['direct']['reads_per_second'], 1e-9)
+    portHandler.closePort()
+    return results
+
+
+@benchmark('write_coalescing')
+def benchWriteCoalescing(threads=8, servos_per_thread=5, duration=1.0, period=DEFAULT_TICK_PERIOD,
+                         baudrate=1000000):
+    """
+    多线程写入汇总基准测试
+    输入参数:
+        threads - 线程数
+        servos_per_thread - 每个线程控制的舵机数
+        duration - 每种方式的运行时间（秒）
+        period - 汇总发送周期（毫秒）
+        baudrate - 波特率
+    输出: 结果字典，包含逐个写入和汇总写入的指令速率、帧数和flush耗时
+    功能: 每个线程不断更新自己舵机的WritePosEx；逐个写入时每次调用独占总线完成一次
+          带应答的写入，汇总写入时通过CommandAggregator每周期发送一条同步写入帧
+    """
+    scs_ids = list(range(1, threads * servos_per_thread + 1))
+
+    def servos(index):
+        return scs_ids[index * servos_per_thread:(index + 1) * servos_per_thread]
+
+    portHandler, packetHandler = makeSimBus(scs_ids, baudrate)
+    counter = [0]
+
+    def direct(index):
+        ok = failed = 0
+        for scs_id in servos(index):
+            counter[0] += 1
+            with portHandler.bus_lock:
+                result, _ = packetHandler.WritePosEx(scs_id, counter[0] % 4096, 1000, 50)
+            if result == COMM_SUCCESS:
+                ok += 1
+            else:
+                failed += 1
+        return ok, failed
+
+    aggregator = CommandAggregator(packetHandler, period)
+
+    def aggregated(index):
+        for scs_id in servos(index):
+            counter[0] += 1
+            aggregator.WritePosEx(scs_id, counter[0] % 4096, 1000, 50)
+        # 控制回路按周期更新指令，避免只测到提交速度
+        time.sleep(period / 1000.0)
+        return servos_per_thread, 0
+
+    results = {}
+    ok, failed, elapsed = runThreads(threads, direct, duration)
+    results['direct'] = {'commands': ok, 'failures': failed, 'commands_per_second': ok / elapsed}
+
+    aggregator.reset()
+    aggregator.start()
+    runThreads(threads, aggregated, duration)
+    aggregator.stop()
+    results['aggregated'] = aggregator.getStats()
+    portHandler.closePort()
+    return results
+
+
+@benchmark('clock')
+def benchClock(iterations=200000, reads=40, baudrate=1000000):
+    """
+    端口时钟基准测试
+    输入参数:
+        iterations - 超时检查的调用次数
+        reads - 仿真总线上的读取次数（其中一半读取不存在的舵机，等待超时）
+        baudrate - 波特率
+    输出: 结果字典，包含每次超时检查的耗时（及原先浮点墙上时间计算的耗时），以及单调时钟与虚拟时钟下仿真读取的
+          实际耗时、仿真时间和超时结果
+    功能: 比较接收循环中每次轮询的计时开销；用虚拟时钟运行同一组读取，验证其快于
+          实时且超时行为确定
+    """
+    results = {}
+    portHandler = SimPortHandler([1])
+    portHandler.setBaudRate(baudrate)
+    portHandler.setPacketTimeout(6)
+    start = time.perf_counter()
+    for _ in range(iterations):
+        portHandler.isPacketTimeout()
+    results['timeout_check_ns'] = (time.perf_counter() - start) * 1e9 / iterations
+
+    # 对照：原先每次轮询计算的浮点毫秒墙上时间
+    start = time.perf_counter()
+    for _ in range(iterations):
+        round(time.time() * 1000000000) / 1000000.0
+    results['wall_clock_float_ns'] = (time.perf_counter() - start) * 1e9 / iterations
+
+    for name, clock in (('monotonic', MonotonicClock()), ('virtual', VirtualClock())):
+        portHandler, packetHandler = makeSimBus([1], baudrate, clock=clock)
+        outcomes = []
+        sim_start = portHandler.getCurrentTimeNs()
+        start = time.perf_counter()
+        for index in range(reads):
+            _, result, _ = packetHandler.ReadPos(1 if index % 2 == 0 else 2)
+            outcomes.append(result)
+        wall = time.perf_counter() - start
+        simulated = (portHandler.getCurrentTimeNs() - sim_start) / 1e9
+        results[name] = {
+            'wall_seconds': wall,
+            'simulated_seconds': simulated,
+            'timeouts': outcomes.count(COMM_RX_TIMEOUT),
+            'speed': simulated / wall if wall > 0 else 0.0,
+        }
+        portHandler.closePort()
+    return results
+
+
+@benchmark('tx_timing')
+def benchTxTiming(reads=2000, length=32, baudrate=115200, latency_timer=3.0, tx_latency=1.0, jitter=1.0):
+    """
+    发送完成计时基准测试
+    输入参数:
+        reads - 每种方式的读取次数
+        length - 每次读取的字节数
+        baudrate - 波特率
+        latency_timer - 接收超时的固定余量（毫秒）
+        tx_latency - 仿真转接器的发送延迟（毫秒）
+        jitter - 仿真转接器收发延迟的随机抖动上限（毫秒）
+    输出: 结果字典，包含每种发送完成计时方式的误超时次数、误超时率和成功读取的平均/最大延迟（毫秒）
+    功能: 使用虚拟时钟，总线上的舵机全部存在，任何超时都是误超时；比较超时从writePort
+          返回时、按波特率估算的发送完成时和排空输出后开始计算的效果
+    """
+    results = {}
+    for name, mode in (('return', TX_TIMING_RETURN), ('estimate', TX_TIMING_ESTIMATE), ('drain', TX_TIMING_DRAIN)):
+        portHandler, packetHandler = makeSimBus([1], baudrate, clock=VirtualClock(), tx_latency=tx_latency,
+                                                jitter=jitter)
+        portHandler.setLatencyTimer(latency_timer)
+        portHandler.setTxTiming(mode)
+        timeouts = 0
+        total = 0
+        worst = 0
+        for _ in range(reads):
+            start = portHandler.getCurrentTimeNs()
+            _, result, _ = packetHandler.readTxRx(1, SMS_STS_MODEL_L, length)
+            elapsed = portHandler.getCurrentTimeNs() - start
+            if result != COMM_SUCCESS:
+                timeouts += 1
+                continue
+            total += elapsed
+            worst = max(worst, elapsed)
+        results[name] = {
+            'false_timeouts': timeouts,
+            'false_timeout_rate': float(timeouts) / reads,
+            'latency_avg': total / 1e6 / max(reads - timeouts, 1),
+            'latency_max': worst / 1e6,
+        }
+        portHandler.closePort()
+    return results
+
+
+@benchmark('echo')
+def benchEcho(transactions=2000, servos=4, baudrate=1000000):
+    """
+    回显转接器基准测试
+    输入参数:
+        transactions - 每种方式的读取次数
+        servos - 轮流读取的舵机数
+        baudrate - 波特率
+    输出: 结果字典，包含是否检测到回显，以及不回显的转接器、回显但不处理和跳过回显时的成功/失败次数（读回的
+          位置不正确也计为失败）和按仿真时间计算的成功事务速率
+    功能: 使用虚拟时钟仿真回显发送字节的单线转接器，openPort自动检测回显；对照组关闭
+          回显处理，接收时把回显的指令包当作候选应答；不回显的转接器作为速率上限
+    """
+    scs_ids = list(range(1, servos + 1))
+    results = {}
+    for name, echo, mode in (('no_echo', False, ECHO_AUTO), ('unaware', True, ECHO_OFF), ('echo_aware', True, ECHO_AUTO)):
+        portHandler, packetHandler = makeSimBus(scs_ids, baudrate, clock=VirtualClock(), echo=echo)
+        for scs_id in scs_ids:
+            portHandler.servos[scs_id].setWord(SMS_STS_PRESENT_POSITION_L, 1000 + scs_id)
+        portHandler.setEchoMode(mode)
+        portHandler.openPort()
+        ok = failed = 0
+        start = portHandler.getCurrentTimeNs()
+        for index in range(transactions):
+            scs_id = scs_ids[index % servos]
+            position, result, error = packetHandler.ReadPos(scs_id)
+            if result == COMM_SUCCESS and error == 0 and position == 1000 + scs_id:
+                ok += 1
+            else:
+                failed += 1
+        simulated = (portHandler.getCurrentTimeNs() - start) / 1e9
+        results[name] = {
+            'echo_detected': portHandler.echo,
+            'successes': ok,
+            'failures': failed,
+            'transactions_per_second': ok / simulated if simulated > 0 else 0.0,
+        }
+        portHandler.closePort()
+    return results
+
+
+@benchmark('compiled_cycle')
+def benchCompiledCycle(servos=12, cycles=20000, baudrate=1000000, heap_objects=200000):
+    """
+    预编译控制周期基准测试
+    输入参数:
+        servos - 舵机数
+        cycles - 测量垃圾回收和耗时的周期数
+        baudrate - 波特率
+        heap_objects - 模拟应用程序常驻堆的对象数（使每次完整回收有实际代价）
+    输出: 结果字典，包含GroupSyncWrite+GroupSyncRead与CompiledCycle每个周期的内存分配、
+          耗时、垃圾回收次数和停顿时间
+    功能: 串口替换为固定应答的StaticSerial并使用虚拟时钟，只测量SDK自身；每个周期为一次
+          7字节同步写入加一次4字节同步读取；CompiledCycle稳定运行时保留任何内存，或瞬时分配超过
+          一次校验和计算（内置sum的临时迭代器和结果整数），即抛出AssertionError
+    """
+    scs_ids = list(range(1, servos + 1))
+    portHandler, packetHandler = makeSimBus(scs_ids, baudrate, clock=VirtualClock())
+    portHandler.setTxTiming(TX_TIMING_RETURN)  # 估算发送完成时间需要计算新的纳秒整数
+    response = bytearray()
+    for scs_id in scs_ids:
+        response.extend(portHandler.makeStatus(scs_id, 0, portHandler.servos[scs_id].memory[
+            SMS_STS_PRESENT_POSITION_L:SMS_STS_PRESENT_POSITION_L + 4]))
+    portHandler.ser = StaticSerial(response)
+
+    groupSyncWrite = GroupSyncWrite(packetHandler, SMS_STS_ACC, 7)
+    groupSyncRead = GroupSyncRead(packetHandler, SMS_STS_PRESENT_POSITION_L, 4)
+    for scs_id in scs_ids:
+        groupSyncWrite.addParam(scs_id, [0, 0, 8, 0, 0, 0, 0])
+        groupSyncRead.addParam(scs_id)
+
+    def legacy():
+        groupSyncWrite.txPacket()
+        return groupSyncRead.txRxPacket()
+
+    cycle = CompiledCycle(packetHandler, scs_ids, SMS_STS_ACC, 7, SMS_STS_PRESENT_POSITION_L, 4)
+    for scs_id in scs_ids:
+        cycle.setWord(scs_id, SMS_STS_GOAL_POSITION_L, 2048)
+
+    pauses = []
+    collection = [0]
+
+    def onCollection(phase, info):
+        if phase == 'start':
+            collection[0] = time.perf_counter()
+        else:
+            pauses.append(time.perf_counter() - collection[0])
+
+    # 测量本身的开销，以及计算一次校验和时创建的临时对象（无法避免，计算后立即释放）
+    overhead = measureAllocations(lambda: None, 1000)[1]
+    probe = memoryview(bytearray(b'\xff' * 8))
+    allowance = measureAllocations(lambda: cycle.checksum(probe), 1000)[1] - overhead
+
+    heap = [[index] for index in range(heap_objects)]
+    results = {}
+    for name, function in (('legacy', legacy), ('compiled', cycle.run)):
+        if function() != COMM_SUCCESS:
+            raise AssertionError('%s cycle failed' % name)
+        retained, transient = measureAllocations(function, 1000)
+        transient -= overhead
+
+        gc.collect()
+        del pauses[:]
+        gc.callbacks.append(onCollection)
+        start = time.perf_counter()
+        try:
+            for _ in itertools.repeat(None, cycles):
+                function()
+        finally:
+            elapsed = time.perf_counter() - start
+            gc.callbacks.remove(onCollection)
+        results[name] = {
+            'retained_bytes': retained,
+            'transient_peak_bytes': transient,
+            'cycle_us': elapsed * 1e6 / cycles,
+            'gc_collections': len(pauses),
+            'gc_pause_total_ms': sum(pauses) * 1000.0,
+            'gc_pause_max_ms': max(pauses) * 1000.0 if pauses else 0.0,
+        }
+    del heap
+
+    results['transient_allowance_bytes'] = allowance
+    compiled = results['compiled']
+    if compiled['retained_bytes'] or compiled['transient_peak_bytes'] > allowance:
+        raise AssertionError('compiled cycle allocated %d bytes (peak %d) in steady state' %
+                             (compiled['retained_bytes'], compiled['transient_peak_bytes']))
+    return results
+
+
+@benchmark('import_time')
+def benchImportTime(runs=5, budget=IMPORT_TIME_BUDGET):
+    """
+    导入耗时基准测试
+    输入参数:
+        runs - 子进程运行次数，取最小值
+        budget - 耗时上限（毫秒）
+    输出: 结果字典，包含import scservo_sdk的累计耗时（毫秒，python -X importtime统计）和导入后
+          已加载的禁止模块
+    功能: 在新的解释器中导入包；耗时超过上限或加载了pyserial等只在打开串口时才需要的模块时
+          抛出AssertionError
+    """
+    import subprocess
+
+    env = dict(os.environ)
+    env.pop('PYTHONDONTWRITEBYTECODE', None)  # 测量已编译字节码时的导入耗时（第一次运行生成.pyc，不计入）
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env['PYTHONPATH'] = os.pathsep.join([root] + [path for path in [env.get('PYTHONPATH')] if path])
+    code = ('import sys, scservo_sdk; print(",".join(name for name in %r if name in sys.modules))' %
+            (IMPORT_FORBIDDEN_MODULES,))
+
+    times = []
+    loaded = ''
+    for run in range(runs + 1):
+        process = subprocess.Popen([sys.executable, '-X', 'importtime', '-c', code], env=env,
+                                   stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True)
+        stdout, stderr = process.communicate()
+        if process.returncode != 0:
+            raise AssertionError('import scservo_sdk failed: %s' % stderr.strip())
+        loaded = stdout.strip()
+        if run == 0:
+            continue
+        for line in stderr.splitlines():
+            fields = [field.strip() for field in line.split('|')]
+            if len(fields) == 3 and fields[2] == 'scservo_sdk':
+                times.append(int(fields[1]) / 1000.0)
+
+    results = {
+        'import_ms': min(times),
+        'budget_ms': budget,
+        'forbidden_loaded': loaded or 'none',
+    }
+    if loaded:
+        raise AssertionError('import scservo_sdk loaded %s' % loaded)
+    if results['import_ms'] > budget:
+        raise AssertionError('import scservo_sdk took %.1f ms (budget %.1f ms)' % (results['import_ms'], budget))
+    return results
+
+
+@benchmark('fleet_state')
+def benchFleetState(servos=1000, servos_per_bus=200, cycles=20):
+    """
+    舵机群状态表基准测试
+    输入参数:
+        servos - 舵机总数
+        servos_per_bus - 每条总线的舵机数（不超过MAX_ID）
+        cycles - 测量更新耗时的周期数
+    输出: 结果字典，包含字典+列表布局与FleetState每个舵机占用的内存（字节）和每个周期更新
+          所有舵机的耗时（毫秒）
+    功能: 每条总线一个覆盖全部状态字段的GroupSyncRead，应答数据直接填入data_table（不经过串口）；
+          对照组按(总线, ID)保存每个舵机的状态列表，用getData和scs_tohost逐字段解码
+    """
+    buses = []
+    for bus in range((servos + servos_per_bus - 1) // servos_per_bus):
+        scs_ids = list(range(1, min(servos_per_bus, servos - bus * servos_per_bus) + 1))
+        portHandler, packetHandler = makeSimBus(scs_ids, clock=VirtualClock())
+        groupSyncRead = GroupSyncRead(packetHandler, FLEET_START_ADDRESS, FLEET_DATA_LENGTH)
+        for scs_id in scs_ids:
+            servo = portHandler.servos[scs_id]
+            servo.setWord(SMS_STS_PRESENT_POSITION_L, 1000 + scs_id)
+            servo.setWord(SMS_STS_PRESENT_SPEED_L, (1 << 15) | scs_id)  # 负速度
+            servo.setWord(SMS_STS_PRESENT_CURRENT_L, 300 + scs_id)
+            groupSyncRead.addParam(scs_id)
+            groupSyncRead.data_table[scs_id] = [0] + list(
+                servo.memory[FLEET_START_ADDRESS:FLEET_START_ADDRESS + FLEET_DATA_LENGTH])
+        groupSyncRead.makeParam()
+        buses.append((bus, packetHandler, groupSyncRead))
+
+    register_map = getRegisterMap('sms_sts')
+    fields = [(register_map[register].address, register_map[register].length, register_map[register].sign_bit)
+              for _, _, register in FLEET_FIELDS]
+
+    def updateDicts(state):
+        for bus, packetHandler, groupSyncRead in buses:
+            timestamp = packetHandler.portHandler.getCurrentTime()
+            for scs_id in groupSyncRead.param:
+                available, error = groupSyncRead.isAvailable(scs_id, FLEET_START_ADDRESS, FLEET_DATA_LENGTH)
+                if not available:
+                    continue
+                values = []
+                for address, length, sign_bit in fields:
+                    value = groupSyncRead.getData(scs_id, address, length)
+                    if sign_bit is not None:
+                        value = packetHandler.scs_tohost(value, sign_bit)
+                    values.append(value)
+                values.append(error)
+                values.append(timestamp)
+                state[(bus, scs_id)] = values
+
+    def updateFleet(fleet):
+        for bus, packetHandler, groupSyncRead in buses:
+            fleet.update(groupSyncRead, bus=bus)
+
+    results = {}
+    for name, create, update in (('dict_of_lists', dict, updateDicts), ('fleet_state', FleetState, updateFleet)):
+        tracemalloc.start()
+        try:
+            state = create()
+            update(state)
+            memory = tracemalloc.get_traced_memory()[0]
+        finally:
+            tracemalloc.stop()
+        start = time.perf_counter()
+        for _ in range(cycles):
+            update(state)
+        elapsed = time.perf_counter() - start
+        results[name] = {
+            'bytes_per_servo': float(memory) / servos,
+            'update_ms_per_cycle': elapsed * 1000.0 / cycles,
+        }
+
+    # 两种布局的解码结果应一致
+    fleet = FleetState()
+    updateFleet(fleet)
+    state = {}
+    updateDicts(state)
+    view = fleet.get(servos_per_bus, 0)
+    if [view.position, view.speed, view.current] != state[(0, servos_per_bus)][0:2] + [state[(0, servos_per_bus)][6]]:
+        raise AssertionError('fleet state decoding differs from getData')
+    return results
+
+
+@benchmark('group_tables')
+def benchGroupTables(servos=200, repeat=50, cycles=500):
+    """
+    同步读写组单次调用耗时基准测试
+    输入参数:
+        servos - 组内舵机数
+        repeat - 每个ID调用每个方法的次数
+        cycles - 测量完整同步读取和同步写入的周期数
+    输出: 结果字典，包含addParam/removeParam、changeParam、isAvailable、getData每次调用的
+          耗时（纳秒），以及在仿真总线上一次同步读取和同步写入的耗时（微秒）
+    功能: 同步读取的应答来自虚拟时钟下的仿真总线，耗时只包含SDK自身的处理
+    """
+    scs_ids = list(range(1, servos + 1))
+    portHandler, packetHandler = makeSimBus(scs_ids, clock=VirtualClock())
+    groupSyncRead = GroupSyncRead(packetHandler, SMS_STS_PRESENT_POSITION_L, 4)
+    groupSyncWrite = GroupSyncWrite(packetHandler, SMS_STS_ACC, 7)
+    data = [0, 0, 0, 0, 0, 0, 0]
+    for scs_id in scs_ids:
+        groupSyncRead.addParam(scs_id)
+        groupSyncWrite.addParam(scs_id, data)
+    if groupSyncRead.txRxPacket() != COMM_SUCCESS:
+        raise AssertionError('sync read failed on the simulated bus')
+    groupSyncWrite.txPacket()
+
+    calls = float(servos * repeat)
+
+    def perCall(function):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for scs_id in scs_ids:
+                function(scs_id)
+        return (time.perf_counter() - start) * 1e9 / calls
+
+    def addRemove(scs_id):
+        groupSyncRead.removeParam(scs_id)
+        groupSyncRead.addParam(scs_id)
+
+    results = {
+        'is_available_ns': perCall(lambda scs_id: groupSyncRead.isAvailable(scs_id, SMS_STS_PRESENT_SPEED_L, 2)),
+        'get_data_ns': perCall(lambda scs_id: groupSyncRead.getData(scs_id, SMS_STS_PRESENT_SPEED_L, 2)),
+        'change_param_ns': perCall(lambda scs_id: groupSyncWrite.changeParam(scs_id, data)),
+        'add_remove_param_ns': perCall(addRemove) / 2,
+    }
+
+    start = time.perf_counter()
+    for _ in range(cycles):
+        groupSyncRead.txRxPacket()
+    results['sync_read_us'] = (time.perf_counter() - start) * 1e6 / cycles
+
+    start = time.perf_counter()
+    for _ in range(cycles):
+        for scs_id in scs_ids:
+            groupSyncWrite.changeParam(scs_id, data)
+        groupSyncWrite.txPacket()
+    results['sync_write_us'] = (time.perf_counter() - start) * 1e6 / cycles
+    return results
+
+
+def runTransactions(packetHandler, scs_ids, duration=1.0):
+    """
+    在一条总线上运行只读事务测试
+    输入参数:
+        packetHandler - 协议对象（端口已打开并设置好波特率）
+        scs_ids - 舵机ID列表
+        duration - 每种事务的运行时间（秒）
+    输出: 结果字典，包含PING、单个读取和同步读取各自的事务速率、失败次数和舵机读取速率
+    功能: 只发送PING、READ和SYNC_READ，不写入舵机，可用于真实总线或仿真总线
+    """
+    scs_ids = list(scs_ids)
+    groupSyncRead = GroupSyncRead(packetHandler, FLEET_START_ADDRESS, FLEET_DATA_LENGTH)
+    for scs_id in scs_ids:
+        groupSyncRead.addParam(scs_id)
+
+    def ping(scs_id):
+        return packetHandler.ping(scs_id)[1]
+
+    def read(scs_id):
+        return packetHandler.read4ByteTxRx(scs_id, FLEET_START_ADDRESS)[1]
+
+    def syncRead(scs_id):
+        return groupSyncRead.txRxPacket()
+
+    results = {}
+    for name, transaction, servos in (('ping', ping, 1), ('read', read, 1), ('sync_read', syncRead, len(scs_ids))):
+        ok = failed = 0
+        start = time.perf_counter()
+        for scs_id in itertools.cycle(scs_ids):
+            if transaction(scs_id) == COMM_SUCCESS:
+                ok += 1
+            else:
+                failed += 1
+            elapsed = time.perf_counter() - start
+            if elapsed >= duration:
+                break
+        results[name] = {
+            'transactions': ok + failed,
+            'failures': failed,
+            'transactions_per_second': (ok + failed) / elapsed,
+            'servo_reads_per_second': ok * servos / elapsed,
+        }
+    return results
+
+
+@benchmark('transactions')
+def benchTransactions(servos=12, duration=1.0, baudrate=1000000):
+    """
+    仿真总线事务基准测试
+    输入参数:
+        servos - 舵机数
+        duration - 每种事务的运行时间（秒）
+        baudrate - 波特率
+    输出: 结果字典，同runTransactions
+    功能: 在仿真总线上运行runTransactions；命令行工具的bench子命令可对真实端口运行同一测试
+    """
+    scs_ids = list(range(1, servos + 1))
+    portHandler, packetHandler = makeSimBus(scs_ids, baudrate)
+    try:
+        return runTransactions(packetHandler, scs_ids, duration)
+    finally:
+        portHandler.closePort()
+
+
+@benchmark('fleet_config')
+def benchFleetConfig(servos=60, baudrate=1000000):
+    """
+    批量配置基准测试
+    输入参数:
+        servos - 舵机数
+        baudrate - 波特率
+    输出: 结果字典，包含逐个配置与FleetConfigurator的总线时间（毫秒，虚拟时钟）、实际耗时（毫秒）、
+          事务数（往返或同步写入帧，包括校验读取），以及校验发现的差异数
+    功能: 每个舵机写入各不相同的角度限制（双字节）和死区（单字节）；逐个配置时每个舵机依次解锁、
+          写入、加锁并读回校验，每一步都等待应答
+    """
+    scs_ids = list(range(1, servos + 1))
+    config = dict((scs_id, {SMS_STS_MIN_ANGLE_LIMIT_L: 100 + scs_id, SMS_STS_MAX_ANGLE_LIMIT_L: 4000 - scs_id,
+                            SMS_STS_CW_DEAD: scs_id % 4, SMS_STS_CCW_DEAD: scs_id % 3}) for scs_id in scs_ids)
+
+    def sequential(packetHandler):
+        roundtrips = failures = 0
+        for scs_id in scs_ids:
+            registers = config[scs_id]
+            results = [packetHandler.unLockEprom(scs_id)[0],
+                       packetHandler.write2ByteTxRx(scs_id, SMS_STS_MIN_ANGLE_LIMIT_L,
+                                                    registers[SMS_STS_MIN_ANGLE_LIMIT_L])[0],
+                       packetHandler.write2ByteTxRx(scs_id, SMS_STS_MAX_ANGLE_LIMIT_L,
+                                                    registers[SMS_STS_MAX_ANGLE_LIMIT_L])[0],
+                       packetHandler.write1ByteTxRx(scs_id, SMS_STS_CW_DEAD, registers[SMS_STS_CW_DEAD])[0],
+                       packetHandler.write1ByteTxRx(scs_id, SMS_STS_CCW_DEAD, registers[SMS_STS_CCW_DEAD])[0],
+                       packetHandler.LockEprom(scs_id)[0]]
+            data, result, _ = packetHandler.readTxRx(scs_id, SMS_STS_MIN_ANGLE_LIMIT_L,
+                                                     SMS_STS_CCW_DEAD + 1 - SMS_STS_MIN_ANGLE_LIMIT_L)
+            results.append(result)
+            roundtrips += len(results)
+            failures += len([result for result in results if result != COMM_SUCCESS])
+        return {'transactions': roundtrips, 'differences': failures}
+
+    def batched(packetHandler):
+        configurator = FleetConfigurator(packetHandler)
+        result, differences = configurator.apply(config)
+        if result != COMM_SUCCESS or differences:
+            raise AssertionError('batched configuration failed: %d servo(s) differ' % len(differences))
+        return {'transactions': configurator.frames + 1, 'differences': len(differences)}
+
+    results = {}
+    for name, configure in (('sequential', sequential), ('batched', batched)):
+        clock = VirtualClock()
+        portHandler, packetHandler = makeSimBus(scs_ids, baudrate, clock=clock)
+        start = time.perf_counter()
+        results[name] = configure(packetHandler)
+        results[name]['wall_ms'] = (time.perf_counter() - start) * 1000.0
+        results[name]['bus_ms'] = clock.now() / 1000000.0
+        portHandler.closePort()
+    results['speedup'] = results['sequential']['bus_ms'] / max(results['batched']['bus_ms'], 1e-9)
+    return results
+
+
+@benchmark('latency_profile')
+def benchLatencyProfile(servos=12, samples=20, slow_id=7, slow_delay=0.4, baudrates=(1000000, 115200)):
+    """
+    往返延迟分析基准测试
+    输入参数:
+        servos - 舵机数
+        samples - 每个舵机每种指令的测量次数
+        slow_id - 应答较慢的舵机ID
+        slow_delay - 该舵机的应答延迟（毫秒，其他舵机为仿真默认值）
+        baudrates - 测量的波特率，一半舵机使用第一个波特率，其余使用第二个
+    输出: 结果字典，包含每个波特率的推荐latency_timer、应用前后2字节读取的接收超时（毫秒）、
+          发现的慢舵机，以及测量占用的总线时间（毫秒，虚拟时钟）
+    功能: 带抖动的仿真总线；没有找出慢舵机时视为失败
+    """
+    scs_ids = list(range(1, servos + 1))
+    clock = VirtualClock()
+    portHandler, packetHandler = makeSimBus(scs_ids, baudrates[0], clock=clock, jitter=0.2)
+    for scs_id in scs_ids[servos // 2:]:
+        if scs_id != slow_id:
+            portHandler.servos[scs_id].memory[SMS_STS_BAUD_RATE] = SIM_BAUDRATES.index(baudrates[1])
+    portHandler.servos[slow_id].return_delay = slow_delay
+
+    profiler = LatencyProfiler(packetHandler)
+    found = profiler.profile(scs_ids, list(baudrates), samples)
+    results = {'bus_ms': clock.now() / 1000000.0}
+    for baudrate in baudrates:
+        portHandler.setBaudRate(baudrate)
+        portHandler.setPacketTimeout(6 + 2)
+        before = portHandler.packet_timeout_ns / 1000000.0
+        latency_timer = profiler.apply()
+        portHandler.setPacketTimeout(6 + 2)
+        results[str(baudrate)] = {
+            'servos': len(found.get(baudrate, [])),
+            'slow_servos': ','.join('%d' % scs_id for scs_id in profiler.slowServos(baudrate)) or 'none',
+            'latency_timer_ms': latency_timer,
+            'read_timeout_before_ms': before,
+            'read_timeout_after_ms': portHandler.packet_timeout_ns / 1000000.0,
+        }
+        portHandler.setLatencyTimer(LATENCY_TIMER)
+    portHandler.closePort()
+    if slow_id not in profiler.slowServos(baudrates[0]):
+        raise AssertionError('servo %d with a %.1f ms return delay was not reported as slow' % (slow_id, slow_delay))
+    return results
+
+
+@benchmark('baud_upgrade')
+def benchBaudUpgrade(servos=12, baudrate=115200, cycles=20, stuck_id=5):
+    """
+    总线波特率升级基准测试
+    输入参数:
+        servos - 舵机数
+        baudrate - 舵机的原波特率
+        cycles - 测量吞吐量的同步读取周期数
+        stuck_id - 回滚测试中不接受新波特率的舵机ID
+    输出: 结果字典，包括升级的目标波特率、升级前后的读取吞吐量（舵机/秒，虚拟时钟）和提升倍数、
+          升级占用的总线时间（毫秒），以及回滚测试的结果
+    功能: 第一条总线上所有舵机都能切换；第二条总线上一个舵机忽略波特率写入，
+          升级必须回滚并让所有舵机在原波特率下应答，否则视为失败
+    """
+    scs_ids = list(range(1, servos + 1))
+    results = {}
+    for name in ('upgrade', 'rollback'):
+        clock = VirtualClock()
+        portHandler, packetHandler = makeSimBus(scs_ids, baudrate, clock=clock)
+        if name == 'rollback':
+            portHandler.servos[stuck_id].baud_codes = set([BAUDRATE_CODES[baudrate]])
+        report = BaudRateUpgrader(packetHandler, block_size=16).upgrade(scs_ids, cycles)
+        responding = BusScanner(portHandler).scanBaudRate(scs_ids, 16)
+        portHandler.closePort()
+
+        results[name] = {'status': report['status'], 'to': report['to'], 'bus_ms': clock.now() / 1000000.0,
+                         'failed': ','.join('%d' % scs_id for scs_id in report['failed']) or 'none'}
+        if name == 'upgrade':
+            results[name].update({'before_reads_per_second': report['throughput_before'],
+                                  'after_reads_per_second': report['throughput_after'], 'gain': report['gain']})
+            if report['status'] != UPGRADE_UPGRADED or len(responding) != servos:
+                raise AssertionError('upgrade to %s failed: %s' % (report['to'], report['status']))
+        elif report['status'] != UPGRADE_ROLLED_BACK or portHandler.getBaudRate() != baudrate or \
+                len(responding) != servos:
+            raise AssertionError('rollback left %d of %d servo(s) at %d: %s' % (
+                len(responding), servos, baudrate, report['status']))
+    return results
+
+
+@benchmark('register_map')
+def benchRegisterMap(servos=12, cycles=2000):
+    """
+    内存表解码基准测试
+    输入参数:
+        servos - 舵机数
+        cycles - 每种方式的解码轮数
+    输出: 结果字典，包含每个舵机状态区间（56~70）的逐字段解码、区间解码器和批量解码耗时（纳秒），
+          以及批量解码使用的实现（numpy或list）
+    功能: 逐字段方式对每个字段调用getData并用scs_tohost处理符号位；区间解码器一次unpack；
+          三种方式的结果必须一致
+    """
+    scs_ids = list(range(1, servos + 1))
+    portHandler, packetHandler = makeSimBus(scs_ids)
+    for scs_id in scs_ids:
+        memory = portHandler.servos[scs_id].memory
+        memory[SMS_STS_PRESENT_SPEED_L:SMS_STS_PRESENT_SPEED_H + 1] = bytearray([scs_id, 0x80])  # 负速度
+        memory[SMS_STS_PRESENT_LOAD_L:SMS_STS_PRESENT_LOAD_H + 1] = bytearray([100 + scs_id, 0x04])  # 负负载
+    groupSyncRead = GroupSyncRead(packetHandler, STATUS_START_ADDRESS, STATUS_DATA_LENGTH)
+    for scs_id in scs_ids:
+        groupSyncRead.addParam(scs_id)
+    groupSyncRead.txRxPacket()
+    portHandler.closePort()
+
+    registerMap = getRegisterMap(packetHandler)
+    decoder = registerMap.getDecoder(STATUS_START_ADDRESS, STATUS_DATA_LENGTH)
+    data_table = groupSyncRead.data_table
+
+    def perField(scs_id):
+        values = {}
+        for register in decoder.registers:
+            value = groupSyncRead.getData(scs_id, register.address, register.length)
+            if register.sign_bit is not None:
+                value = packetHandler.scs_tohost(value, register.sign_bit)
+            values[register.name] = value
+        return values
+
+    def timed(function):
+        start = time.perf_counter()
+        for _ in range(cycles):
+            for scs_id in scs_ids:
+                function(scs_id)
+        return (time.perf_counter() - start) * 1e9 / (cycles * servos)
+
+    for scs_id in scs_ids:
+        if perField(scs_id) != decoder.decode(data_table[scs_id], 1):
+            raise AssertionError('decoder disagrees with getData for servo %d' % scs_id)
+    rows = [data_table[scs_id] for scs_id in scs_ids]
+    columns = decoder.decodeArrays(rows, 1)
+    if [int(value) for value in columns['present_speed']] != [perField(scs_id)['present_speed'] for scs_id in scs_ids]:
+        raise AssertionError('batch decoder disagrees with getData')
+
+    start = time.perf_counter()
+    for _ in range(cycles):
+        decoder.decodeArrays(rows, 1)
+    return {
+        'fields': len(decoder.names),
+        'per_field_ns': timed(perField),
+        'decoder_ns': timed(lambda scs_id: decoder.decode(data_table[scs_id], 1)),
+        'decoder_values_ns': timed(lambda scs_id: decoder.values(data_table[scs_id], 1)),
+        'batch_ns': (time.perf_counter() - start) * 1e9 / (cycles * servos),
+        'batch': 'list' if isinstance(columns['present_speed'], list) else 'numpy',
+    }
+
+
+# 读取规划基准测试的字段组合
+READ_PLAN_CASES = (
+    ('pos_load_temp', ('present_position', 'present_load', 'present_temperature')),
+    ('status', ('present_position', 'present_speed', 'present_load', 'present_voltage', 'present_temperature',
+                'moving', 'present_current')),
+    ('goal_and_present', ('goal_position', 'goal_speed', 'present_position', 'present_current')),
+    ('model_and_position', ('model', 'present_position')),
+)
+
+
+@benchmark('read_planner')
+def benchReadPlanner(servos=12, baudrates=(1000000, 115200), repeat=5):
+    """
+    读取区间规划基准测试
+    输入参数:
+        servos - 同步读取的舵机数
+        baudrates - 测试的波特率
+        repeat - 每种方式的重复次数
+    输出: 结果字典，(波特率, 字段组合, 单个/同步) -> 逐字段读取、一个覆盖区间和规划结果的区间数、
+          估算时间和仿真总线时间（毫秒，虚拟时钟）
+    功能: 仿真总线的应答延迟和接收延迟与规划器的代价模型一致；规划结果的总线时间
+          比另外两种方式多出1%以上时视为失败
+    """
+    scs_ids = list(range(1, servos + 1))
+    results = {}
+    for baudrate in baudrates:
+        clock = VirtualClock()
+        portHandler, packetHandler = makeSimBus(scs_ids, baudrate, clock=clock, turnaround=DEFAULT_RESPONSE_DELAY,
+                                                latency=DEFAULT_HOST_LATENCY)
+        planner = ReadPlanner(packetHandler)
+        registerMap = planner.register_map
+        for case, names in READ_PLAN_CASES:
+            for mode, count in (('single', 1), ('sync', servos)):
+                strategies = {
+                    'per_field': [(registerMap[name].address, registerMap[name].length) for name in names],
+                    'one_span': [registerMap.span(names)],
+                    'planned': planner.plan(names, count),
+                }
+                row = {}
+                for strategy, spans in sorted(strategies.items()):
+                    start = clock.now()
+                    for _ in range(repeat):
+                        for address, length in spans:
+                            if count == 1:
+                                packetHandler.readTxRx(scs_ids[0], address, length)
+                            else:
+                                groupSyncRead = GroupSyncRead(packetHandler, address, length)
+                                for scs_id in scs_ids:
+                                    groupSyncRead.addParam(scs_id)
+                                groupSyncRead.txRxPacket()
+                    row[strategy] = {'spans': len(spans), 'estimated_ms': planner.cost(spans, count),
+                                     'bus_ms': (clock.now() - start) / 1000000.0 / repeat}
+                results['%d %s %s' % (baudrate, case, mode)] = row
+                best = min(row['per_field']['bus_ms'], row['one_span']['bus_ms'])
+                if row['planned']['bus_ms'] > best * 1.01:
+                    raise AssertionError('plan for %s at %d (%s) took %.3f ms, best fixed strategy %.3f ms' % (
+                        case, baudrate, mode, row['planned']['bus_ms'], best))
+        values, result, _ = planner.read(scs_ids[0], READ_PLAN_CASES[0][1])
+        rows, sync_result = planner.syncRead(scs_ids, READ_PLAN_CASES[0][1])
+        if result != COMM_SUCCESS or sync_result != COMM_SUCCESS or len(rows) != servos or rows[scs_ids[0]] != values:
+            raise AssertionError('planned reads returned incomplete fields at %d' % baudrate)
+        portHandler.closePort()
+    return results
+
+
+def trajectoryTargets(scs_ids, cycle):
+    """
+    生成典型轨迹的目标值
+    输入参数:
+        scs_ids - 舵机ID列表
+        cycle - 周期序号
+    输出: 字典，舵机ID -> {字段名: 值}，字段与WritePosEx相同（加速度、目标位置、运行时间、目标速度）
+    功能: 四分之一的舵机连续跟踪正弦轨迹（只有位置变化），四分之一每10个周期换一个速度档，
+          四分之一每25个周期走到下一个点位（位置和速度同时变化），其余保持不动
+    """
+    targets = {}
+    quarter = max(1, len(scs_ids) // 4)
+    for index, scs_id in enumerate(scs_ids):
+        group = index // quarter
+        position, speed = 2048, 1000
+        if group == 0:
+            position = 2048 + int(800 * math.sin(cycle * 0.1 + index))
+        elif group == 1:
+            position = 2048 + 400 * ((cycle // 10) % 3)
+            speed = 500 + 250 * ((cycle // 10) % 4)
+        elif group == 2:
+            position = (1024 + 512 * (cycle // 25 + index)) % 4096
+            speed = 800 if (cycle // 25) % 2 else 1200
+        targets[scs_id] = {'acc': 50, 'goal_position': position, 'goal_time': 0, 'goal_speed': speed}
+    return targets
+
+
+@benchmark('write_planner')
+def benchWritePlanner(servos=12, cycles=200, baudrate=1000000):
+    """
+    最小差异写入基准测试
+    输入参数:
+        servos - 舵机数
+        cycles - 轨迹周期数
+        baudrate - 波特率
+    输出: 结果字典，每种方式的总线字节数（发送加状态包，按BusStats统计）、每周期平均字节数、
+          字节传输时间（毫秒）、等待状态包的总线时间（毫秒，虚拟时钟；同步写入不等待，为0）
+          和相对完整写入节省的字节数与比例
+    功能: 完整方式每周期用SyncWritePosEx/WritePosEx写入从SMS_STS_ACC开始的7个字节；
+          规划方式只写入变化的寄存器；结束时所有舵机的目标寄存器必须与最后一个周期的目标一致
+    """
+    scs_ids = list(range(1, servos + 1))
+    registerMap = getRegisterMap('sms_sts')
+
+    def fullSync(packetHandler, planner, targets):
+        for scs_id, values in sorted(targets.items()):
+            packetHandler.SyncWritePosEx(scs_id, values['goal_position'], values['goal_speed'], values['acc'])
+        packetHandler.groupSyncWrite.txPacket()
+        packetHandler.groupSyncWrite.clearParam()
+
+    def fullSingle(packetHandler, planner, targets):
+        for scs_id, values in sorted(targets.items()):
+            packetHandler.WritePosEx(scs_id, values['goal_position'], values['goal_speed'], values['acc'])
+
+    def plannedSync(packetHandler, planner, targets):
+        planner.syncWrite(targets)
+
+    def plannedSingle(packetHandler, planner, targets):
+        for scs_id, values in sorted(targets.items()):
+            planner.write(scs_id, values)
+
+    results = {}
+    for name, run in (('full_sync', fullSync), ('planned_sync', plannedSync), ('full_single', fullSingle),
+                      ('planned_single', plannedSingle)):
+        clock = VirtualClock()
+        portHandler, packetHandler = makeSimBus(scs_ids, baudrate, clock=clock)
+        planner = WritePlanner(packetHandler)
+        stats = portHandler.enableBusStats()
+        for cycle in range(cycles):
+            targets = trajectoryTargets(scs_ids, cycle)
+            run(packetHandler, planner, targets)
+        bus_bytes = sum(usage.tx_bytes + usage.rx_bytes for usage in stats.usage.values())
+        results[name] = {'bus_bytes': bus_bytes, 'bytes_per_cycle': bus_bytes / float(cycles),
+                         'wire_ms': bus_bytes * portHandler.tx_time_per_byte, 'bus_ms': clock.now() / 1000000.0}
+
+        expected = registerMap.getDecoder(SMS_STS_ACC, SMS_STS_GOAL_SPEED_H + 1 - SMS_STS_ACC)
+        for scs_id, values in targets.items():
+            actual = expected.decode(portHandler.servos[scs_id].memory, SMS_STS_ACC)
+            if actual != values:
+                raise AssertionError('%s left servo %d at %r, expected %r' % (name, scs_id, actual, values))
+        portHandler.closePort()
+
+    for planned, full in (('planned_sync', 'full_sync'), ('planned_single', 'full_single')):
+        results[planned]['bytes_saved'] = results[full]['bus_bytes'] - results[planned]['bus_bytes']
+        results[planned]['saved_ratio'] = results[planned]['bytes_saved'] / float(results[full]['bus_bytes'])
+    return results
+
+
+def main(argv=None):
+    """
+    命令行入口
+    输入参数: argv - 基准测试名称列表，空表示运行全部
+    输出: 整数，退出码；有基准测试失败（抛出AssertionError）时为1
+    功能: python -m scservo_sdk.bench [名称...]，可在构建中检查性能回退
+    """
+    names = (argv if argv is not None else sys.argv[1:]) or sorted(BENCHMARKS)
+    status = 0
+    for name in names:
+        print('%s:' % name)
+        try:
+            print(formatResult(runBenchmark(name), 2))
+        except AssertionError as error:
+            print('  FAILED: %s' % error)
+            status = 1
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,173 @@
+#!/usr/bin/env python
+
+from .scservo_def import *
+from .protocol_packet_handler import *
+from .group_sync_read import *
+from .sms_sts import *
+
+# 舵机波特率代码 -> 实际波特率
+BAUDRATE_TABLE = {
+    SMS_STS_1M: 1000000,
+    SMS_STS_0_5M: 500000,
+    SMS_STS_250K: 250000,
+    SMS_STS_128K: 128000,
+    SMS_STS_115200: 115200,
+    SMS_STS_76800: 76800,
+    SMS_STS_57600: 57600,
+    SMS_STS_38400: 38400,
+}
+
+# 默认扫描的波特率（从快到慢）
+DEFAULT_SCAN_BAUDRATES = [BAUDRATE_TABLE[code] for code in sorted(BAUDRATE_TABLE)]
+
+# 型号寄存器地址和长度
+MODEL_ADDRESS = SMS_STS_MODEL_L
+MODEL_LENGTH = 2
+
+# 默认应答延迟余量（毫秒），包括舵机返回延迟和USB转串口的延迟
+DEFAULT_SCAN_TURNAROUND = 2.0
+
+
+class BusScanner(object):
+    def __init__(self, portHandler, protocol_end=0, turnaround=DEFAULT_SCAN_TURNAROUND):
+        """
+        初始化总线扫描器
+        输入参数:
+            portHandler - 已打开的串口处理器
+            protocol_end - 协议端序（STS/SMS/HLS=0, SCSCL=1）
+            turnaround - 应答延迟余量（毫秒），超时时间 = 理论传输时间 + 该余量
+        功能: 使用由波特率计算出的短超时时间探测舵机，在同一次往返中读取型号
+        """
+        self.portHandler = portHandler
+        self.ph = protocol_packet_handler(portHandler, protocol_end)
+        self.turnaround = turnaround
+
+    def probeTimeout(self, tx_length, rx_length):
+        """
+        计算探测超时时间
+        输入参数:
+            tx_length - 发送字节数
+            rx_length - 期望接收字节数
+        输出: 浮点数，超时时间（毫秒）
+        功能: 按当前波特率的每字节传输时间加应答延迟余量计算
+        """
+        return (tx_length + rx_length) * self.portHandler.tx_time_per_byte + self.turnaround
+
+    def probeId(self, scs_id):
+        """
+        探测单个舵机
+        输入参数: scs_id - 舵机ID
+        输出: 整数，舵机型号；无应答时返回None
+        功能: 发送一条读取型号寄存器的指令（代替PING加读取两次往返），使用短超时
+        """
+        port = self.portHandler
+        previous = port.limitPacketDeadline(port.getCurrentTime() + self.probeTimeout(8, 6 + MODEL_LENGTH))
+        try:
+            data, result, error = self.ph.readTxRx(scs_id, MODEL_ADDRESS, MODEL_LENGTH)
+        finally:
+            port.setPacketDeadline(previous)
+
+        if result != COMM_SUCCESS or len(data) < MODEL_LENGTH:
+            return None
+        return self.ph.scs_makeword(data[0], data[1])
+
+    def probeBlock(self, scs_ids):
+        """
+        使用同步读取探测一组舵机
+        输入参数: scs_ids - 候选舵机ID列表
+        输出: 字典，舵机ID -> 型号（只包含有应答的舵机）
+        功能: 一条同步读取指令读取整组候选ID的型号寄存器，舵机依次应答，
+              只等待整组应答的理论传输时间加一次应答延迟余量
+        """
+        groupSyncRead = GroupSyncRead(self.ph, MODEL_ADDRESS, MODEL_LENGTH)
+        for scs_id in scs_ids:
+            groupSyncRead.addParam(scs_id)
+
+        port = self.portHandler
+        count = len(scs_ids)
+        timeout = self.probeTimeout(8 + count, (6 + MODEL_LENGTH) * count)
+        previous = port.limitPacketDeadline(port.getCurrentTime() + timeout)
+        try:
+            groupSyncRead.txRxPacket()
+        finally:
+            port.setPacketDeadline(previous)
+
+        found = {}
+        for scs_id in scs_ids:
+            available, _ = groupSyncRead.isAvailable(scs_id, MODEL_ADDRESS, MODEL_LENGTH)
+            if available:
+                found[scs_id] = groupSyncRead.getData(scs_id, MODEL_ADDRESS, MODEL_LENGTH)
+        return found
+
+    def scanBaudRate(self, scs_ids, block_size=0):
+        """
+        在当前波特率下扫描
+        输入参数:
+            scs_ids - 候选舵机ID列表
+            block_size - 同步读取探测的分组大小，0表示逐个探测
+        输出: 字典，舵机ID -> 型号
+        功能: 逐个或分组探测候选ID
+        """
+        scs_ids = list(scs_ids)
+        found = {}
+        if block_size > 0:
+            for index in range(0, len(scs_ids), block_size):
+                found.update(self.probeBlock(scs_ids[index:index + block_size]))
+        else:
+            for scs_id in scs_ids:
+                model = self.probeId(scs_id)
+                if model is not None:
+                    found[scs_id] = model
+        return found
+
+    def scan(self, scs_ids=None, baudrates=None, block_size=0):
+        """
+        扫描总线
+        输入参数:
+            scs_ids - 候选舵机ID列表，None表示0到MAX_ID
+            baudrates - 要扫描的波特率列表，None表示所有舵机支持的波特率
+            block_size - 同步读取探测的分组大小，0表示逐个探测
+        输出: (发现结果, 冲突列表) 元组；发现结果为字典，舵机ID -> (波特率, 型号)；
+              冲突列表包含在多个波特率下都有应答的(舵机ID, 波特率, 型号)
+        功能: 依次切换波特率扫描所有候选ID，扫描结束后恢复原波特率
+        """
+        if scs_ids is None:
+            scs_ids = range(0, MAX_ID + 1)
+        if baudrates is None:
+            baudrates = DEFAULT_SCAN_BAUDRATES
+
+        port = self.portHandler
+        original_baudrate = port.getBaudRate()
+        found = {}
+        conflicts = []
+        try:
+            for baudrate in baudrates:
+                if not port.setBaudRate(baudrate):
+                    continue
+                for scs_id, model in self.scanBaudRate(scs_ids, block_size).items():
+                    if scs_id in found:
+                        conflicts.append((scs_id, baudrate, model))
+                    else:
+                        found[scs_id] = (baudrate, model)
+        finally:
+            port.setBaudRate(original_baudrate)
+
+        return found, conflicts
+
+
+def scanBus(portHandler, scs_ids=None, baudrates=None, block_size=0, protocol_end=0,
+            turnaround=DEFAULT_SCAN_TURNAROUND):
+    """
+    扫描总线上的舵机
+    输入参数:
+        portHandler - 已打开的串口处理器
+        scs_ids - 候选舵机ID列表，None表示0到MAX_ID
+        baudrates - 要扫描的波特率列表，None表示所有舵机支持的波特率
+        block_size - 同步读取探测的分组大小，0表示逐个探测
+        protocol_end - 协议端序（STS/SMS/HLS=0, SCSCL=1）
+        turnaround - 应答延迟余量（毫秒）
+    输出: 字典，舵机ID -> (波特率, 型号)
+    功能: BusScanner.scan的简便封装，忽略冲突列表
+    """
+    found, _ = BusScanner(portHandler, protocol_end, turnaround).scan(scs_ids, baudrates, block_size)
+    return found
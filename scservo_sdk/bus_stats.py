@@ -0,0 +1,160 @@
+#!/usr/bin/env python
+
+from .protocol_packet_handler import PKT_INSTRUCTION
+
+# 帧头和校验和等非有效载荷字节数（HEADER0 HEADER1 ID LENGTH INSTRUCTION/ERROR CHECKSUM）
+FRAME_OVERHEAD = 6
+
+
+class InstructionUsage(object):
+    __slots__ = ('packets', 'tx_bytes', 'rx_bytes', 'tx_payload', 'rx_payload', 'turnaround_time')
+
+    def __init__(self):
+        """
+        初始化单个指令类型的总线占用统计
+        输入参数: 无
+        功能: 所有计数器清零
+        """
+        self.packets = 0  # 指令包数量
+        self.tx_bytes = 0  # 发送字节数
+        self.rx_bytes = 0  # 接收字节数
+        self.tx_payload = 0  # 发送有效载荷字节数
+        self.rx_payload = 0  # 接收有效载荷字节数
+        self.turnaround_time = 0.0  # 等待舵机应答的时间（毫秒）
+
+
+class BusStats(object):
+    def __init__(self, port):
+        """
+        初始化总线利用率统计
+        输入参数: port - PortHandler对象
+        功能: 根据每字节传输时间和实际时间戳，统计总线上的字节数、理论传输时间、
+              等待舵机应答的时间和空闲时间，并按指令类型分类
+        """
+        self.port = port
+        self.reset()
+
+    def reset(self):
+        """
+        清空统计数据
+        输入参数: 无
+        输出: 无
+        功能: 所有计数器清零并以当前时间作为统计起点
+        """
+        self.start_time = self.port.getCurrentTime()  # 统计起始时间（毫秒）
+        self.usage = {}  # 指令代码 -> InstructionUsage
+        self.instruction = None  # 最近发送的指令
+        self.tx_end_time = None  # 最近一次发送的估算结束时间，收到首字节后置为None
+        self.rx_header = []  # 正在解析的接收帧头
+        self.rx_remaining = 0  # 当前接收帧剩余的字节数
+
+    def getUsage(self, instruction):
+        """
+        获取指定指令的统计对象，不存在时创建
+        输入参数: instruction - 指令代码
+        输出: InstructionUsage对象
+        功能: 返回用于累加的统计对象
+        """
+        usage = self.usage.get(instruction)
+        if usage is None:
+            usage = self.usage[instruction] = InstructionUsage()
+        return usage
+
+    def onTx(self, packet, length, now):
+        """
+        记录一次发送
+        输入参数:
+            packet - 发送的数据包
+            length - 实际写入的字节数
+            now - 写入时间（毫秒）
+        输出: 无
+        功能: 按指令类型累加发送字节数和有效载荷，并估算发送结束时间
+        """
+        self.instruction = packet[PKT_INSTRUCTION] if len(packet) > PKT_INSTRUCTION else None
+        usage = self.getUsage(self.instruction)
+        usage.packets += 1
+        usage.tx_bytes += length
+        usage.tx_payload += max(0, length - FRAME_OVERHEAD)
+        self.tx_end_time = now + length * self.port.tx_time_per_byte
+        self.rx_header = []
+        self.rx_remaining = 0
+
+    def onRx(self, data, now):
+        """
+        记录一次接收
+        输入参数:
+            data - 读取到的字节
+            now - 读取时间（毫秒）
+        输出: 无
+        功能: 累加接收字节数，按帧头解析有效载荷字节数，并由首字节时间计算应答等待时间
+        """
+        length = len(data)
+        usage = self.getUsage(self.instruction)
+        usage.rx_bytes += length
+
+        if self.tx_end_time is not None:
+            # 首字节到达时间 = 读取时间 - 本次数据的传输时间
+            first_byte_time = now - length * self.port.tx_time_per_byte
+            usage.turnaround_time += max(0.0, first_byte_time - self.tx_end_time)
+            self.tx_end_time = None
+
+        # 解析帧边界：帧头4字节（0xFF 0xFF ID LENGTH），之后LENGTH字节中前1字节为错误码，最后1字节为校验和
+        index = 0
+        while index < length:
+            if self.rx_remaining:
+                step = min(self.rx_remaining, length - index)
+                self.rx_remaining -= step
+                index += step
+                continue
+            byte = data[index]
+            index += 1
+            header = self.rx_header
+            if len(header) < 2:
+                if byte == 0xFF:
+                    header.append(byte)
+                else:
+                    del header[:]
+            elif len(header) == 2:
+                if byte != 0xFF:
+                    header.append(byte)  # ID
+            else:
+                self.rx_remaining = byte
+                usage.rx_payload += max(0, byte - 2)
+                del header[:]
+
+    def report(self):
+        """
+        生成总线利用率报告
+        输入参数: 无
+        输出: 字典，包含总体和按指令分类的统计
+        功能: 计算每秒字节数、理论传输时间、应答等待时间、空闲时间、利用率百分比和有效载荷比
+        """
+        elapsed = max(self.port.getCurrentTime() - self.start_time, 1e-9)
+        tx_time_per_byte = self.port.tx_time_per_byte
+
+        def summarize(items):
+            tx_bytes = sum(usage.tx_bytes for usage in items)
+            rx_bytes = sum(usage.rx_bytes for usage in items)
+            payload = sum(usage.tx_payload + usage.rx_payload for usage in items)
+            wire_time = (tx_bytes + rx_bytes) * tx_time_per_byte
+            turnaround_time = sum(usage.turnaround_time for usage in items)
+            total = tx_bytes + rx_bytes
+            return {
+                'packets': sum(usage.packets for usage in items),
+                'tx_bytes': tx_bytes,
+                'rx_bytes': rx_bytes,
+                'payload_bytes': payload,
+                'bytes_per_second': total * 1000.0 / elapsed,
+                'wire_time': wire_time,
+                'turnaround_time': turnaround_time,
+                'utilization': 100.0 * wire_time / elapsed,
+                'occupancy': 100.0 * (wire_time + turnaround_time) / elapsed,
+                'efficiency': float(payload) / total if total else 0.0,
+            }
+
+        report = summarize(list(self.usage.values()))
+        report['elapsed'] = elapsed
+        report['idle_time'] = max(0.0, elapsed - report['wire_time'] - report['turnaround_time'])
+        report['by_instruction'] = dict((instruction, summarize([usage]))
+                                        for instruction, usage in self.usage.items())
+        return report
@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+
+import time
+
+try:
+    monotonic_ns = time.monotonic_ns
+except AttributeError:  # Python 3.7之前没有monotonic_ns
+    _monotonic = getattr(time, 'monotonic', time.time)
+
+    def monotonic_ns():
+        return int(_monotonic() * 1000000000)
+
+
+class MonotonicClock(object):
+    def now(self):
+        """
+        获取当前时间
+        输入参数: 无
+        输出: 整数，单调时钟纳秒，不受系统时间调整影响
+        """
+        return monotonic_ns()
+
+    def sleep(self, ns):
+        """
+        等待
+        输入参数: ns - 等待时间（纳秒）
+        输出: 无
+        """
+        if ns > 0:
+            time.sleep(ns / 1000000000.0)
+
+    def idle(self, until=None):
+        """
+        接收循环中没有可读数据时调用
+        输入参数: until - 下一个数据可读的时间（纳秒），None表示未知
+        输出: 无
+        功能: 真实时钟继续轮询，不做任何操作
+        """
+        pass
+
+
+class VirtualClock(object):
+    def __init__(self, start=0, idle_step=100000):
+        """
+        初始化虚拟时钟
+        输入参数:
+            start - 起始时间（纳秒）
+            idle_step - 没有可读数据且不知道下一个数据何时到达时每次推进的时间（纳秒）
+        功能: 时间只在显式推进时前进；与仿真或回放端口配合，等待应答时直接跳到数据
+              可读的时间，基准测试可快于实时运行且超时行为确定
+        """
+        self.time = start
+        self.idle_step = idle_step
+
+    def now(self):
+        """
+        获取当前时间
+        输入参数: 无
+        输出: 整数，虚拟时间（纳秒）
+        """
+        return self.time
+
+    def advance(self, ns):
+        """
+        推进时间
+        输入参数: ns - 推进的时间（纳秒）
+        输出: 无
+        """
+        self.time += ns
+
+    def advanceTo(self, ns):
+        """
+        推进到指定时间
+        输入参数: ns - 目标时间（纳秒），早于当前时间时不做任何操作
+        输出: 无
+        """
+        if ns > self.time:
+            self.time = ns
+
+    def sleep(self, ns):
+        """
+        等待（立即返回，只推进时间）
+        输入参数: ns - 等待时间（纳秒）
+        输出: 无
+        """
+        if ns > 0:
+            self.time += ns
+
+    def idle(self, until=None):
+        """
+        接收循环中没有可读数据时调用
+        输入参数: until - 下一个数据可读的时间（纳秒），None表示未知
+        输出: 无
+        功能: 跳到下一个数据可读的时间；未知时推进idle_step，使等待最终超时
+        """
+        if until is not None and until > self.time:
+            self.time = until
+        else:
+            self.time += self.idle_step
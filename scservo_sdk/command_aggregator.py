@@ -0,0 +1,268 @@
+#!/usr/bin/env python
+
+import threading
+
+from .scservo_def import *
+from .protocol_packet_handler import TXPACKET_MAX_LEN
+from .group_sync_write import *
+
+# 默认发送周期（毫秒）
+DEFAULT_TICK_PERIOD = 10.0
+
+
+class CommandAggregator(object):
+    def __init__(self, ph, period=DEFAULT_TICK_PERIOD):
+        """
+        初始化指令汇总器
+        输入参数:
+            ph - 协议包处理器对象（sms_sts/hls/scscl），使用其groupSyncWrite的起始地址和长度
+            period - 发送周期（毫秒），start启动的后台线程按该周期调用flush
+        功能: 任意线程提交的目标指令按舵机ID保存，同一舵机只保留最后一次提交；
+              每个周期把所有待发送的指令合并为一条同步写入帧发送，不等待应答；
+              帧发送失败时其中的指令放回待发送表，下个周期重发
+        """
+        self.ph = ph
+        self.period = period
+        self.start_address = ph.groupSyncWrite.start_address
+        self.data_length = ph.groupSyncWrite.data_length
+        self.groupSyncWrite = GroupSyncWrite(ph, self.start_address, self.data_length)
+        # 一条同步写入帧最多容纳的舵机数（8: 包头、ID、长度、指令、起始地址、数据长度和校验和）
+        self.frame_capacity = (TXPACKET_MAX_LEN - 8) // (1 + self.data_length)
+
+        self.lock = threading.Lock()  # 保护待发送指令表
+        self.pending = {}  # 舵机ID -> (数据, 是否强制发送, 提交时间(毫秒))
+        self.thread = None  # 周期发送线程
+        self.running = False  # 周期发送线程是否运行
+
+        self.reset()
+
+    def reset(self):
+        """
+        清空统计数据
+        输入参数: 无
+        输出: 无
+        """
+        self.commands = 0  # 提交的指令数
+        self.superseded = 0  # 发送前被同一舵机的新指令覆盖的指令数
+        self.sent = 0  # 随同步写入帧发送的指令数
+        self.flushes = 0  # 执行发送的周期数
+        self.frames = 0  # 发送的同步写入帧数
+        self.failures = 0  # 有帧发送失败的周期数
+        self.failed_frames = 0  # 发送失败的同步写入帧数
+        self.requeued = 0  # 因帧发送失败放回待发送表的指令数
+        self.dropped = 0  # 因帧发送失败且已被同一舵机的新指令覆盖而丢弃的指令数
+        self.flush_time = 0.0  # flush耗时总和（毫秒）
+        self.flush_time_max = 0.0  # flush最大耗时（毫秒）
+        self.latency_sum = 0.0  # 指令从提交到发送的时间总和（毫秒）
+        self.latency_max = 0.0  # 指令从提交到发送的最大时间（毫秒）
+        self.stats_start = self.ph.portHandler.getCurrentTime()  # 统计开始时间（毫秒）
+
+    def submit(self, scs_id, data, force=False):
+        """
+        提交一条指令
+        输入参数:
+            scs_id - 舵机ID
+            data - 从groupSyncWrite起始地址开始的数据（长度等于data_length）
+            force - 开启写入去重时，是否强制发送与上次相同的值
+        输出: 布尔值，数据长度不符时返回False
+        功能: 保存为该舵机的待发送指令，覆盖尚未发送的旧指令
+        """
+        if len(data) != self.data_length:
+            return False
+
+        now = self.ph.portHandler.getCurrentTime()
+        with self.lock:
+            if scs_id in self.pending:
+                self.superseded += 1
+            self.pending[scs_id] = (data, force, now)
+            self.commands += 1
+        return True
+
+    def WritePosEx(self, scs_id, position, speed, acc, torque=None, force=False):
+        """
+        提交位置指令（与sms_sts.WritePosEx的数据布局相同，hls需给出torque）
+        输入参数:
+            scs_id - 舵机ID
+            position - 目标位置
+            speed - 运动速度
+            acc - 加速度
+            torque - 转矩限制（仅hls），None时写0
+            force - 开启写入去重时，是否强制发送与上次相同的值
+        输出: 布尔值，是否提交成功
+        """
+        position = self.ph.scs_toscs(position, 15)
+        torque = torque or 0
+        txpacket = [acc, self.ph.scs_lobyte(position), self.ph.scs_hibyte(position), self.ph.scs_lobyte(torque),
+                    self.ph.scs_hibyte(torque), self.ph.scs_lobyte(speed), self.ph.scs_hibyte(speed)]
+        return self.submit(scs_id, txpacket, force)
+
+    def WriteSpec(self, scs_id, speed, acc, torque=None, force=False):
+        """
+        提交速度指令（与sms_sts.WriteSpec的数据布局相同，hls需给出torque）
+        输入参数:
+            scs_id - 舵机ID
+            speed - 目标速度
+            acc - 加速度
+            torque - 转矩限制（仅hls），None时写0
+            force - 开启写入去重时，是否强制发送与上次相同的值
+        输出: 布尔值，是否提交成功
+        """
+        speed = self.ph.scs_toscs(speed, 15)
+        torque = torque or 0
+        txpacket = [acc, 0, 0, self.ph.scs_lobyte(torque), self.ph.scs_hibyte(torque),
+                    self.ph.scs_lobyte(speed), self.ph.scs_hibyte(speed)]
+        return self.submit(scs_id, txpacket, force)
+
+    def WritePos(self, scs_id, position, time, speed, force=False):
+        """
+        提交位置指令（与scscl.WritePos的数据布局相同）
+        输入参数:
+            scs_id - 舵机ID
+            position - 目标位置
+            time - 运动时间
+            speed - 运动速度
+            force - 开启写入去重时，是否强制发送与上次相同的值
+        输出: 布尔值，是否提交成功
+        """
+        txpacket = [self.ph.scs_lobyte(position), self.ph.scs_hibyte(position), self.ph.scs_lobyte(time),
+                    self.ph.scs_hibyte(time), self.ph.scs_lobyte(speed), self.ph.scs_hibyte(speed)]
+        return self.submit(scs_id, txpacket, force)
+
+    def flush(self):
+        """
+        发送所有待发送的指令
+        输入参数: 无
+        输出: 通信结果代码；没有待发送指令时返回COMM_NOT_AVAILABLE
+        功能: 取出待发送指令表，跳过与上次发送相同的值后合并为一条同步写入帧发送；
+              舵机数超过一帧的容量时拆分为最少的帧数；发送失败的帧中的指令放回待发送表，
+              除非发送期间同一舵机已提交了新指令
+        """
+        port = self.ph.portHandler
+        with port.bus_lock:
+            with self.lock:
+                pending = self.pending
+                self.pending = {}
+
+            start = port.getCurrentTime()
+            entries = []
+            for scs_id, (data, force, submit_time) in pending.items():
+                if not force and self.ph.isDuplicateWrite(scs_id, self.start_address, data, 1 + len(data)):
+                    continue
+                entries.append((scs_id, data, force, submit_time))
+
+            if not entries:
+                return COMM_NOT_AVAILABLE
+
+            groupSyncWrite = self.groupSyncWrite
+            groupSyncWrite.write_dedup = self.ph.write_dedup
+            result = COMM_SUCCESS
+            sent_times = []
+            failed = []
+            for index in range(0, len(entries), self.frame_capacity):
+                frame = entries[index:index + self.frame_capacity]
+                groupSyncWrite.clearParam()
+                for scs_id, data, _, _ in frame:
+                    groupSyncWrite.addParam(scs_id, data)
+                frame_result = groupSyncWrite.txPacket()
+                self.frames += 1
+                if frame_result == COMM_SUCCESS:
+                    sent_times.extend(submit_time for _, _, _, submit_time in frame)
+                else:
+                    self.failed_frames += 1
+                    failed.extend(frame)
+                    result = frame_result
+            end = port.getCurrentTime()
+
+            if failed:
+                with self.lock:
+                    for scs_id, data, force, submit_time in failed:
+                        if scs_id in self.pending:
+                            self.dropped += 1  # 已有更新的指令
+                        else:
+                            self.pending[scs_id] = (data, force, submit_time)
+                            self.requeued += 1
+
+        self.flushes += 1
+        elapsed = end - start
+        self.flush_time += elapsed
+        self.flush_time_max = max(self.flush_time_max, elapsed)
+        if result != COMM_SUCCESS:
+            self.failures += 1
+
+        self.sent += len(sent_times)
+        for submit_time in sent_times:
+            latency = end - submit_time
+            self.latency_sum += latency
+            self.latency_max = max(self.latency_max, latency)
+        return result
+
+    def start(self):
+        """
+        启动周期发送线程
+        输入参数: 无
+        输出: 无
+        """
+        if self.thread is not None:
+            return
+        self.running = True
+        self.thread = threading.Thread(target=self.run)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def stop(self):
+        """
+        停止周期发送线程
+        输入参数: 无
+        输出: 无
+        功能: 等待线程退出并发送最后一批指令
+        """
+        if self.thread is None:
+            return
+        self.running = False
+        self.thread.join()
+        self.thread = None
+        self.flush()
+
+    def run(self):
+        """
+        周期发送线程主循环
+        输入参数: 无
+        输出: 无
+        功能: 按端口时钟以固定周期调用flush，不因flush耗时产生累积漂移
+        """
+        clock = self.ph.portHandler.clock
+        period = int(self.period * 1000000)  # 纳秒
+        next_tick = clock.now()
+        while self.running:
+            self.flush()
+            next_tick += period
+            delay = next_tick - clock.now()
+            if delay > 0:
+                clock.sleep(delay)
+            else:
+                next_tick = clock.now()
+
+    def getStats(self):
+        """
+        获取统计数据
+        输入参数: 无
+        输出: 字典，包含提交/发送的指令数和速率、帧数、flush耗时和指令延迟（毫秒）
+        """
+        elapsed = (self.ph.portHandler.getCurrentTime() - self.stats_start) / 1000.0
+        return {
+            'commands': self.commands,
+            'superseded': self.superseded,
+            'sent': self.sent,
+            'flushes': self.flushes,
+            'frames': self.frames,
+            'failures': self.failures,
+            'failed_frames': self.failed_frames,
+            'requeued': self.requeued,
+            'dropped': self.dropped,
+            'commands_per_second': self.commands / elapsed if elapsed > 0 else 0.0,
+            'sent_per_second': self.sent / elapsed if elapsed > 0 else 0.0,
+            'flush_time_avg': self.flush_time / self.flushes if self.flushes else 0.0,
+            'flush_time_max': self.flush_time_max,
+            'latency_avg': self.latency_sum / self.sent if self.sent else 0.0,
+            'latency_max': self.latency_max,
+        }
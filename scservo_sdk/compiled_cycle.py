@@ -0,0 +1,323 @@
+#!/usr/bin/env python
+
+from .scservo_def import *
+from .protocol_packet_handler import *
+
+
+class CompiledCycle(object):
+    def __init__(self, ph, scs_ids, write_address=None, write_length=0, read_address=None, read_length=0):
+        """
+        初始化预编译控制周期
+        输入参数:
+            ph - 协议包处理器对象（sms_sts/hls/scscl）
+            scs_ids - 舵机ID列表，顺序固定
+            write_address - 同步写入的起始地址，None表示周期内不写入
+            write_length - 每个舵机写入的字节数
+            read_address - 同步读取的起始地址，None表示周期内不读取
+            read_length - 每个舵机读取的字节数
+        功能: 一次性分配同步写入包、同步读取包和应答缓冲区，并为每个舵机建立指向缓冲区的
+              memoryview；run在预热之后不再创建Python对象（串口与时钟内部除外），
+              稳定运行时不会触发垃圾回收
+        """
+        self.ph = ph
+        self.port = ph.portHandler
+        self.scs_ids = list(scs_ids)
+        self.count = len(self.scs_ids)
+        self.index = dict((scs_id, index) for index, scs_id in enumerate(self.scs_ids))
+        self.indices = list(range(self.count))
+
+        self.write_address = write_address
+        self.write_length = write_length
+        self.write_packet = None  # 同步写入包
+        self.write_data = {}  # 舵机ID -> 同步写入包中该舵机数据的memoryview
+        if write_address is not None:
+            # 8: HEADER0 HEADER1 ID LEN INST START_ADDR DATA_LEN ... CHKSUM
+            self.write_packet = bytearray(8 + self.count * (1 + write_length))
+            packet_view = memoryview(self.write_packet)
+            self.fillHeader(self.write_packet, INST_SYNC_WRITE, write_address, write_length)
+            for index, scs_id in enumerate(self.scs_ids):
+                offset = 7 + index * (1 + write_length)
+                self.write_packet[offset] = scs_id
+                self.write_data[scs_id] = packet_view[offset + 1:offset + 1 + write_length]
+            self.write_body = packet_view[2:-1]  # 参与校验和计算的部分
+            self.write_checksum_index = len(self.write_packet) - 1
+            self.write_size = len(self.write_packet)
+
+        self.read_address = read_address
+        self.read_length = read_length
+        self.read_packet = None  # 同步读取包
+        self.read_data = {}  # 舵机ID -> 应答缓冲区中该舵机数据的memoryview
+        self.errors = bytearray(self.count)  # 每个舵机的错误位
+        self.valid = bytearray(self.count)  # 每个舵机本周期的数据是否有效
+        if read_address is not None:
+            self.read_packet = bytearray(8 + self.count)
+            self.fillHeader(self.read_packet, INST_SYNC_READ, read_address, read_length)
+            self.read_packet[7:7 + self.count] = bytearray(self.scs_ids)
+            self.read_packet[-1] = ~sum(self.read_packet[2:-1]) & 0xFF  # 读取包内容固定，校验和只计算一次
+            self.read_size = len(self.read_packet)
+
+            self.frame_length = 6 + read_length  # HEADER0 HEADER1 ID LENGTH ERROR ... CHKSUM
+            self.rx_buffer = bytearray(self.frame_length * self.count)
+            self.rx_view = memoryview(self.rx_buffer)
+            self.rx_size = len(self.rx_buffer)
+            # 从每个偏移开始的剩余部分，分多次读取时不必每次切片创建新的memoryview
+            self.rx_tails = [self.rx_view[offset:] for offset in range(self.rx_size)]
+            self.frames = []  # 每个舵机应答帧的memoryview
+            self.frame_bodies = []  # 每个舵机应答帧中参与校验和计算的部分
+            for index, scs_id in enumerate(self.scs_ids):
+                offset = index * self.frame_length
+                self.frames.append(self.rx_view[offset:offset + self.frame_length])
+                self.frame_bodies.append(self.rx_view[offset + 2:offset + self.frame_length - 1])
+                self.read_data[scs_id] = self.rx_view[offset + 5:offset + 5 + read_length]
+
+        self.compile()
+
+    def fillHeader(self, packet, instruction, address, length):
+        """
+        填写同步指令包头
+        输入参数:
+            packet - 指令包缓冲区
+            instruction - 指令（INST_SYNC_WRITE/INST_SYNC_READ）
+            address - 起始地址
+            length - 每个舵机的数据长度
+        输出: 无
+        """
+        packet[PKT_HEADER0] = 0xFF
+        packet[PKT_HEADER1] = 0xFF
+        packet[PKT_ID] = BROADCAST_ID
+        packet[PKT_LENGTH] = len(packet) - 4
+        packet[PKT_INSTRUCTION] = instruction
+        packet[PKT_PARAMETER0] = address
+        packet[PKT_PARAMETER0 + 1] = length
+
+    def compile(self):
+        """
+        计算与端口设置有关的参数
+        输入参数: 无
+        输出: 无
+        功能: 按当前波特率和latency_timer计算接收超时时间；修改波特率或latency_timer后需再次调用
+        """
+        if self.read_packet is not None:
+            port = self.port
+            self.read_timeout_ns = int(((port.tx_time_per_byte * self.rx_size) + (port.tx_time_per_byte * 3.0) +
+                                        port.latency_timer) * 1000000)
+
+    def setByte(self, scs_id, address, value):
+        """
+        设置写入数据的一个字节
+        输入参数:
+            scs_id - 舵机ID
+            address - 内存地址（在写入范围内）
+            value - 字节值
+        输出: 无
+        """
+        self.write_data[scs_id][address - self.write_address] = value
+
+    def setWord(self, scs_id, address, value):
+        """
+        设置写入数据的一个字（按协议端序）
+        输入参数:
+            scs_id - 舵机ID
+            address - 低字节地址（在写入范围内）
+            value - 字值
+        输出: 无
+        """
+        data = self.write_data[scs_id]
+        offset = address - self.write_address
+        data[offset] = self.ph.scs_lobyte(value)
+        data[offset + 1] = self.ph.scs_hibyte(value)
+
+    def getByte(self, scs_id, address):
+        """
+        获取本周期读取的一个字节
+        输入参数:
+            scs_id - 舵机ID
+            address - 内存地址（在读取范围内）
+        输出: 整数，字节值
+        """
+        return self.read_data[scs_id][address - self.read_address]
+
+    def getWord(self, scs_id, address):
+        """
+        获取本周期读取的一个字（按协议端序）
+        输入参数:
+            scs_id - 舵机ID
+            address - 低字节地址（在读取范围内）
+        输出: 整数，字值
+        """
+        data = self.read_data[scs_id]
+        offset = address - self.read_address
+        return self.ph.scs_makeword(data[offset], data[offset + 1])
+
+    def isAvailable(self, scs_id):
+        """
+        检查本周期是否收到该舵机的有效数据
+        输入参数: scs_id - 舵机ID
+        输出: (是否有效, 错误位) 元组
+        """
+        index = self.index[scs_id]
+        return self.valid[index] == 1, self.errors[index]
+
+    def run(self):
+        """
+        执行一个控制周期
+        输入参数: 无
+        输出: 通信结果代码
+        功能: 发送同步写入包（如有），再发送同步读取包并把应答直接读入预分配的缓冲区；
+              应答完整时原位校验每一帧，不完整时逐字节重新同步
+        """
+        port = self.port
+        port.bus_lock.acquire()  # with语句每次都会创建__enter__/__exit__绑定方法对象
+        try:
+            if port.is_using:
+                return COMM_PORT_BUSY
+            port.is_using = True
+            try:
+                result = COMM_SUCCESS
+                if self.write_packet is not None:
+                    result = self.txWrite()
+                if result == COMM_SUCCESS and self.read_packet is not None:
+                    result = self.txRxRead()
+            finally:
+                port.is_using = False
+        finally:
+            port.bus_lock.release()
+        return result
+
+    def checksum(self, body):
+        """
+        计算校验和
+        输入参数: body - 参与计算的字节（memoryview）
+        输出: 整数，校验和
+        功能: 内置sum对整数在C层累加，只在返回时创建一个整数对象，计算后立即释放
+        """
+        return ~sum(body) & 0xFF
+
+    def txWrite(self):
+        """
+        发送同步写入包
+        输入参数: 无
+        输出: 通信结果代码
+        """
+        if self.write_size > TXPACKET_MAX_LEN:
+            return COMM_TX_ERROR
+
+        port = self.port
+        self.write_packet[self.write_checksum_index] = self.checksum(self.write_body)
+        port.clearPort()
+        if port.writePort(self.write_packet) != self.write_size:
+            return COMM_TX_FAIL
+        ph = self.ph
+        if ph.metrics is not None:
+            ph.metrics.recordTx(BROADCAST_ID, INST_SYNC_WRITE, self.write_size)
+        if ph.memory_mirror is not None or ph.write_dedup is not None or ph.write_planner is not None:
+            for scs_id in self.scs_ids:  # 只在挂接缓存时执行，与其他同步写入一样使缓存失效
+                ph.invalidateCaches(scs_id, self.write_address, self.write_length)
+        return COMM_SUCCESS
+
+    def txRxRead(self):
+        """
+        发送同步读取包并接收应答
+        输入参数: 无
+        输出: 通信结果代码
+        """
+        port = self.port
+        port.clearPort()
+        if port.writePort(self.read_packet) != self.read_size:
+            return COMM_TX_FAIL
+        if self.ph.metrics is not None:
+            self.ph.metrics.recordTx(BROADCAST_ID, INST_SYNC_READ, self.read_size)
+
+        port.setPacketTimeoutNs(self.read_timeout_ns)
+        received = port.readPortInto(self.rx_view)
+        while received < self.rx_size:
+            if port.isPacketTimeout():
+                break
+            received += port.readPortInto(self.rx_tails[received])
+
+        if received == self.rx_size:
+            result = self.parse()
+        else:
+            result = self.resync(received)
+            if received == 0:
+                result = COMM_DEADLINE_MISS if port.packet_deadline_bound else COMM_RX_TIMEOUT
+
+        if self.ph.metrics is not None or self.ph.memory_mirror is not None:
+            self.record(received, result)
+        return result
+
+    def parse(self):
+        """
+        原位校验完整的应答
+        输入参数: 无
+        输出: 通信结果代码，所有帧都有效时为COMM_SUCCESS
+        功能: 应答按舵机顺序紧密排列时逐帧检查包头、ID、长度和校验和；有帧不符时改为重新同步
+        """
+        last = self.frame_length - 1
+        frame_data_length = self.read_length + 2
+        index = 0
+        while index < self.count:  # 按下标循环，不创建迭代器对象
+            frame = self.frames[index]
+            if (frame[PKT_HEADER0] != 0xFF or frame[PKT_HEADER1] != 0xFF or frame[PKT_ID] != self.scs_ids[index] or
+                    frame[PKT_LENGTH] != frame_data_length or frame[last] != self.checksum(self.frame_bodies[index])):
+                return self.resync(self.rx_size)
+            self.errors[index] = frame[PKT_ERROR]
+            self.valid[index] = 1
+            index += 1
+        return COMM_SUCCESS
+
+    def resync(self, received):
+        """
+        从不完整或错位的应答中提取有效帧
+        输入参数: received - 收到的字节数
+        输出: 通信结果代码，所有舵机都有有效帧时为COMM_SUCCESS，否则为COMM_RX_CORRUPT
+        功能: 逐字节查找包头，把每个有效帧复制到该舵机在缓冲区中的位置（出错路径，会分配对象）
+        """
+        data = bytes(self.rx_buffer[:received])
+        for index in self.indices:
+            self.valid[index] = 0
+
+        position = 0
+        while position + self.frame_length <= received:
+            if data[position] != 0xFF or data[position + 1] != 0xFF:
+                position += 1
+                continue
+            index = self.index.get(data[position + PKT_ID])
+            frame = data[position:position + self.frame_length]
+            if (index is None or frame[PKT_LENGTH] != self.read_length + 2 or
+                    frame[-1] != (~sum(frame[2:-1]) & 0xFF)):
+                position += 1
+                continue
+            offset = index * self.frame_length
+            self.rx_buffer[offset:offset + self.frame_length] = frame
+            self.errors[index] = frame[PKT_ERROR]
+            self.valid[index] = 1
+            position += self.frame_length
+
+        return COMM_SUCCESS if all(self.valid) else COMM_RX_CORRUPT
+
+    def record(self, received, result):
+        """
+        更新指标和内存表镜像
+        输入参数:
+            received - 收到的字节数
+            result - 通信结果代码
+        输出: 无
+        功能: 只在开启指标或镜像时调用；每个舵机记录一次应答，不属于任何有效帧的字节
+              记到第一个没有有效帧的舵机上，使各舵机的接收字节数之和等于实际收到的字节数
+        """
+        metrics = self.ph.metrics
+        mirror = self.ph.memory_mirror
+        stray = received - sum(self.valid) * self.frame_length
+        now = self.port.getCurrentTime()
+        for index, scs_id in enumerate(self.scs_ids):
+            valid = self.valid[index] == 1
+            if mirror is not None and valid:
+                mirror.store(scs_id, self.read_address, list(self.read_data[scs_id]), now, self.errors[index])
+            if metrics is None:
+                continue
+            if valid:
+                metrics.recordRx(scs_id, INST_SYNC_READ, self.frame_length, COMM_SUCCESS, self.errors[index])
+            else:
+                metrics.recordRx(scs_id, INST_SYNC_READ, stray, result, 0)
+                stray = 0
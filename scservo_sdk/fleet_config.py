@@ -0,0 +1,193 @@
+#!/usr/bin/env python
+
+from .scservo_def import *
+from .protocol_packet_handler import TXPACKET_MAX_LEN
+from .group_sync_write import *
+from .group_sync_read import *
+from .sms_sts import *
+from .scscl import *
+from .register_map import getRegisterMap
+
+# 写入EPROM后等待舵机保存完成的时间（毫秒）
+DEFAULT_EPROM_DELAY = 20.0
+
+
+class FleetConfigurator(object):
+    def __init__(self, ph, lock_address=None, eprom_delay=DEFAULT_EPROM_DELAY):
+        """
+        初始化批量配置器
+        输入参数:
+            ph - 协议包处理器对象（sms_sts/hls/scscl）
+            lock_address - EPROM锁寄存器地址，None表示按协议选择（SCSCL为48，其他为55）
+            eprom_delay - 写入EPROM后、加锁和校验之前等待的时间（毫秒）
+        功能: 解锁、写入和加锁都用同步写入帧发送给所有舵机，不等待逐个应答，
+              最后用一次同步读取校验所有写入的值
+        """
+        self.ph = ph
+        if lock_address is None:
+            lock_address = SCSCL_LOCK if isinstance(ph, scscl) else SMS_STS_LOCK
+        self.lock_address = lock_address
+        self.eprom_delay = eprom_delay
+        self.register_map = getRegisterMap(ph)
+        self.frames = 0  # 上一次apply发送的同步写入帧数
+
+    def encode(self, address, value):
+        """
+        把寄存器值转换为字节
+        输入参数:
+            address - 寄存器地址
+            value - 整数（按内存表中的寄存器定义编码：双字节寄存器按协议端序拆分，
+                    有符号寄存器的负数按符号位编码；内存表中没有的地址为一个字节）或字节值列表
+        输出: 字节值列表
+        """
+        if isinstance(value, (list, tuple, bytes, bytearray)):
+            return list(value)
+        register = self.register_map.by_address.get(address)
+        if register is None:
+            return [value & 0xFF]
+        return self.register_map.encode(register.name, value)
+
+    def expand(self, config):
+        """
+        展开配置
+        输入参数: config - 字典，舵机ID -> {寄存器地址: 值}
+        输出: 字典，舵机ID -> {地址: 字节值}；没有配置项的舵机不包含在内
+        """
+        expected = {}
+        for scs_id, registers in config.items():
+            if not registers:
+                continue
+            memory = expected[scs_id] = {}
+            for address, value in registers.items():
+                for offset, byte in enumerate(self.encode(address, value)):
+                    memory[address + offset] = byte
+        return expected
+
+    def plan(self, expected):
+        """
+        生成同步写入帧
+        输入参数: expected - 字典，舵机ID -> {地址: 字节值}
+        输出: 列表，每项为(起始地址, 长度, [(舵机ID, 数据), ...])，按起始地址排序
+        功能: 每个舵机要写入的地址合并为连续区间，起始地址和长度相同的区间放入同一帧
+        """
+        frames = {}
+        for scs_id in sorted(expected):
+            memory = expected[scs_id]
+            addresses = sorted(memory)
+            index = 0
+            while index < len(addresses):
+                start = end = addresses[index]
+                while index + 1 < len(addresses) and addresses[index + 1] == end + 1:
+                    index += 1
+                    end += 1
+                data = [memory[address] for address in range(start, end + 1)]
+                frames.setdefault((start, end + 1 - start), []).append((scs_id, data))
+                index += 1
+        return [(start, length, frames[(start, length)]) for start, length in sorted(frames)]
+
+    def syncWrite(self, address, length, items):
+        """
+        发送同步写入
+        输入参数:
+            address - 起始地址
+            length - 每个舵机的数据长度
+            items - 列表，每项为(舵机ID, 数据)
+        输出: 通信结果代码，有帧发送失败时为第一个失败的结果
+        功能: 超过一帧容量时分为多帧发送
+        """
+        capacity = (TXPACKET_MAX_LEN - 8) // (1 + length)
+        result = COMM_SUCCESS
+        for index in range(0, len(items), capacity):
+            groupSyncWrite = GroupSyncWrite(self.ph, address, length)
+            for scs_id, data in items[index:index + capacity]:
+                groupSyncWrite.addParam(scs_id, data)
+            frame_result = groupSyncWrite.txPacket()
+            self.frames += 1
+            if result == COMM_SUCCESS:
+                result = frame_result
+        return result
+
+    def wait(self):
+        """
+        等待舵机保存EPROM
+        输入参数: 无
+        输出: 无
+        """
+        port = self.ph.portHandler
+        port.clock.sleep(int(self.eprom_delay * 1000000))
+
+    def apply(self, config, verify=True):
+        """
+        批量写入配置
+        输入参数:
+            config - 字典，舵机ID -> {寄存器地址: 值}；值的格式见encode
+            verify - 是否在写入后用同步读取校验
+        输出: (通信结果代码, 差异) 元组；差异的格式见verify，不校验时为空字典
+        功能: 解锁所有舵机，按plan发送写入帧，等待保存后加锁并校验；
+              总线时间约为3 + 写入帧数条同步写入加一次同步读取
+        """
+        expected = self.expand(config)
+        scs_ids = sorted(expected)
+        if not scs_ids:
+            return COMM_SUCCESS, {}
+        self.frames = 0
+
+        result = self.syncWrite(self.lock_address, 1, [(scs_id, [0]) for scs_id in scs_ids])
+        for address, length, items in self.plan(expected):
+            frame_result = self.syncWrite(address, length, items)
+            if result == COMM_SUCCESS:
+                result = frame_result
+        self.wait()
+        frame_result = self.syncWrite(self.lock_address, 1, [(scs_id, [1]) for scs_id in scs_ids])
+        if result == COMM_SUCCESS:
+            result = frame_result
+
+        if not verify:
+            return result, {}
+        read_result, differences = self.verify(expected)
+        return (result if result != COMM_SUCCESS else read_result), differences
+
+    def verify(self, expected):
+        """
+        校验配置
+        输入参数: expected - 字典，舵机ID -> {地址: 字节值}
+        输出: (通信结果代码, 差异) 元组；差异为字典，只包含与期望不符的舵机：
+              舵机ID -> [(地址, 期望值, 实际值), ...]，没有应答的舵机为None
+        功能: 一次同步读取覆盖所有舵机所有配置地址的最小区间；没有期望值的舵机不读取
+        """
+        scs_ids = sorted(scs_id for scs_id, memory in expected.items() if memory)
+        if not scs_ids:
+            return COMM_SUCCESS, {}
+        start = min(min(expected[scs_id]) for scs_id in scs_ids)
+        length = max(max(expected[scs_id]) for scs_id in scs_ids) + 1 - start
+
+        groupSyncRead = GroupSyncRead(self.ph, start, length)
+        for scs_id in scs_ids:
+            groupSyncRead.addParam(scs_id)
+        result = groupSyncRead.txRxPacket()
+
+        differences = {}
+        for scs_id in scs_ids:
+            if not groupSyncRead.isAvailable(scs_id, start, length)[0]:
+                differences[scs_id] = None
+                continue
+            actual = groupSyncRead.getBytes(scs_id, start, length)
+            mismatches = [(address, byte, actual[address - start])
+                          for address, byte in sorted(expected[scs_id].items()) if actual[address - start] != byte]
+            if mismatches:
+                differences[scs_id] = mismatches
+        return result, differences
+
+
+def configureFleet(ph, config, verify=True, eprom_delay=DEFAULT_EPROM_DELAY):
+    """
+    批量写入配置
+    输入参数:
+        ph - 协议包处理器对象
+        config - 字典，舵机ID -> {寄存器地址: 值}
+        verify - 是否校验
+        eprom_delay - 写入后等待的时间（毫秒）
+    输出: (通信结果代码, 差异) 元组
+    功能: FleetConfigurator.apply的简便封装
+    """
+    return FleetConfigurator(ph, eprom_delay=eprom_delay).apply(config, verify)
@@ -0,0 +1,179 @@
+#!/usr/bin/env python
+
+from array import array
+
+from .scservo_def import *
+from .register_map import getRegisterMap, STATUS_START_ADDRESS, STATUS_DATA_LENGTH
+
+# 状态字段定义：(字段名, 数组类型码, 寄存器名)；地址、长度和符号位取自协议的内存表（register_map）
+FLEET_FIELDS = (
+    ('position', 'i', 'present_position'),  # scscl为无符号16位，其他协议为符号-数值编码
+    ('speed', 'h', 'present_speed'),
+    ('load', 'h', 'present_load'),
+    ('voltage', 'B', 'present_voltage'),
+    ('temperature', 'B', 'present_temperature'),
+    ('moving', 'B', 'moving'),
+    ('current', 'H', 'present_current'),
+)
+
+# 覆盖所有状态字段的同步读取区间
+FLEET_START_ADDRESS = STATUS_START_ADDRESS
+FLEET_DATA_LENGTH = STATUS_DATA_LENGTH
+
+
+def fieldProperty(name):
+    """
+    生成ServoState的只读属性
+    输入参数: name - FleetState中的数组名
+    输出: property对象
+    """
+    def getter(self):
+        return getattr(self.fleet, name)[self.row]
+    return property(getter)
+
+
+class ServoState(object):
+    __slots__ = ('fleet', 'row', 'scs_id')
+
+    def __init__(self, fleet, row, scs_id):
+        """
+        初始化单个舵机的状态视图
+        输入参数:
+            fleet - 所属的FleetState
+            row - 该舵机在数组中的行号
+            scs_id - 舵机ID
+        功能: 不保存任何状态值，读取属性时直接访问FleetState的数组
+        """
+        self.fleet = fleet
+        self.row = row
+        self.scs_id = scs_id
+
+    position = fieldProperty('position')
+    speed = fieldProperty('speed')
+    load = fieldProperty('load')
+    voltage = fieldProperty('voltage')
+    temperature = fieldProperty('temperature')
+    moving = fieldProperty('moving')
+    current = fieldProperty('current')
+    error = fieldProperty('error')
+    timestamp = fieldProperty('timestamp')
+
+
+class FleetState(object):
+    def __init__(self):
+        """
+        初始化舵机群状态表
+        输入参数: 无
+        功能: 每个状态字段保存在一个连续的类型化数组中（每个舵机约20字节），按行号索引；
+              每条总线用一张长度为MAX_ID+1的数组把舵机ID映射到行号，查找不需要哈希
+        """
+        self.count = 0  # 舵机数
+        for name, typecode, _ in FLEET_FIELDS:
+            setattr(self, name, array(typecode))
+        self.error = array('B')  # 应答中的错误位
+        self.timestamp = array('d')  # 最近一次更新的时间（毫秒），0表示尚未读取
+        self.buses = {}  # 总线 -> 舵机ID到行号的数组（-1表示不在表中）
+        self.ids = array('B')  # 行号 -> 舵机ID
+        self.bus_of = []  # 行号 -> 总线标识
+        self.columns = {}  # SpanDecoder -> [(解码结果下标, 数组), ...]，只包含状态字段
+
+    def add(self, scs_id, bus=None):
+        """
+        添加舵机
+        输入参数:
+            scs_id - 舵机ID
+            bus - 总线标识（如端口名称或协议对象），一条总线上ID唯一，None表示只有一条总线
+        输出: 整数，该舵机的行号；已存在时返回原行号
+        """
+        rows = self.buses.get(bus)
+        if rows is None:
+            rows = self.buses[bus] = array('l', [-1]) * (MAX_ID + 1)
+        if rows[scs_id] >= 0:
+            return rows[scs_id]
+
+        row = self.count
+        for name, _, _ in FLEET_FIELDS:
+            getattr(self, name).append(0)
+        self.error.append(0)
+        self.timestamp.append(0.0)
+        rows[scs_id] = row
+        self.ids.append(scs_id)
+        self.bus_of.append(bus)
+        self.count += 1
+        return row
+
+    def rowOf(self, scs_id, bus=None):
+        """
+        查找舵机的行号
+        输入参数:
+            scs_id - 舵机ID
+            bus - 总线标识
+        输出: 整数，行号；不在表中时返回-1
+        """
+        rows = self.buses.get(bus)
+        return rows[scs_id] if rows is not None else -1
+
+    def get(self, scs_id, bus=None):
+        """
+        获取单个舵机的状态视图
+        输入参数:
+            scs_id - 舵机ID
+            bus - 总线标识
+        输出: ServoState对象，不在表中时返回None
+        """
+        row = self.rowOf(scs_id, bus)
+        return ServoState(self, row, scs_id) if row >= 0 else None
+
+    def getColumns(self, decoder):
+        """
+        获取解码器对应的数组
+        输入参数: decoder - register_map的SpanDecoder对象
+        输出: 列表，每项为(解码结果中的下标, 状态字段的数组)，区间内不是状态字段的寄存器不在其中
+        功能: 结果按解码器缓存
+        """
+        columns = self.columns.get(decoder)
+        if columns is None:
+            by_register = dict((register, getattr(self, name)) for name, _, register in FLEET_FIELDS)
+            columns = self.columns[decoder] = [(index, by_register[name]) for index, name in enumerate(decoder.names)
+                                               if name in by_register]
+        return columns
+
+    def update(self, groupSyncRead, timestamp=None, bus=None):
+        """
+        用同步读取的结果更新状态表
+        输入参数:
+            groupSyncRead - 已完成txRxPacket的GroupSyncRead对象
+            timestamp - 更新时间（毫秒），None表示读取端口时钟
+            bus - 总线标识
+        输出: 整数，更新的舵机数
+        功能: 按协议的内存表取缓存的区间解码器，每个有效应答一次解包（含符号位转换），
+              直接写入各字段数组；未在表中的舵机自动添加，没有有效应答的舵机保持原值
+        """
+        ph = groupSyncRead.ph
+        if timestamp is None:
+            timestamp = ph.portHandler.getCurrentTime()
+        decoder = getRegisterMap(ph).getDecoder(groupSyncRead.start_address, groupSyncRead.data_length)
+        columns = self.getColumns(decoder)
+        values = decoder.values
+        size = decoder.struct.size + 1  # 第一个字节为错误位
+        rows = self.buses.get(bus)
+        if groupSyncRead.is_param_changed:
+            groupSyncRead.makeParam()
+        data_table = groupSyncRead.data_table
+
+        updated = 0
+        for scs_id in groupSyncRead.param:
+            data = data_table[scs_id]
+            if not data or len(data) < size:
+                continue
+            row = rows[scs_id] if rows is not None else -1
+            if row < 0:
+                row = self.add(scs_id, bus)
+                rows = self.buses[bus]
+            self.error[row] = data[0]
+            self.timestamp[row] = timestamp
+            decoded = values(data, 1)
+            for index, column in columns:
+                column[row] = decoded[index]
+            updated += 1
+        return updated
@@ -18,25 +18,37 @@ class GroupSyncRead:
 
         self.last_result = False  # 上一次操作结果
         self.is_param_changed = False  # 参数是否改变标志
-        self.param = []  # 参数列表
-        self.data_dict = {}  # 数据字典，存储舵机ID和对应数据
+        self.param = []  # 参数列表（按ID升序的舵机ID）
+        self.count = 0  # 已添加的舵机数
+        self.is_member = bytearray(ID_TABLE_SIZE)  # 成员表，按ID索引，1表示已添加
+        self.data_table = [None] * ID_TABLE_SIZE  # 数据表，按ID索引，存储[错误位, 数据...]
+        self.frame_offsets = [-1] * ID_TABLE_SIZE  # 按ID索引，应答帧在响应包中的预计位置
+        self.frame_length = data_length + 6  # 每个应答帧的字节数
+        self.retry_policy = None  # 重试策略（None表示使用协议包处理器的策略）
 
         self.clearParam()  # 初始化时清空参数
 
+    @property
+    def data_dict(self):
+        """
+        数据字典（兼容旧接口）
+        输出: 字典，舵机ID -> 数据列表，按ID升序
+        功能: 每次访问都从数据表生成新的字典，修改字典不影响同步读取组
+        """
+        return dict((scs_id, self.data_table[scs_id]) for scs_id in range(ID_TABLE_SIZE) if self.is_member[scs_id])
+
     def makeParam(self):
         """
         生成参数列表
         输入参数: 无
         输出: 无
-        功能: 根据数据字典中的舵机ID生成参数列表
+        功能: 按ID升序扫描成员表生成参数列表，并为每个舵机分配应答帧在响应包中的位置
         """
-        if not self.data_dict:  # 如果数据字典为空
-            return
+        self.param = [scs_id for scs_id in range(ID_TABLE_SIZE) if self.is_member[scs_id]]
 
-        self.param = []  # 清空参数列表
-
-        for scs_id in self.data_dict:
-            self.param.append(scs_id)  # 将舵机ID添加到参数列表
+        for index, scs_id in enumerate(self.param):
+            self.frame_offsets[scs_id] = index * self.frame_length  # 舵机按参数顺序依次应答
+        self.is_param_changed = False
 
     def addParam(self, scs_id):
         """
@@ -45,10 +57,12 @@ class GroupSyncRead:
         输出: 布尔值，表示是否成功添加
         功能: 将指定舵机ID添加到同步读取组中
         """
-        if scs_id in self.data_dict:  # 如果舵机ID已存在
+        if self.is_member[scs_id]:  # 如果舵机ID已存在
             return False  # 添加失败
 
-        self.data_dict[scs_id] = []  # 为舵机ID创建空数据列表
+        self.is_member[scs_id] = 1
+        self.data_table[scs_id] = []  # 为舵机ID创建空数据列表
+        self.count += 1
         self.is_param_changed = True  # 标记参数已改变
         return True  # 添加成功
 
@@ -59,10 +73,12 @@ class GroupSyncRead:
         输出: 无
         功能: 从同步读取组中移除指定舵机ID
         """
-        if scs_id not in self.data_dict:  # 如果舵机ID不存在
+        if not self.is_member[scs_id]:  # 如果舵机ID不存在
             return  # 直接返回
 
-        del self.data_dict[scs_id]  # 从数据字典中删除舵机ID
+        self.is_member[scs_id] = 0
+        self.data_table[scs_id] = None
+        self.count -= 1
         self.is_param_changed = True  # 标记参数已改变
 
     def clearParam(self):
@@ -72,7 +88,10 @@ class GroupSyncRead:
         输出: 无
         功能: 清空同步读取组中的所有舵机参数
         """
-        self.data_dict.clear()  # 清空数据字典
+        self.is_member[:] = EMPTY_ID_MEMBERS  # 整表复制，不逐个清除
+        self.data_table[:] = EMPTY_ID_TABLE
+        self.count = 0
+        self.is_param_changed = True
 
     def txPacket(self):
         """
@@ -81,14 +100,14 @@ class GroupSyncRead:
         输出: 通信结果代码
         功能: 发送同步读取指令到所有已添加的舵机
         """
-        if len(self.data_dict.keys()) == 0:  # 如果没有添加任何舵机
+        if self.count == 0:  # 如果没有添加任何舵机
             return COMM_NOT_AVAILABLE  # 返回不可用状态
 
-        if self.is_param_changed is True or not self.param:  # 如果参数已改变或参数列表为空
+        if self.is_param_changed is True:  # 如果参数已改变
             self.makeParam()  # 重新生成参数列表
 
         # 调用协议处理器的同步读取发送方法
-        return self.ph.syncReadTx(self.start_address, self.data_length, self.param, len(self.data_dict.keys()))
+        return self.ph.syncReadTx(self.start_address, self.data_length, self.param, self.count)
 
     def rxPacket(self):
         """
@@ -101,35 +120,132 @@ class GroupSyncRead:
 
         result = COMM_RX_FAIL  # 默认接收失败
 
-        if len(self.data_dict.keys()) == 0:  # 如果没有添加任何舵机
+        if self.count == 0:  # 如果没有添加任何舵机
             return COMM_NOT_AVAILABLE  # 返回不可用状态
 
         # 调用协议处理器的同步读取接收方法
-        result, rxpacket = self.ph.syncReadRx(self.data_length, len(self.data_dict.keys()))
-        
+        result, rxpacket = self.ph.syncReadRx(self.data_length, self.count)
+
+        metrics = self.ph.metrics  # 指标注册表
+        mirror = self.ph.memory_mirror  # 内存表镜像
+        failed = {}  # 没有有效应答帧的舵机ID -> 通信结果
         if len(rxpacket) >= (self.data_length+6):  # 检查响应包长度是否足够
-            for scs_id in self.data_dict:  # 遍历所有舵机ID
-                # 解析每个舵机的响应数据
-                self.data_dict[scs_id], result = self.readRx(rxpacket, scs_id, self.data_length)
+            for scs_id in self.param:  # 遍历所有舵机ID
+                # 先检查预计位置上的应答帧，不符时再搜索整个响应包
+                data = self.readFrame(rxpacket, scs_id)
+                if data is not None:
+                    result = COMM_SUCCESS
+                else:
+                    data, result = self.readRx(rxpacket, scs_id, self.data_length)
+                self.data_table[scs_id] = data
                 if result != COMM_SUCCESS:  # 如果解析失败
                     self.last_result = False  # 标记整体结果为失败
+                    failed[scs_id] = result
+                elif mirror is not None:  # 更新内存表镜像
+                    mirror.store(scs_id, self.start_address, data[1:], self.ph.portHandler.getCurrentTime(), data[0])
         else:
             self.last_result = False  # 响应包长度不足，标记为失败
+            failure = result if result != COMM_SUCCESS else COMM_RX_CORRUPT
+            for scs_id in self.param:  # 每个舵机都记为一次失败
+                failed[scs_id] = failure
+
+        if metrics is not None:
+            self.recordMetrics(metrics, len(rxpacket), failed)
             
         return result  # 返回通信结果
 
-    def txRxPacket(self):
+    def recordMetrics(self, metrics, rx_length, failed):
+        """
+        记录同步读取的接收指标
+        输入参数:
+            metrics - 指标注册表
+            rx_length - 收到的字节数
+            failed - 字典，没有有效应答帧的舵机ID -> 通信结果
+        输出: 无
+        功能: 每个舵机记录一次应答：有效帧记入帧长度、错误位和延迟，无效时记入失败结果；
+              不属于任何有效帧的字节记到第一个失败的舵机上，使各舵机的接收字节数之和等于实际收到的字节数
+        """
+        latency = self.ph.txLatency()
+        stray = rx_length - (self.count - len(failed)) * self.frame_length
+        for scs_id in self.param:
+            result = failed.get(scs_id)
+            if result is None:
+                metrics.recordRx(scs_id, INST_SYNC_READ, self.frame_length, COMM_SUCCESS, self.data_table[scs_id][0],
+                                 latency)
+            else:
+                metrics.recordRx(scs_id, INST_SYNC_READ, stray, result, 0)
+                stray = 0
+
+    def txRxPacket(self, deadline=None):
         """
         发送并接收同步读取数据包
-        输入参数: 无
-        输出: 通信结果代码
+        输入参数: deadline - 绝对截止时间（毫秒，与端口时钟同一基准），None表示不限制
+        输出: 通信结果代码；在截止时间前无法完成时返回COMM_DEADLINE_MISS
         功能: 发送同步读取指令并接收响应，完成完整的同步读取操作
         """
+        if deadline is not None:
+            count = self.count
+            if not self.ph.checkDeadline(BROADCAST_ID, INST_SYNC_READ, 8 + count, (6 + self.data_length) * count,
+                                         deadline):
+                return COMM_DEADLINE_MISS
+
+            # 接收超时取协议估算值与剩余时间中较小的一个
+            previous = self.ph.portHandler.limitPacketDeadline(deadline)
+            try:
+                return self.txRxPacket()
+            finally:
+                self.ph.portHandler.setPacketDeadline(previous)
+
+        policy = self.retry_policy if self.retry_policy is not None else self.ph.retry_policy
+        if policy is not None:
+            start_time = self.ph.portHandler.getCurrentTime()  # 首次尝试的开始时间
+
         result = self.txPacket()  # 先发送数据包
         if result != COMM_SUCCESS:  # 如果发送失败
             return result  # 直接返回错误
 
-        return self.rxPacket()  # 接收并返回结果
+        result = self.rxPacket()  # 接收结果
+        if policy is None or result == COMM_SUCCESS:
+            return result
+
+        # 按重试策略重新同步读取，只有剩余时间足够完成一次读取时才重试
+        count = self.count
+        estimate = policy.estimateTime(self.ph.portHandler, 8 + count, (6 + self.data_length) * count)
+        attempt = 0
+        while policy.shouldRetry(self.ph.portHandler, INST_SYNC_READ, result, attempt, start_time, estimate):
+            attempt += 1
+            if self.ph.metrics is not None:
+                self.ph.metrics.recordRetry(BROADCAST_ID, INST_SYNC_READ)
+            policy.wait(self.ph.portHandler)
+            result = self.txPacket()
+            if result != COMM_SUCCESS:
+                break
+            result = self.rxPacket()
+
+        return result
+
+    def readFrame(self, rxpacket, scs_id):
+        """
+        按预计位置解析单个舵机的应答帧
+        输入参数:
+            rxpacket - 响应数据包
+            scs_id - 舵机ID
+        输出: 数据列表[错误位, 数据...]；该位置不是该舵机的有效应答帧时返回None
+        功能: 舵机按参数顺序依次应答时，每个应答帧都在makeParam分配的位置上，不需要搜索包头
+        """
+        offset = self.frame_offsets[scs_id]
+        end = offset + self.frame_length
+        if offset < 0 or end > len(rxpacket):
+            return None
+
+        if (rxpacket[offset] != 0xFF or rxpacket[offset+1] != 0xFF or rxpacket[offset+2] != scs_id or
+                rxpacket[offset+3] != self.data_length+2):
+            return None
+
+        if (~sum(rxpacket[offset+2:end-1]) & 0xFF) != rxpacket[end-1]:  # 校验和验证
+            return None
+
+        return rxpacket[offset+4:end-1]  # 错误位和数据
 
     def readRx(self, rxpacket, scs_id, data_length):
         """
@@ -199,20 +315,21 @@ class GroupSyncRead:
         输出: (是否可用, 错误代码) 元组
         功能: 检查指定舵机的数据是否已成功读取且地址有效
         """
-        if scs_id not in self.data_dict:  # 如果舵机ID不存在
+        if not self.is_member[scs_id]:  # 如果舵机ID不存在
             return False, 0
-            
+
         # 检查地址是否在有效范围内
         if (address < self.start_address) or (self.start_address + self.data_length - data_length < address):
             return False, 0
-            
-        if not self.data_dict[scs_id]:  # 如果数据为空
+
+        data = self.data_table[scs_id]
+        if not data:  # 如果数据为空
             return False, 0
-            
-        if len(self.data_dict[scs_id]) < (data_length+1):  # 如果数据长度不足
+
+        if len(data) < (data_length+1):  # 如果数据长度不足
             return False, 0
-            
-        return True, self.data_dict[scs_id][0]  # 数据可用，返回True和错误码
+
+        return True, data[0]  # 数据可用，返回True和错误码
 
     def getData(self, scs_id, address, data_length):
         """
@@ -224,19 +341,28 @@ class GroupSyncRead:
         输出: 数据值
         功能: 从已读取的数据中提取指定地址的数据
         """
+        data = self.data_table[scs_id]
+        offset = address - self.start_address + 1
         if data_length == 1:  # 1字节数据
-            return self.data_dict[scs_id][address-self.start_address+1]
+            return data[offset]
         elif data_length == 2:  # 2字节数据
-            return self.ph.scs_makeword(
-                self.data_dict[scs_id][address-self.start_address+1],
-                self.data_dict[scs_id][address-self.start_address+2])
+            return self.ph.scs_makeword(data[offset], data[offset+1])
         elif data_length == 4:  # 4字节数据
             return self.ph.scs_makedword(
-                self.ph.scs_makeword(
-                    self.data_dict[scs_id][address-self.start_address+1],
-                    self.data_dict[scs_id][address-self.start_address+2]),
-                self.ph.scs_makeword(
-                    self.data_dict[scs_id][address-self.start_address+3],
-                    self.data_dict[scs_id][address-self.start_address+4]))
+                self.ph.scs_makeword(data[offset], data[offset+1]),
+                self.ph.scs_makeword(data[offset+2], data[offset+3]))
         else:  # 不支持的数据长度
             return 0
+
+    def getBytes(self, scs_id, address, data_length):
+        """
+        获取指定舵机的原始字节
+        输入参数:
+            scs_id - 舵机ID
+            address - 内存地址
+            data_length - 字节数
+        输出: 字节值列表
+        功能: 从已读取的数据中截取任意长度的原始字节，由调用者自行解析
+        """
+        offset = address - self.start_address + 1
+        return list(self.data_table[scs_id][offset:offset + data_length])
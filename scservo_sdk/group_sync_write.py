@@ -18,28 +18,43 @@ class GroupSyncWrite:
 
         self.is_param_changed = False  # 参数是否改变标志
         self.param = []  # 参数列表
-        self.data_dict = {}  # 数据字典，存储舵机ID和对应数据
+        self.ids = []  # 参数列表中的舵机ID（按ID升序）
+        self.count = 0  # 已添加的舵机数
+        self.is_member = bytearray(ID_TABLE_SIZE)  # 成员表，按ID索引，1表示已添加
+        self.data_table = [None] * ID_TABLE_SIZE  # 数据表，按ID索引，存储要写入的数据
+        self.param_offsets = [-1] * ID_TABLE_SIZE  # 按ID索引，该舵机数据在参数列表中的位置
+        self.write_dedup = None  # 写入去重器，发送成功后记录已发送的值
 
         self.clearParam()  # 初始化时清空参数
 
+    @property
+    def data_dict(self):
+        """
+        数据字典（兼容旧接口）
+        输出: 字典，舵机ID -> 数据列表，按ID升序
+        功能: 每次访问都从数据表生成新的字典，修改字典不影响同步写入组
+        """
+        return dict((scs_id, self.data_table[scs_id]) for scs_id in range(ID_TABLE_SIZE) if self.is_member[scs_id])
+
     def makeParam(self):
         """
         生成参数列表
         输入参数: 无
         输出: 无
-        功能: 根据数据字典中的舵机ID和数据生成参数列表
+        功能: 按ID升序扫描成员表生成参数列表，并记录每个舵机数据在参数列表中的位置
         """
-        if not self.data_dict:  # 如果数据字典为空
-            return
-
         self.param = []  # 清空参数列表
+        self.ids = [scs_id for scs_id in range(ID_TABLE_SIZE) if self.is_member[scs_id]]
 
-        for scs_id in self.data_dict:
-            if not self.data_dict[scs_id]:  # 如果舵机数据为空
+        for scs_id in self.ids:
+            data = self.data_table[scs_id]
+            if not data:  # 如果舵机数据为空
                 return  # 直接返回
 
             self.param.append(scs_id)  # 添加舵机ID到参数列表
-            self.param.extend(self.data_dict[scs_id])  # 添加舵机数据到参数列表
+            self.param_offsets[scs_id] = len(self.param)
+            self.param.extend(data)  # 添加舵机数据到参数列表
+        self.is_param_changed = False
 
     def addParam(self, scs_id, data):
         """
@@ -50,13 +65,15 @@ class GroupSyncWrite:
         输出: 布尔值，表示是否成功添加
         功能: 将指定舵机ID和对应数据添加到同步写入组中
         """
-        if scs_id in self.data_dict:  # 如果舵机ID已存在
+        if self.is_member[scs_id]:  # 如果舵机ID已存在
             return False  # 添加失败
 
         if len(data) > self.data_length:  # 如果数据长度超过设置值
             return False  # 添加失败
 
-        self.data_dict[scs_id] = data  # 存储舵机数据
+        self.is_member[scs_id] = 1
+        self.data_table[scs_id] = data  # 存储舵机数据
+        self.count += 1
         self.is_param_changed = True  # 标记参数已改变
         return True  # 添加成功
 
@@ -67,10 +84,12 @@ class GroupSyncWrite:
         输出: 无
         功能: 从同步写入组中移除指定舵机ID及其数据
         """
-        if scs_id not in self.data_dict:  # 如果舵机ID不存在
+        if not self.is_member[scs_id]:  # 如果舵机ID不存在
             return  # 直接返回
 
-        del self.data_dict[scs_id]  # 从数据字典中删除舵机ID
+        self.is_member[scs_id] = 0
+        self.data_table[scs_id] = None
+        self.count -= 1
         self.is_param_changed = True  # 标记参数已改变
 
     def changeParam(self, scs_id, data):
@@ -80,16 +99,22 @@ class GroupSyncWrite:
             scs_id - 舵机ID
             data - 新的数据列表
         输出: 布尔值，表示是否成功修改
-        功能: 修改指定舵机ID的写入数据
+        功能: 修改指定舵机ID的写入数据；参数列表已生成、且原数据和新数据都是完整的data_length字节时
+              直接覆盖参数列表中的对应位置，否则该舵机在参数列表中占用的长度会改变，需重新生成
         """
-        if scs_id not in self.data_dict:  # 如果舵机ID不存在
+        if not self.is_member[scs_id]:  # 如果舵机ID不存在
             return False  # 修改失败
 
         if len(data) > self.data_length:  # 如果数据长度超过设置值
             return False  # 修改失败
 
-        self.data_dict[scs_id] = data  # 更新舵机数据
-        self.is_param_changed = True  # 标记参数已改变
+        previous = self.data_table[scs_id]
+        self.data_table[scs_id] = data  # 更新舵机数据
+        if self.is_param_changed is False and len(previous) == self.data_length and len(data) == self.data_length:
+            offset = self.param_offsets[scs_id]
+            self.param[offset:offset+self.data_length] = data  # 原位更新，不重新生成参数列表
+        else:
+            self.is_param_changed = True  # 标记参数已改变
         return True  # 修改成功
 
     def clearParam(self):
@@ -99,25 +124,40 @@ class GroupSyncWrite:
         输出: 无
         功能: 清空同步写入组中的所有舵机参数和数据
         """
-        self.data_dict.clear()  # 清空数据字典
+        self.is_member[:] = EMPTY_ID_MEMBERS  # 整表复制，不逐个清除
+        self.data_table[:] = EMPTY_ID_TABLE
+        self.count = 0
+        self.is_param_changed = True
 
-    def txPacket(self):
+    def txPacket(self, deadline=None):
         """
         发送同步写入数据包
-        输入参数: 无
-        输出: 通信结果代码
+        输入参数: deadline - 绝对截止时间（毫秒，与端口时钟同一基准），None表示不限制
+        输出: 通信结果代码；在截止时间前无法发送完成时返回COMM_DEADLINE_MISS
         功能: 发送同步写入指令到所有已添加的舵机
         """
-        if len(self.data_dict.keys()) == 0:  # 如果没有添加任何舵机
+        if self.count == 0:  # 如果没有添加任何舵机
             return COMM_NOT_AVAILABLE  # 返回不可用状态
 
-        if self.is_param_changed is True or not self.param:  # 如果参数已改变或参数列表为空
+        if self.is_param_changed is True:  # 如果参数已改变
             self.makeParam()  # 重新生成参数列表
 
-        # 调用协议处理器的同步写入发送方法
-        return self.ph.syncWriteTxOnly(
-            self.start_address, 
-            self.data_length, 
-            self.param,
-            len(self.data_dict.keys()) * (1 + self.data_length)  # 计算总参数长度
-        )
+        param_length = self.count * (1 + self.data_length)  # 计算总参数长度
+
+        # 调用协议处理器的同步写入发送方法；同步写入没有状态包，不会出现可重试的接收失败
+        result = self.ph.syncWriteTxOnly(self.start_address, self.data_length, self.param, param_length, deadline)
+        return self.commitWrite(result)
+
+    def commitWrite(self, result):
+        """
+        记录已发送的数据
+        输入参数: result - 同步写入的通信结果
+        输出: 通信结果代码（原样返回）
+        功能: 发送成功且开启了写入去重时，记录每个舵机已发送的值
+        """
+        if result == COMM_SUCCESS and self.write_dedup is not None:
+            now = self.ph.portHandler.getCurrentTime()
+            for scs_id in self.ids:
+                self.write_dedup.commit(scs_id, self.start_address, self.data_table[scs_id], now)
+
+        return result
@@ -62,32 +62,34 @@ class hls(protocol_packet_handler):
         protocol_packet_handler.__init__(self, portHandler, 0)
         self.groupSyncWrite = GroupSyncWrite(self, HLS_ACC, 7)
 
-    def WritePosEx(self, scs_id, position, speed, acc, torque):
+    def WritePosEx(self, scs_id, position, speed, acc, torque, force=False, deadline=None):
         position = self.scs_tohost(position, 15)
         txpacket = [acc, self.scs_lobyte(position), self.scs_hibyte(position), self.scs_lobyte(torque), self.scs_hibyte(torque), self.scs_lobyte(speed), self.scs_hibyte(speed)]
-        return self.writeTxRx(scs_id, HLS_ACC, len(txpacket), txpacket)
+        return self.writeGoalTxRx(scs_id, HLS_ACC, txpacket, force, deadline)
 
-    def ReadPos(self, scs_id):
-        scs_present_position, scs_comm_result, scs_error = self.read2ByteTxRx(scs_id, HLS_PRESENT_POSITION_L)
+    def ReadPos(self, scs_id, deadline=None):
+        scs_present_position, scs_comm_result, scs_error = self.read2ByteTxRx(scs_id, HLS_PRESENT_POSITION_L, deadline)
         return self.scs_tohost(scs_present_position, 15), scs_comm_result, scs_error
 
-    def ReadSpeed(self, scs_id):
-        scs_present_speed, scs_comm_result, scs_error = self.read2ByteTxRx(scs_id, HLS_PRESENT_SPEED_L)
+    def ReadSpeed(self, scs_id, deadline=None):
+        scs_present_speed, scs_comm_result, scs_error = self.read2ByteTxRx(scs_id, HLS_PRESENT_SPEED_L, deadline)
         return self.scs_tohost(scs_present_speed, 15), scs_comm_result, scs_error
 
-    def ReadPosSpeed(self, scs_id):
-        scs_present_position_speed, scs_comm_result, scs_error = self.read4ByteTxRx(scs_id, HLS_PRESENT_POSITION_L)
+    def ReadPosSpeed(self, scs_id, deadline=None):
+        scs_present_position_speed, scs_comm_result, scs_error = self.read4ByteTxRx(scs_id, HLS_PRESENT_POSITION_L, deadline)
         scs_present_position = self.scs_loword(scs_present_position_speed)
         scs_present_speed = self.scs_hiword(scs_present_position_speed)
         return self.scs_tohost(scs_present_position, 15), self.scs_tohost(scs_present_speed, 15), scs_comm_result, scs_error
 
-    def ReadMoving(self, scs_id):
-        moving, scs_comm_result, scs_error = self.read1ByteTxRx(scs_id, HLS_MOVING)
+    def ReadMoving(self, scs_id, deadline=None):
+        moving, scs_comm_result, scs_error = self.read1ByteTxRx(scs_id, HLS_MOVING, deadline)
         return moving, scs_comm_result, scs_error
 
-    def SyncWritePosEx(self, scs_id, position, speed, acc, torque):
+    def SyncWritePosEx(self, scs_id, position, speed, acc, torque, force=False):
         position = self.scs_tohost(position, 15)
         txpacket = [acc, self.scs_lobyte(position), self.scs_hibyte(position), self.scs_lobyte(torque), self.scs_hibyte(torque), self.scs_lobyte(speed), self.scs_hibyte(speed)]
+        if not force and self.isDuplicateWrite(scs_id, HLS_ACC, txpacket, 1 + len(txpacket)):
+            return True
         return self.groupSyncWrite.addParam(scs_id, txpacket)
 
     def RegWritePosEx(self, scs_id, position, speed, acc, torque):
@@ -101,10 +103,10 @@ class hls(protocol_packet_handler):
     def WheelMode(self, scs_id):
         return self.write1ByteTxRx(scs_id, HLS_MODE, 1)
 
-    def WriteSpec(self, scs_id, speed, acc, torque):
+    def WriteSpec(self, scs_id, speed, acc, torque, force=False, deadline=None):
         speed = self.scs_toscs(speed, 15)
         txpacket = [acc, 0, 0, self.scs_lobyte(torque), self.scs_hibyte(torque), self.scs_lobyte(speed), self.scs_hibyte(speed)]
-        return self.writeTxRx(scs_id, HLS_ACC, len(txpacket), txpacket)
+        return self.writeGoalTxRx(scs_id, HLS_ACC, txpacket, force, deadline)
 
     def LockEprom(self, scs_id):
         return self.write1ByteTxRx(scs_id, HLS_LOCK, 1)
@@ -0,0 +1,316 @@
+#!/usr/bin/env python
+
+import os
+import bisect
+import threading
+
+from .scservo_def import *
+from .protocol_packet_handler import ERRBIT_VOLTAGE, ERRBIT_ANGLE, ERRBIT_OVERHEAT, ERRBIT_OVERELE, ERRBIT_OVERLOAD
+
+# 延迟直方图的桶上界（秒）
+LATENCY_BUCKETS = (0.00025, 0.0005, 0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1)
+
+# 指令名称，用于指标标签
+INSTRUCTION_NAMES = {
+    INST_PING: 'PING',
+    INST_READ: 'READ',
+    INST_WRITE: 'WRITE',
+    INST_REG_WRITE: 'REG_WRITE',
+    INST_ACTION: 'ACTION',
+    INST_SYNC_WRITE: 'SYNC_WRITE',
+    INST_SYNC_READ: 'SYNC_READ',
+    INST_RESET: 'RESET',
+    INST_OFSCAL: 'OFSCAL',
+}
+
+# 舵机错误位名称
+ERROR_BIT_NAMES = (
+    (ERRBIT_VOLTAGE, 'VOLTAGE'),
+    (ERRBIT_ANGLE, 'ANGLE'),
+    (ERRBIT_OVERHEAT, 'OVERHEAT'),
+    (ERRBIT_OVERELE, 'OVERELE'),
+    (ERRBIT_OVERLOAD, 'OVERLOAD'),
+)
+
+
+class TransactionStats(object):
+    __slots__ = ('transactions', 'retries', 'responses', 'tx_bytes', 'rx_bytes', 'timeouts', 'deadline_misses',
+                 'checksum_failures', 'other_failures', 'error_bits', 'latency_buckets', 'latency_sum', 'latency_count')
+
+    def __init__(self):
+        """
+        初始化单个(舵机ID, 指令)的统计数据
+        输入参数: 无
+        功能: 所有计数器清零
+        """
+        self.transactions = 0  # 发送的指令包数量
+        self.retries = 0  # 重试次数
+        self.responses = 0  # 接收结果数量（成功或失败）
+        self.tx_bytes = 0  # 发送字节数
+        self.rx_bytes = 0  # 接收字节数
+        self.timeouts = 0  # 接收超时次数
+        self.deadline_misses = 0  # 错过截止时间次数（包括因剩余时间不足而未发送的事务）
+        self.checksum_failures = 0  # 数据包损坏次数
+        self.other_failures = 0  # 其他失败次数
+        self.error_bits = {}  # 错误位名称 -> 出现次数
+        self.latency_buckets = [0] * (len(LATENCY_BUCKETS) + 1)  # 延迟直方图（最后一个桶为+Inf）
+        self.latency_sum = 0.0  # 延迟总和（秒）
+        self.latency_count = 0  # 延迟样本数
+
+    def asDict(self):
+        """
+        转换为字典
+        输入参数: 无
+        输出: 包含所有计数器的字典
+        功能: 生成统计数据的独立副本，供拉取接口使用
+        """
+        return {
+            'transactions': self.transactions,
+            'retries': self.retries,
+            'responses': self.responses,
+            'tx_bytes': self.tx_bytes,
+            'rx_bytes': self.rx_bytes,
+            'timeouts': self.timeouts,
+            'deadline_misses': self.deadline_misses,
+            'checksum_failures': self.checksum_failures,
+            'other_failures': self.other_failures,
+            'error_bits': dict(self.error_bits),
+            'latency_buckets': list(zip(LATENCY_BUCKETS + (float('inf'),), self.latency_buckets)),
+            'latency_sum': self.latency_sum,
+            'latency_count': self.latency_count,
+        }
+
+
+class MetricsRegistry(object):
+    def __init__(self):
+        """
+        初始化指标注册表
+        输入参数: 无
+        功能: 按(舵机ID, 指令)记录延迟直方图、收发字节数、超时、校验失败和舵机错误位；
+              通过protocol_packet_handler.setMetrics挂接，未挂接时不产生任何开销
+        """
+        self.stats = {}  # (舵机ID, 指令) -> TransactionStats
+        self.lock = threading.Lock()  # 保护统计表结构
+        self.server = None  # Prometheus HTTP服务对象
+
+    def getStats(self, scs_id, instruction):
+        """
+        获取指定(舵机ID, 指令)的统计对象，不存在时创建
+        输入参数:
+            scs_id - 舵机ID
+            instruction - 指令代码
+        输出: TransactionStats对象
+        功能: 返回用于累加的统计对象
+        """
+        key = (scs_id, instruction)
+        stats = self.stats.get(key)
+        if stats is None:
+            with self.lock:
+                stats = self.stats.setdefault(key, TransactionStats())
+        return stats
+
+    def recordTx(self, scs_id, instruction, length):
+        """
+        记录一次指令包发送
+        输入参数:
+            scs_id - 目标舵机ID
+            instruction - 指令代码
+            length - 发送字节数
+        输出: 无
+        功能: 累加事务数和发送字节数
+        """
+        stats = self.getStats(scs_id, instruction)
+        stats.transactions += 1
+        stats.tx_bytes += length
+
+    def recordRetry(self, scs_id, instruction):
+        """
+        记录一次重试
+        输入参数:
+            scs_id - 目标舵机ID
+            instruction - 指令代码
+        输出: 无
+        功能: 累加重试次数
+        """
+        self.getStats(scs_id, instruction).retries += 1
+
+    def recordDeadlineMiss(self, scs_id, instruction):
+        """
+        记录一次因剩余时间不足而未发送的事务
+        输入参数:
+            scs_id - 目标舵机ID
+            instruction - 指令代码
+        输出: 无
+        功能: 累加错过截止时间次数
+        """
+        self.getStats(scs_id, instruction).deadline_misses += 1
+
+    def recordRx(self, scs_id, instruction, length, result, error, latency=None):
+        """
+        记录一次接收结果
+        输入参数:
+            scs_id - 舵机ID
+            instruction - 对应的指令代码
+            length - 接收字节数
+            result - 通信结果代码
+            error - 状态包中的错误位
+            latency - 事务延迟（秒，由调用者按端口时钟计算），None表示不记录延迟
+        输出: 无
+        功能: 累加接收字节数、超时/错过截止时间/校验失败次数、舵机错误位，并记录延迟直方图
+        """
+        stats = self.getStats(scs_id, instruction)
+        stats.responses += 1
+        stats.rx_bytes += length
+
+        if result == COMM_RX_TIMEOUT:
+            stats.timeouts += 1
+        elif result == COMM_DEADLINE_MISS:
+            stats.deadline_misses += 1
+        elif result == COMM_RX_CORRUPT:
+            stats.checksum_failures += 1
+        elif result != COMM_SUCCESS:
+            stats.other_failures += 1
+
+        if error:
+            for bit, name in ERROR_BIT_NAMES:
+                if error & bit:
+                    stats.error_bits[name] = stats.error_bits.get(name, 0) + 1
+
+        if latency is not None and result == COMM_SUCCESS:
+            stats.latency_buckets[bisect.bisect_left(LATENCY_BUCKETS, latency)] += 1
+            stats.latency_sum += latency
+            stats.latency_count += 1
+
+    def snapshot(self):
+        """
+        拉取当前所有指标
+        输入参数: 无
+        输出: 字典，(舵机ID, 指令) -> 统计字典
+        功能: 返回当前指标的独立副本
+        """
+        with self.lock:
+            items = list(self.stats.items())
+        return dict((key, stats.asDict()) for key, stats in items)
+
+    def reset(self):
+        """
+        清空所有指标
+        输入参数: 无
+        输出: 无
+        功能: 丢弃已累计的统计数据
+        """
+        with self.lock:
+            self.stats = {}
+
+    def formatPrometheus(self):
+        """
+        生成Prometheus文本格式的指标
+        输入参数: 无
+        输出: 字符串，Prometheus文本格式（0.0.4）
+        功能: 将所有指标转换为Prometheus可抓取的文本
+        """
+        snapshot = sorted(self.snapshot().items())
+        counters = (
+            ('scservo_transactions_total', 'transactions', 'Instruction packets sent.'),
+            ('scservo_retries_total', 'retries', 'Transactions retried by the retry policy.'),
+            ('scservo_tx_bytes_total', 'tx_bytes', 'Bytes sent.'),
+            ('scservo_rx_bytes_total', 'rx_bytes', 'Bytes received.'),
+            ('scservo_rx_timeouts_total', 'timeouts', 'Status packets not received in time.'),
+            ('scservo_deadline_misses_total', 'deadline_misses', 'Transactions that could not finish before their deadline.'),
+            ('scservo_rx_corrupt_total', 'checksum_failures', 'Corrupt or incomplete status packets.'),
+            ('scservo_rx_failures_total', 'other_failures', 'Other receive failures.'),
+        )
+        lines = []
+        for name, field, help_text in counters:
+            lines.append('# HELP %s %s' % (name, help_text))
+            lines.append('# TYPE %s counter' % name)
+            for (scs_id, instruction), stats in snapshot:
+                lines.append('%s{%s} %d' % (name, self.labels(scs_id, instruction), stats[field]))
+
+        name = 'scservo_servo_errors_total'
+        lines.append('# HELP %s Status packets reporting a servo error bit.' % name)
+        lines.append('# TYPE %s counter' % name)
+        for (scs_id, instruction), stats in snapshot:
+            for bit_name, count in sorted(stats['error_bits'].items()):
+                lines.append('%s{%s,bit="%s"} %d' % (name, self.labels(scs_id, instruction), bit_name, count))
+
+        name = 'scservo_transaction_latency_seconds'
+        lines.append('# HELP %s Time from instruction packet to complete status packet.' % name)
+        lines.append('# TYPE %s histogram' % name)
+        for (scs_id, instruction), stats in snapshot:
+            labels = self.labels(scs_id, instruction)
+            cumulative = 0
+            for bound, count in stats['latency_buckets']:
+                cumulative += count
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append('%s_bucket{%s,le="%s"} %d' % (name, labels, le, cumulative))
+            lines.append('%s_sum{%s} %r' % (name, labels, stats['latency_sum']))
+            lines.append('%s_count{%s} %d' % (name, labels, stats['latency_count']))
+
+        return '\n'.join(lines) + '\n'
+
+    def labels(self, scs_id, instruction):
+        """
+        生成指标标签
+        输入参数:
+            scs_id - 舵机ID
+            instruction - 指令代码
+        输出: 字符串，Prometheus标签
+        功能: 将舵机ID和指令名称格式化为标签
+        """
+        return 'id="%d",instruction="%s"' % (scs_id, INSTRUCTION_NAMES.get(instruction, str(instruction)))
+
+    def dumpPrometheus(self, path):
+        """
+        将指标写入文件
+        输入参数: path - 文件路径（例如node_exporter textfile目录下的.prom文件）
+        输出: 无
+        功能: 先写入临时文件再原子替换，避免抓取到不完整的内容
+        """
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            f.write(self.formatPrometheus())
+        os.replace(tmp_path, path)
+
+    def servePrometheus(self, port, host='127.0.0.1'):
+        """
+        在本地套接字上提供指标抓取服务
+        输入参数:
+            port - 监听端口
+            host - 监听地址，默认仅本机
+        输出: HTTPServer对象
+        功能: 在后台线程中启动HTTP服务，任意路径返回Prometheus文本格式的指标
+        """
+        from http.server import BaseHTTPRequestHandler, HTTPServer
+
+        registry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = registry.formatPrometheus().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = HTTPServer((host, port), Handler)
+        thread = threading.Thread(target=self.server.serve_forever)
+        thread.daemon = True
+        thread.start()
+        return self.server
+
+    def stopServer(self):
+        """
+        停止指标抓取服务
+        输入参数: 无
+        输出: 无
+        功能: 关闭servePrometheus启动的HTTP服务
+        """
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
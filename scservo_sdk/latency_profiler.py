@@ -0,0 +1,288 @@
+#!/usr/bin/env python
+
+from .scservo_def import *
+from .protocol_packet_handler import *
+from .port_handler import TX_TIMING_RETURN
+from .sms_sts import *
+from .bus_discovery import DEFAULT_SCAN_BAUDRATES
+
+# 测量的事务类型
+PROFILE_INSTRUCTIONS = ('ping', 'read', 'write')
+
+# 每次事务等待应答的时间（毫秒），与latency_timer无关，保证慢舵机也能测到
+DEFAULT_PROFILE_TIMEOUT = 20.0
+
+# 读取测量使用的地址和长度
+PROFILE_READ_ADDRESS = SMS_STS_PRESENT_POSITION_L
+PROFILE_READ_LENGTH = 2
+
+# 写入测量使用的地址：先读出当前值再原样写回，不改变舵机状态
+PROFILE_WRITE_ADDRESS = SMS_STS_ACC
+
+# 离群值判定：大于第三四分位数 + 该系数 × 四分位距
+OUTLIER_IQR_FACTOR = 1.5
+
+# 慢舵机判定：应答延迟中位数比同一波特率下所有舵机的中位数多出该时间（毫秒）；
+# USB转串口的接收延迟对所有舵机相同，按差值而不是倍数判定
+SLOW_SERVO_MARGIN = 0.2
+
+# 推荐latency_timer时在最大应答延迟上乘的安全系数
+LATENCY_SAFETY_FACTOR = 1.5
+
+
+def percentile(values, percent):
+    """
+    计算百分位数
+    输入参数:
+        values - 已排序的数值列表
+        percent - 百分比（0~100）
+    输出: 浮点数，最近秩百分位数；列表为空时返回0.0
+    """
+    if not values:
+        return 0.0
+    rank = int(round(percent / 100.0 * (len(values) - 1)))
+    return values[min(max(rank, 0), len(values) - 1)]
+
+
+def summarize(values):
+    """
+    统计一组延迟
+    输入参数: values - 延迟列表（毫秒）
+    输出: 字典，包括样本数、最小值、中位数、p90、p99、最大值、平均值和离群值列表
+    """
+    values = sorted(values)
+    q1 = percentile(values, 25.0)
+    q3 = percentile(values, 75.0)
+    limit = q3 + OUTLIER_IQR_FACTOR * (q3 - q1)
+    return {
+        'count': len(values),
+        'min': values[0] if values else 0.0,
+        'p50': percentile(values, 50.0),
+        'p90': percentile(values, 90.0),
+        'p99': percentile(values, 99.0),
+        'max': values[-1] if values else 0.0,
+        'mean': sum(values) / len(values) if values else 0.0,
+        'outliers': [value for value in values if value > limit],
+    }
+
+
+class LatencyProfiler(object):
+    def __init__(self, ph, timeout=DEFAULT_PROFILE_TIMEOUT):
+        """
+        初始化往返延迟分析器
+        输入参数:
+            ph - 协议包处理器对象（sms_sts/hls/scscl）
+            timeout - 每次事务等待应答的时间（毫秒）
+        功能: 绕过协议层的接收超时，自行在发送前、发送完成和收到应答首字节时记录端口时钟
+              纳秒时间戳，分别统计每个(舵机ID, 波特率, 指令)的应答延迟和往返时间
+        """
+        self.ph = ph
+        self.port = ph.portHandler
+        self.timeout = timeout
+        self.turnaround = {}  # (舵机ID, 波特率, 指令) -> 应答延迟列表（毫秒，发送完成到首字节）
+        self.roundtrip = {}  # (舵机ID, 波特率, 指令) -> 往返时间列表（毫秒，发送开始到最后一个字节）
+        self.failures = {}  # (舵机ID, 波特率, 指令) -> 失败次数
+
+    def transaction(self, txpacket, rx_length):
+        """
+        执行一次带时间戳的事务
+        输入参数:
+            txpacket - 指令包（包头和校验和由txPacket填写）
+            rx_length - 期望的应答长度
+        输出: (通信结果代码, 应答数据, 发送开始时间, 发送完成时间, 首字节时间, 末字节时间) 元组，
+              时间为端口时钟纳秒，没有应答时首字节和末字节时间为None
+        功能: 首字节时间按读取时刻减去同一次读取中其余字节的传输时间估算（包括USB转串口的接收延迟）
+        """
+        port = self.port
+        clock = port.clock
+        rxpacket = []
+        first = last = None
+        port.bus_lock.acquire()
+        try:
+            start = clock.now()
+            result = self.ph.txPacket(txpacket)  # 失败时txPacket已经释放端口
+            if result != COMM_SUCCESS:
+                return result, rxpacket, start, start, None, None
+            try:
+                written = clock.now()
+                tx_done = port.tx_complete_ns if port.tx_timing != TX_TIMING_RETURN else written
+                tx_done = max(tx_done, start)
+
+                port.setPacketTimeoutNs(int(self.timeout * 1000000))
+                while len(rxpacket) < rx_length:
+                    data = port.readPort(rx_length - len(rxpacket))
+                    if data:
+                        last = clock.now()
+                        if first is None:
+                            first = last - int((len(data) - 1) * port.tx_time_per_byte * 1000000)
+                        rxpacket.extend(data)
+                    elif port.isPacketTimeout():
+                        break
+            finally:
+                port.is_using = False
+        finally:
+            port.bus_lock.release()
+
+        if not rxpacket:
+            return COMM_RX_TIMEOUT, rxpacket, start, tx_done, None, None
+        if (len(rxpacket) < rx_length or rxpacket[PKT_HEADER0] != 0xFF or rxpacket[PKT_HEADER1] != 0xFF or
+                rxpacket[PKT_ID] != txpacket[PKT_ID] or
+                (~sum(rxpacket[PKT_ID:rx_length - 1]) & 0xFF) != rxpacket[rx_length - 1]):
+            return COMM_RX_CORRUPT, rxpacket, start, tx_done, first, last
+        return COMM_SUCCESS, rxpacket, start, tx_done, first, last
+
+    def makePacket(self, scs_id, instruction, params=()):
+        """
+        生成指令包
+        输入参数:
+            scs_id - 舵机ID
+            instruction - 指令
+            params - 参数列表
+        输出: 指令包列表
+        """
+        txpacket = [0] * (6 + len(params))
+        txpacket[PKT_ID] = scs_id
+        txpacket[PKT_LENGTH] = len(params) + 2
+        txpacket[PKT_INSTRUCTION] = instruction
+        txpacket[PKT_PARAMETER0:PKT_PARAMETER0 + len(params)] = list(params)
+        return txpacket
+
+    def record(self, key, transaction):
+        """
+        记录一次事务的结果
+        输入参数:
+            key - (舵机ID, 波特率, 指令名)
+            transaction - transaction的返回值
+        输出: 通信结果代码
+        """
+        result, _, start, tx_done, first, last = transaction
+        if result != COMM_SUCCESS:
+            self.failures[key] = self.failures.get(key, 0) + 1
+            return result
+        self.turnaround.setdefault(key, []).append(max(0, first - tx_done) / 1000000.0)
+        self.roundtrip.setdefault(key, []).append((last - start) / 1000000.0)
+        return result
+
+    def profileServo(self, scs_id, samples, instructions=PROFILE_INSTRUCTIONS):
+        """
+        测量一个舵机在当前波特率下的延迟
+        输入参数:
+            scs_id - 舵机ID
+            samples - 每种指令的测量次数
+            instructions - 要测量的指令名（ping/read/write）
+        输出: 布尔值，舵机是否应答
+        功能: 先PING一次确认舵机在当前波特率下存在，写入测量前读取写入地址的当前值并原样写回
+        """
+        baudrate = self.port.getBaudRate()
+        if self.transaction(self.makePacket(scs_id, INST_PING), 6)[0] != COMM_SUCCESS:
+            return False
+
+        write_value = None
+        if 'write' in instructions:
+            result, rxpacket = self.transaction(self.makePacket(scs_id, INST_READ, (PROFILE_WRITE_ADDRESS, 1)), 7)[:2]
+            if result == COMM_SUCCESS:
+                write_value = rxpacket[PKT_PARAMETER0]
+
+        for _ in range(samples):
+            for name in instructions:
+                if name == 'ping':
+                    packet, rx_length = self.makePacket(scs_id, INST_PING), 6
+                elif name == 'read':
+                    packet = self.makePacket(scs_id, INST_READ, (PROFILE_READ_ADDRESS, PROFILE_READ_LENGTH))
+                    rx_length = 6 + PROFILE_READ_LENGTH
+                elif write_value is not None:
+                    packet, rx_length = self.makePacket(scs_id, INST_WRITE, (PROFILE_WRITE_ADDRESS, write_value)), 6
+                else:
+                    continue
+                self.record((scs_id, baudrate, name), self.transaction(packet, rx_length))
+        return True
+
+    def profile(self, scs_ids, baudrates=None, samples=20, instructions=PROFILE_INSTRUCTIONS):
+        """
+        测量所有舵机在各波特率下的延迟
+        输入参数:
+            scs_ids - 舵机ID列表
+            baudrates - 波特率列表，None表示所有舵机支持的波特率（SMS_STS_1M到SMS_STS_38400）
+            samples - 每个舵机每种指令的测量次数
+            instructions - 要测量的指令名
+        输出: 字典，波特率 -> 有应答的舵机ID列表
+        功能: 依次切换波特率测量，结束后恢复原波特率；不在该波特率下的舵机只花费一次PING超时
+        """
+        if baudrates is None:
+            baudrates = DEFAULT_SCAN_BAUDRATES
+        port = self.port
+        original_baudrate = port.getBaudRate()
+        found = {}
+        try:
+            for baudrate in baudrates:
+                if not port.setBaudRate(baudrate):
+                    continue
+                found[baudrate] = [scs_id for scs_id in scs_ids if self.profileServo(scs_id, samples, instructions)]
+        finally:
+            port.setBaudRate(original_baudrate)
+        return found
+
+    def report(self):
+        """
+        生成测量报告
+        输入参数: 无
+        输出: 字典，(舵机ID, 波特率, 指令) -> {'turnaround': 统计, 'roundtrip': 统计, 'failures': 失败次数}；
+              统计的格式见summarize
+        """
+        keys = set(self.turnaround) | set(self.failures)
+        return dict((key, {'turnaround': summarize(self.turnaround.get(key, [])),
+                           'roundtrip': summarize(self.roundtrip.get(key, [])),
+                           'failures': self.failures.get(key, 0)}) for key in keys)
+
+    def servoTurnaround(self, baudrate):
+        """
+        获取每个舵机的应答延迟中位数
+        输入参数: baudrate - 波特率
+        输出: 字典，舵机ID -> 所有指令应答延迟的中位数（毫秒）
+        """
+        values = {}
+        for (scs_id, key_baudrate, _), samples in self.turnaround.items():
+            if key_baudrate == baudrate:
+                values.setdefault(scs_id, []).extend(samples)
+        return dict((scs_id, percentile(sorted(samples), 50.0)) for scs_id, samples in values.items())
+
+    def slowServos(self, baudrate, margin=SLOW_SERVO_MARGIN):
+        """
+        找出应答明显慢于其他舵机的舵机
+        输入参数:
+            baudrate - 波特率
+            margin - 判定差值（毫秒）
+        输出: 列表，应答延迟中位数比所有舵机的中位数多出margin以上的舵机ID（升序）
+        """
+        medians = self.servoTurnaround(baudrate)
+        if not medians:
+            return []
+        fleet = percentile(sorted(medians.values()), 50.0)
+        return sorted(scs_id for scs_id, median in medians.items() if median > fleet + margin)
+
+    def recommendLatencyTimer(self, baudrate, factor=LATENCY_SAFETY_FACTOR):
+        """
+        推荐latency_timer
+        输入参数:
+            baudrate - 波特率
+            factor - 安全系数
+        输出: 浮点数，可传给PortHandler.setLatencyTimer的值（毫秒）；没有样本时返回None
+        功能: 接收超时 = 应答的传输时间 + 3字节 + latency_timer，并从发送完成开始计时，
+              所以latency_timer只需覆盖应答延迟；取该波特率下所有舵机所有指令的最大应答延迟乘以安全系数
+        """
+        values = [value for (_, key_baudrate, _), samples in self.turnaround.items() if key_baudrate == baudrate
+                  for value in samples]
+        if not values:
+            return None
+        return max(values) * factor
+
+    def apply(self, factor=LATENCY_SAFETY_FACTOR):
+        """
+        按测量结果设置端口的latency_timer
+        输入参数: factor - 安全系数
+        输出: 浮点数，设置的值（毫秒）；当前波特率没有样本时返回None且不修改
+        """
+        latency_timer = self.recommendLatencyTimer(self.port.getBaudRate(), factor)
+        if latency_timer is not None:
+            self.port.setLatencyTimer(latency_timer)
+        return latency_timer
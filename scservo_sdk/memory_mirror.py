@@ -0,0 +1,171 @@
+#!/usr/bin/env python
+
+from .scservo_def import *
+from .sms_sts import SMS_STS_ID, SMS_STS_BAUD_RATE, SMS_STS_TORQUE_ENABLE, SMS_STS_PRESENT_POSITION_L
+
+# 内存表大小
+MEMORY_TABLE_SIZE = 256
+
+# 默认缓存有效期（毫秒）
+DEFAULT_SRAM_TTL = 100.0  # SRAM读写区（扭矩使能、目标位置等）
+DEFAULT_STATUS_TTL = 0.0  # SRAM只读状态区（当前位置、负载等），0表示不从缓存读取
+
+
+class MemoryMirror(object):
+    def __init__(self, sram_ttl=DEFAULT_SRAM_TTL, status_ttl=DEFAULT_STATUS_TTL, ttl_overrides=None,
+                 sram_start=SMS_STS_TORQUE_ENABLE, status_start=SMS_STS_PRESENT_POSITION_L):
+        """
+        初始化内存表镜像
+        输入参数:
+            sram_ttl - SRAM读写区的缓存有效期（毫秒）
+            status_ttl - SRAM只读状态区的缓存有效期（毫秒）
+            ttl_overrides - 地址 -> 有效期（毫秒，None表示永久）的字典，覆盖按区域划分的默认值
+            sram_start - SRAM区起始地址，之前的地址属于EPROM，永久缓存
+            status_start - 只读状态区起始地址
+        功能: 为每个舵机维护一份内存表镜像；EPROM字段永久缓存，SRAM字段按有效期缓存；
+              通过protocol_packet_handler.setMemoryMirror挂接后，读取命中时不再访问总线，
+              写入成功时就地更新镜像
+        """
+        self.sram_ttl = sram_ttl
+        self.status_ttl = status_ttl
+        self.sram_start = sram_start
+        self.status_start = status_start
+
+        # 每个地址的有效期（毫秒），None表示永久有效
+        self.ttl = [None] * MEMORY_TABLE_SIZE
+        for address in range(sram_start, MEMORY_TABLE_SIZE):
+            self.ttl[address] = sram_ttl if address < status_start else status_ttl
+        if ttl_overrides:
+            for address, ttl in ttl_overrides.items():
+                self.ttl[address] = ttl
+
+        self.tables = {}  # 舵机ID -> 内存表镜像(bytearray)
+        self.stamps = {}  # 舵机ID -> 每个地址的更新时间（毫秒），None表示无效
+        self.errors = {}  # 舵机ID -> 最近一次状态包的错误码
+        self.hits = 0  # 缓存命中次数
+        self.misses = 0  # 缓存未命中次数
+
+    def lookup(self, scs_id, address, length, now):
+        """
+        从镜像读取
+        输入参数:
+            scs_id - 舵机ID
+            address - 起始地址
+            length - 字节数
+            now - 当前时间（毫秒）
+        输出: 字节值列表；任一字节无效或过期时返回None
+        功能: 所有字节都在有效期内时命中缓存；存入时间距今达到有效期即过期，有效期为0的地址永不命中
+        """
+        stamps = self.stamps.get(scs_id)
+        if stamps is None or address + length > MEMORY_TABLE_SIZE:
+            self.misses += 1
+            return None
+
+        ttl = self.ttl
+        for index in range(address, address + length):
+            stamp = stamps[index]
+            if stamp is None or (ttl[index] is not None and now - stamp >= ttl[index]):
+                self.misses += 1
+                return None
+
+        self.hits += 1
+        return list(self.tables[scs_id][address:address + length])
+
+    def lastError(self, scs_id):
+        """
+        获取舵机最近一次状态包的错误码
+        输入参数: scs_id - 舵机ID
+        输出: 整数，错误码；没有记录时为0
+        功能: 缓存命中时与数据一起返回，使调用者仍能看到过载、过热等错误位
+        """
+        return self.errors.get(scs_id, 0)
+
+    def store(self, scs_id, address, data, now, error=0):
+        """
+        写入镜像
+        输入参数:
+            scs_id - 舵机ID
+            address - 起始地址
+            data - 字节值列表
+            now - 数据读取或写入确认的时间（毫秒）
+            error - 该数据所在状态包的错误码
+        输出: 无
+        功能: 就地更新镜像并刷新时间戳，同时记录错误码
+        """
+        if scs_id > MAX_ID or address + len(data) > MEMORY_TABLE_SIZE:
+            return
+
+        self.errors[scs_id] = error
+
+        table = self.tables.get(scs_id)
+        if table is None:
+            table = self.tables[scs_id] = bytearray(MEMORY_TABLE_SIZE)
+            self.stamps[scs_id] = [None] * MEMORY_TABLE_SIZE
+
+        stamps = self.stamps[scs_id]
+        for index, value in enumerate(data):
+            table[address + index] = value & 0xFF
+            stamps[address + index] = now
+
+    def invalidate(self, scs_id, address=0, length=MEMORY_TABLE_SIZE):
+        """
+        使镜像失效
+        输入参数:
+            scs_id - 舵机ID，BROADCAST_ID表示所有舵机
+            address - 起始地址
+            length - 字节数
+        输出: 无
+        功能: 将指定范围标记为无效，下次读取时访问总线
+        """
+        if scs_id == BROADCAST_ID:
+            scs_ids = list(self.stamps)
+        else:
+            scs_ids = [scs_id]
+
+        for current_id in scs_ids:
+            stamps = self.stamps.get(current_id)
+            if stamps is None:
+                continue
+            for index in range(address, min(address + length, MEMORY_TABLE_SIZE)):
+                stamps[index] = None
+
+    def onWrite(self, scs_id, address, data, now, error=0):
+        """
+        处理已确认的写入
+        输入参数:
+            scs_id - 舵机ID
+            address - 起始地址
+            data - 写入的字节值列表
+            now - 写入确认时间（毫秒）
+            error - 写入状态包的错误码
+        输出: 无
+        功能: 写穿更新镜像；修改ID或波特率时，整张表失效
+        """
+        end = address + len(data)
+        if address <= SMS_STS_ID < end:
+            # ID改变后旧ID不再应答，新ID的镜像也不可信
+            self.invalidate(scs_id)
+            self.invalidate(data[SMS_STS_ID - address])
+            return
+        if address <= SMS_STS_BAUD_RATE < end:
+            self.invalidate(scs_id)
+            return
+
+        if scs_id == BROADCAST_ID:
+            self.invalidate(scs_id, address, len(data))
+        else:
+            self.store(scs_id, address, data, now, error)
+
+    def getStats(self):
+        """
+        获取命中统计
+        输入参数: 无
+        输出: 字典，包含hits、misses和hit_rate
+        功能: 返回缓存命中次数、未命中次数和命中率
+        """
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': float(self.hits) / total if total else 0.0,
+        }
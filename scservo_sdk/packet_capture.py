@@ -0,0 +1,284 @@
+#!/usr/bin/env python
+
+import struct
+
+from .scservo_def import *
+from .protocol_packet_handler import *
+from .port_handler import *
+from .clock import monotonic_ns, VirtualClock
+
+# 抓包文件格式：
+#   文件头: 8字节魔数 + 波特率(uint32)
+#   记录:   时间戳(uint64, 单调时钟纳秒) + 方向(uint8) + 长度(uint16) + 数据
+CAPTURE_MAGIC = b'SCSCAP\x01\x00'
+CAPTURE_HEADER = struct.Struct('<8sI')
+CAPTURE_RECORD = struct.Struct('<QBH')
+
+# 默认写缓冲区大小（字节）
+CAPTURE_BUFFER_SIZE = 65536
+
+
+def captureTimestamp():
+    """
+    获取抓包时间戳
+    输入参数: 无
+    输出: 整数，单调时钟纳秒
+    功能: 返回不受系统时间调整影响的时间戳
+    """
+    return monotonic_ns()
+
+
+class CaptureWriter(object):
+    def __init__(self, path, baudrate, buffer_size=CAPTURE_BUFFER_SIZE, clock=None):
+        """
+        初始化抓包写入器
+        输入参数:
+            path - 抓包文件路径
+            baudrate - 当前波特率，写入文件头
+            buffer_size - 写缓冲区大小（字节）
+            clock - 时间戳来源（端口时钟），None表示单调时钟
+        功能: 新建（或覆盖）文件并写入文件头；记录方向见port_handler中的CAPTURE_TX/CAPTURE_RX；
+              文件头中的波特率对整个文件有效，所以不追加到已有文件；记录先写入缓冲区，缓冲区满时才落盘
+        """
+        self.path = path
+        self.timestamp = clock.now if clock is not None else captureTimestamp
+        self.file = open(path, 'wb', buffer_size)
+        self.file.write(CAPTURE_HEADER.pack(CAPTURE_MAGIC, baudrate))
+
+    def record(self, direction, data):
+        """
+        追加一条记录
+        输入参数:
+            direction - 方向（CAPTURE_TX或CAPTURE_RX）
+            data - 数据（字节串或字节值列表）
+        输出: 无
+        功能: 以当前时钟时间戳（纳秒）追加一条收发记录
+        """
+        data = bytes(bytearray(data))
+        self.file.write(CAPTURE_RECORD.pack(self.timestamp(), direction, len(data)))
+        self.file.write(data)
+
+    def flush(self):
+        """
+        刷新写缓冲区
+        输入参数: 无
+        输出: 无
+        功能: 将缓冲区中的记录写入文件
+        """
+        self.file.flush()
+
+    def close(self):
+        """
+        关闭抓包文件
+        输入参数: 无
+        输出: 无
+        功能: 刷新缓冲区并关闭文件
+        """
+        self.file.close()
+
+
+class CaptureReader(object):
+    def __init__(self, path):
+        """
+        初始化抓包读取器
+        输入参数: path - 抓包文件路径
+        功能: 读取并校验文件头
+        """
+        self.path = path
+        with open(path, 'rb') as f:
+            self.data = f.read()
+
+        if len(self.data) < CAPTURE_HEADER.size:
+            raise ValueError('%s: truncated capture header' % path)
+        magic, self.baudrate = CAPTURE_HEADER.unpack_from(self.data, 0)
+        if magic != CAPTURE_MAGIC:
+            raise ValueError('%s: not a capture file' % path)
+
+    def __iter__(self):
+        """
+        遍历所有记录
+        输入参数: 无
+        输出: 迭代器，每项为(时间戳纳秒, 方向, 数据)元组
+        功能: 依次解析文件中的记录，末尾不完整的记录被忽略
+        """
+        data = self.data
+        offset = CAPTURE_HEADER.size
+        while offset + CAPTURE_RECORD.size <= len(data):
+            timestamp, direction, length = CAPTURE_RECORD.unpack_from(data, offset)
+            offset += CAPTURE_RECORD.size
+            if offset + length > len(data):
+                break
+            yield timestamp, direction, data[offset:offset + length]
+            offset += length
+
+    def records(self):
+        """
+        获取所有记录
+        输入参数: 无
+        输出: 列表，每项为(时间戳纳秒, 方向, 数据)元组
+        功能: 返回文件中的全部记录
+        """
+        return list(self)
+
+
+def decodeCapture(records):
+    """
+    将收发记录解码为数据包
+    输入参数: records - (时间戳纳秒, 方向, 数据)元组的可迭代对象
+    输出: 列表，每项为字典，包含timestamp、direction、id、instruction（接收时为error）、
+          params和checksum_ok
+    功能: 按协议帧格式（0xFF 0xFF ID LENGTH INST/ERROR PARAM... CHECKSUM）重组两个方向的数据流，
+          时间戳取帧最后一个字节所在记录的时间
+    """
+    packets = []
+    buffers = {CAPTURE_TX: bytearray(), CAPTURE_RX: bytearray()}
+
+    for timestamp, direction, data in records:
+        buf = buffers[direction]
+        buf.extend(data)
+
+        while True:
+            # 查找包头
+            idx = buf.find(b'\xff\xff')
+            if idx < 0:
+                del buf[:max(0, len(buf) - 1)]
+                break
+            if idx > 0:
+                del buf[:idx]
+            if len(buf) < PKT_LENGTH + 1:
+                break
+            if buf[PKT_ID] == 0xFF:
+                del buf[0]  # 连续的0xFF，包头后移一位
+                continue
+            total_length = buf[PKT_LENGTH] + PKT_LENGTH + 1
+            if buf[PKT_LENGTH] < 2 or total_length > RXPACKET_MAX_LEN:
+                del buf[0]
+                continue
+            if len(buf) < total_length:
+                break
+
+            checksum = ~sum(buf[PKT_ID:total_length - 1]) & 0xFF
+            packets.append({
+                'timestamp': timestamp,
+                'direction': direction,
+                'id': buf[PKT_ID],
+                'instruction': buf[PKT_INSTRUCTION],
+                'params': bytes(buf[PKT_PARAMETER0:total_length - 1]),
+                'checksum_ok': checksum == buf[total_length - 1],
+            })
+            del buf[:total_length]
+
+    return packets
+
+
+class ReplayPortHandler(PortHandler):
+    def __init__(self, path, check_tx=False):
+        """
+        初始化回放端口
+        输入参数:
+            path - 抓包文件路径
+            check_tx - 是否比对SDK发送的数据与抓包中的发送记录
+        功能: 将抓包作为传输层回放给SDK，无需硬件即可确定性地复现通信过程；
+              端口时钟为虚拟时钟，由抓包时间戳驱动
+        """
+        PortHandler.__init__(self, path)
+        reader = CaptureReader(path)
+        self.records = reader.records()
+        self.baudrate = reader.baudrate
+        self.check_tx = check_tx
+        self.tx_mismatch = 0  # 发送内容与抓包不一致的次数
+        self.cursor = 0  # 下一条待回放的记录
+        self.clock = VirtualClock(self.records[0][0] if self.records else 0)  # 由抓包时间戳驱动的虚拟时钟
+        self.echo_mode = ECHO_OFF  # 抓包中的接收记录已跳过回显
+
+    def setupPort(self, cflag_baud):
+        """
+        配置回放端口
+        输入参数: cflag_baud - 标准波特率值
+        输出: 布尔值，始终为True
+        功能: 只更新每字节传输时间，不打开任何设备
+        """
+        self.is_open = True
+        self.tx_time_per_byte = (1000.0 / self.baudrate) * 10.0
+        return True
+
+    def closePort(self):
+        """
+        关闭回放端口
+        输入参数: 无
+        输出: 无
+        """
+        self.is_open = False
+
+    def clearPort(self):
+        """
+        清空缓冲区（回放时无需操作）
+        输入参数: 无
+        输出: 无
+        """
+        pass
+
+    def getBytesAvailable(self):
+        """
+        获取可读字节数
+        输入参数: 无
+        输出: 整数，在下一条发送记录之前、且时间已到的接收字节数
+        """
+        count = 0
+        index = self.cursor
+        while index < len(self.records) and self.records[index][1] == CAPTURE_RX:
+            if self.records[index][0] > self.clock.now():
+                break
+            count += len(self.records[index][2])
+            index += 1
+        return count
+
+    def readPort(self, length):
+        """
+        读取回放数据
+        输入参数: length - 最多读取的字节数
+        输出: 字节串
+        功能: 回放下一条接收记录并把虚拟时钟推进到其时间戳；若下一条是发送记录，
+              说明原始通信在此处超时，虚拟时钟推进到该发送记录的时间后返回空数据
+        """
+        if self.cursor >= len(self.records):
+            self.clock.advance(1000000000)  # 抓包已结束，推进1秒使等待超时
+            return b''
+
+        timestamp, direction, data = self.records[self.cursor]
+        if direction != CAPTURE_RX:
+            self.clock.advanceTo(max(self.clock.now() + 1000000, timestamp))
+            return b''
+
+        self.clock.advanceTo(timestamp)
+        if len(data) > length:
+            # 只读取一部分，剩余部分留到下次读取
+            self.records[self.cursor] = (timestamp, direction, data[length:])
+            data = data[:length]
+        else:
+            self.cursor += 1
+
+        if self.bus_stats is not None and data:
+            self.bus_stats.onRx(data, self.getCurrentTime())
+        return data
+
+    def writePort(self, packet):
+        """
+        回放发送
+        输入参数: packet - SDK发送的数据包
+        输出: 整数，写入的字节数
+        功能: 丢弃尚未读取的接收记录，消耗下一条发送记录并把虚拟时钟推进到其时间戳
+        """
+        while self.cursor < len(self.records) and self.records[self.cursor][1] != CAPTURE_TX:
+            self.cursor += 1
+
+        if self.cursor < len(self.records):
+            timestamp, direction, data = self.records[self.cursor]
+            self.clock.advanceTo(timestamp)
+            if self.check_tx and data != bytes(bytearray(packet)):
+                self.tx_mismatch += 1
+            self.cursor += 1
+
+        if self.bus_stats is not None:
+            self.bus_stats.onTx(packet, len(packet), self.getCurrentTime())
+        return len(packet)
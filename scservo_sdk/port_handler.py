@@ -1,15 +1,37 @@
 #!/usr/bin/env python
 
-import time
-import serial
 import sys
-import platform
+
+try:
+    from _thread import RLock as _RLock  # 即threading.RLock，不必导入threading模块
+except ImportError:  # Python 2
+    from threading import RLock as _RLock
+
+from .bus_stats import BusStats
+from .clock import MonotonicClock
 
 # 默认波特率设置为1000000
 DEFAULT_BAUDRATE = 1000000
 # 延迟计时器设置为50毫秒
 LATENCY_TIMER = 50 
 
+# 发送完成时间的确定方式（接收超时从发送完成开始计算）
+TX_TIMING_RETURN = 0  # writePort返回的时间（数据可能仍在驱动或USB转串口的缓冲区中）
+TX_TIMING_ESTIMATE = 1  # writePort返回的时间加按波特率计算的传输时间
+TX_TIMING_DRAIN = 2  # 写入后等待输出缓冲区排空（tcdrain）的完成时间
+
+# 单线半双工转接器的回显处理方式
+ECHO_OFF = 0  # 转接器不回显
+ECHO_ON = 1  # 转接器回显发送的字节，接收时跳过
+ECHO_AUTO = 2  # 打开串口时自动检测（会向总线发送检测字节，需要时通过setEchoMode开启）
+
+# 回显检测发送的字节（不含0xFF，舵机不会当作数据包）
+ECHO_PROBE = [0x00, 0x55, 0xAA, 0x5A]
+
+# 抓包记录方向
+CAPTURE_TX = 0  # 主机发送
+CAPTURE_RX = 1  # 主机接收
+
 class PortHandler(object):
     def __init__(self, port_name):
         """
@@ -19,11 +41,23 @@ class PortHandler(object):
         """
         self.is_open = False  # 串口是否打开标志
         self.baudrate = DEFAULT_BAUDRATE  # 当前波特率
-        self.packet_start_time = 0.0  # 数据包开始时间
-        self.packet_timeout = 0.0  # 数据包超时时间
+        self.clock = MonotonicClock()  # 时钟（纳秒），可替换为VirtualClock
+        self.packet_start_ns = 0  # 数据包开始时间（纳秒）
+        self.packet_timeout_ns = 0  # 数据包超时时间（纳秒）
+        self.latency_timer = LATENCY_TIMER  # 接收超时的固定余量（毫秒）
+        self.tx_timing = TX_TIMING_ESTIMATE  # 发送完成时间的确定方式
+        self.tx_complete_ns = 0  # 最近一次发送的完成时间（纳秒）
+        self.echo_mode = ECHO_OFF  # 回显处理方式
+        self.echo = False  # 转接器是否回显发送的字节
+        self.echo_pending = 0  # 已发送但尚未从接收端跳过的回显字节数
         self.tx_time_per_byte = 0.0  # 每字节传输时间
+        self.packet_deadline = None  # 数据包截止时间（毫秒），None表示不限制
+        self.packet_deadline_bound = False  # 当前超时时间是否由截止时间决定
+        self.bus_stats = None  # 总线利用率统计（None表示不统计）
+        self.capture = None  # 抓包写入器（None表示不抓包）
 
         self.is_using = False  # 串口是否正在使用标志
+        self.bus_lock = _RLock()  # 总线锁，多个线程共享串口时用于保护一次完整的收发事务
         self.port_name = port_name  # 串口设备名称
         self.ser = None  # 串口对象
 
@@ -32,9 +66,13 @@ class PortHandler(object):
         打开串口
         输入参数: 无
         输出: 布尔值，表示是否成功打开串口
-        功能: 使用当前波特率设置打开串口
+        功能: 使用当前波特率设置打开串口；回显处理方式为ECHO_AUTO时检测转接器是否回显
         """
-        return self.setBaudRate(self.baudrate)
+        if not self.setBaudRate(self.baudrate):
+            return False
+        if self.echo_mode == ECHO_AUTO:
+            self.echo = self.detectEcho()
+        return True
 
     def closePort(self):
         """
@@ -51,9 +89,15 @@ class PortHandler(object):
         清空串口缓冲区
         输入参数: 无
         输出: 无
-        功能: 清空串口的输入输出缓冲区
-        """
-        self.ser.flush()
+        功能: 丢弃输入缓冲区中残留的数据（如上一次事务超时后才到达的应答）；
+              回显总是先于应答到达，丢弃的字节先抵扣待跳过的回显字节数
+        """
+        if self.echo_pending:
+            waiting = self.ser.in_waiting
+            if waiting:
+                discarded = len(self.ser.read(waiting))
+                self.echo_pending -= min(discarded, self.echo_pending)
+        self.ser.reset_input_buffer()
 
     def setPortName(self, port_name):
         """
@@ -103,23 +147,56 @@ class PortHandler(object):
         获取可读字节数
         输入参数: 无
         输出: 整数，输入缓冲区中的字节数
-        功能: 返回串口输入缓冲区中当前可读取的字节数量
+        功能: 返回串口输入缓冲区中当前可读取的字节数量（不含待跳过的回显字节）
         """
-        return self.ser.in_waiting
+        return max(self.ser.in_waiting - self.echo_pending, 0)
 
     def readPort(self, length):
         """
         从串口读取数据
         输入参数: length - 要读取的字节数
         输出: 字节列表或字节串，取决于Python版本
-        功能: 从串口读取指定长度的数据，兼容Python 2和3
-        """
-        if (sys.version_info > (3, 0)):
-            # Python 3: 返回字节串
-            return self.ser.read(length)
-        else:
+        功能: 从串口读取指定长度的数据，兼容Python 2和3；转接器回显时按字节数跳过
+              最近发送的字节，不需要逐字节比较或重新同步包头
+        """
+        data = self.ser.read(length + self.echo_pending)
+        if self.echo_pending:
+            skip = min(self.echo_pending, len(data))
+            self.echo_pending -= skip
+            data = data[skip:]
+
+        if (sys.version_info < (3, 0)):
             # Python 2: 返回字节值列表
-            return [ord(ch) for ch in self.ser.read(length)]
+            data = [ord(ch) for ch in data]
+
+        if self.bus_stats is not None and data:
+            self.bus_stats.onRx(data, self.getCurrentTime())
+        if self.capture is not None and data:
+            self.capture.record(CAPTURE_RX, data)
+
+        return data
+
+    def readPortInto(self, buffer):
+        """
+        从串口读取数据到缓冲区
+        输入参数: buffer - 可写缓冲区（bytearray或memoryview），最多读取len(buffer)字节
+        输出: 整数，读取的字节数
+        功能: 串口对象支持readinto时直接写入缓冲区，不产生新的字节串对象；
+              需要跳过回显时按readPort读取后复制
+        """
+        if self.echo_pending or not hasattr(type(self.ser), 'readinto'):  # 检查类型，不创建绑定方法对象
+            data = self.readPort(len(buffer))
+            buffer[:len(data)] = bytearray(data)
+            return len(data)
+
+        count = self.ser.readinto(buffer) or 0
+        if count and (self.bus_stats is not None or self.capture is not None):
+            data = bytes(buffer[:count])
+            if self.bus_stats is not None:
+                self.bus_stats.onRx(data, self.getCurrentTime())
+            if self.capture is not None:
+                self.capture.record(CAPTURE_RX, data)
+        return count
 
     def writePort(self, packet):
         """
@@ -128,28 +205,189 @@ class PortHandler(object):
         输出: 整数，实际写入的字节数
         功能: 将数据写入串口输出缓冲区
         """
-        return self.ser.write(packet)
+        written = self.ser.write(packet)
+        if self.echo:
+            self.echo_pending += written
+
+        if self.tx_timing == TX_TIMING_ESTIMATE:
+            self.tx_complete_ns = self.clock.now() + int(written * self.tx_time_per_byte * 1000000)
+        elif self.tx_timing == TX_TIMING_DRAIN:
+            self.ser.flush()  # pyserial的flush在POSIX上为tcdrain，等待最后一个字节发送完成
+            self.tx_complete_ns = self.clock.now()
+
+        if self.bus_stats is not None:
+            self.bus_stats.onTx(packet, written, self.getCurrentTime())
+        if self.capture is not None:
+            self.capture.record(CAPTURE_TX, packet)
+
+        return written
+
+    def enableBusStats(self):
+        """
+        开启总线利用率统计
+        输入参数: 无
+        输出: BusStats对象
+        功能: 从当前时间开始统计总线字节数、传输时间、应答等待时间和空闲时间
+        """
+        self.bus_stats = BusStats(self)
+        return self.bus_stats
+
+    def startCapture(self, path):
+        """
+        开始抓包
+        输入参数: path - 抓包文件路径（已存在时覆盖）
+        输出: CaptureWriter对象
+        功能: 将之后每次writePort和readPort收发的数据连同单调时钟纳秒时间戳记录到文件；
+              文件头只记录当前波特率，改变波特率后应重新开始抓包
+        """
+        from .packet_capture import CaptureWriter
+
+        self.stopCapture()
+        self.capture = CaptureWriter(path, self.baudrate, clock=self.clock)
+        return self.capture
+
+    def stopCapture(self):
+        """
+        停止抓包
+        输入参数: 无
+        输出: 无
+        功能: 刷新并关闭抓包文件
+        """
+        if self.capture is not None:
+            self.capture.close()
+            self.capture = None
+
+    def disableBusStats(self):
+        """
+        关闭总线利用率统计
+        输入参数: 无
+        输出: 无
+        功能: 停止统计，读写路径不再产生额外开销
+        """
+        self.bus_stats = None
 
     def setPacketTimeout(self, packet_length):
         """
         设置数据包超时时间（基于数据包长度）
         输入参数: packet_length - 数据包长度（字节数）
         输出: 无
-        功能: 根据数据包长度计算并设置超时时间
+        功能: 根据数据包长度计算并设置超时时间；超时从指令包发送完成时开始计算
         """
-        self.packet_start_time = self.getCurrentTime()
         # 计算超时时间：传输时间 + 额外缓冲时间 + 固定延迟
-        self.packet_timeout = (self.tx_time_per_byte * packet_length) + (self.tx_time_per_byte * 3.0) + LATENCY_TIMER
+        self.setPacketTimeoutNs(int(((self.tx_time_per_byte * packet_length) + (self.tx_time_per_byte * 3.0) +
+                                     self.latency_timer) * 1000000))
+
+    def setPacketTimeoutNs(self, timeout_ns):
+        """
+        设置预先计算的数据包超时时间
+        输入参数: timeout_ns - 超时时间（纳秒）
+        输出: 无
+        功能: 从指令包发送完成时开始计时；超过截止时间（packet_deadline）时缩短为剩余时间，
+              此时超时记为错过截止时间。setPacketTimeout和setPacketTimeoutMillis都经由这里设置
+        """
+        self.packet_start_ns = self.clock.now()
+        if self.tx_complete_ns > self.packet_start_ns:
+            self.packet_start_ns = self.tx_complete_ns  # 指令包尚未发送完成
+        self.packet_timeout_ns = timeout_ns
+        self.packet_deadline_bound = False
+        if self.packet_deadline is not None:
+            remaining = int(self.packet_deadline * 1000000) - self.packet_start_ns
+            if remaining < self.packet_timeout_ns:
+                # 超时时间不超过截止时间，此时超时记为错过截止时间
+                self.packet_timeout_ns = remaining
+                self.packet_deadline_bound = True
 
     def setPacketTimeoutMillis(self, msec):
         """
         设置数据包超时时间（毫秒）
         输入参数: msec - 超时时间（毫秒）
         输出: 无
-        功能: 直接设置数据包超时时间为指定的毫秒数
+        功能: 直接设置数据包超时时间为指定的毫秒数，同样受截止时间限制
+        """
+        self.setPacketTimeoutNs(int(msec * 1000000))
+
+    def setLatencyTimer(self, msec):
+        """
+        设置接收超时的固定余量
+        输入参数: msec - 余量（毫秒），应不小于USB转串口的延迟计时器加舵机应答延迟
+        输出: 无
+        功能: 默认LATENCY_TIMER（50毫秒）；超时从发送完成开始计算后可以按转接器设置减小
+        """
+        self.latency_timer = msec
+
+    def setTxTiming(self, mode):
+        """
+        设置发送完成时间的确定方式
+        输入参数: mode - TX_TIMING_RETURN、TX_TIMING_ESTIMATE（默认）或TX_TIMING_DRAIN
+        输出: 无
+        功能: TX_TIMING_DRAIN在每次写入后等待输出排空，得到真实的发送完成时间，
+              代价是writePort阻塞到数据发送完成
+        """
+        self.tx_timing = mode
+        self.tx_complete_ns = 0
+
+    def setEchoMode(self, mode):
+        """
+        设置回显处理方式
+        输入参数: mode - ECHO_OFF（默认）、ECHO_ON或ECHO_AUTO
+        输出: 无
+        功能: ECHO_AUTO在串口已打开时立即检测，否则在openPort时检测
+        """
+        self.echo_mode = mode
+        self.echo_pending = 0
+        if mode == ECHO_AUTO:
+            self.echo = self.detectEcho() if self.is_open else False
+        else:
+            self.echo = (mode == ECHO_ON)
+
+    def detectEcho(self):
+        """
+        检测转接器是否回显
+        输入参数: 无
+        输出: 布尔值，发送的检测字节是否原样出现在接收端
+        功能: 发送ECHO_PROBE并等待传输时间加latency_timer；检测字节不含包头，
+              总线上的舵机不会应答；不回显的转接器需要等待完整的时间
+        """
+        self.echo_pending = 0
+        self.ser.reset_input_buffer()
+        self.ser.write(bytearray(ECHO_PROBE))
+        timeout_ns = int((self.tx_time_per_byte * len(ECHO_PROBE) + self.latency_timer) * 1000000)
+        start = self.clock.now()
+        received = bytearray()
+        while len(received) < len(ECHO_PROBE) and self.clock.now() - start <= timeout_ns:
+            received.extend(bytearray(self.ser.read(len(ECHO_PROBE) - len(received))))
+        self.ser.reset_input_buffer()
+        return received == bytearray(ECHO_PROBE)
+
+    def setPacketDeadline(self, deadline):
+        """
+        设置数据包截止时间
+        输入参数: deadline - 绝对截止时间（毫秒，与getCurrentTime同一时间基准），None表示不限制
+        输出: 无
+        功能: 设置后，setPacketTimeout计算出的超时时间不会超过该截止时间
+        """
+        self.packet_deadline = deadline
+
+    def limitPacketDeadline(self, deadline):
+        """
+        收紧数据包截止时间
+        输入参数: deadline - 绝对截止时间（毫秒）
+        输出: 原来的截止时间，事务结束后通过setPacketDeadline恢复
+        功能: 取当前截止时间和新截止时间中较早的一个，嵌套调用时外层的截止时间仍然有效
+        """
+        previous = self.packet_deadline
+        if previous is None or deadline < previous:
+            self.packet_deadline = deadline
+        return previous
+
+    def getDeadline(self, msec):
         """
-        self.packet_start_time = self.getCurrentTime()
-        self.packet_timeout = msec
+        计算截止时间
+        输入参数: msec - 从现在起的时间（毫秒）
+        输出: 浮点数，绝对截止时间（毫秒，与getCurrentTime同一时间基准）
+        功能: 为带deadline参数的读写函数生成截止时间
+        """
+        return self.getCurrentTime() + msec
 
     def isPacketTimeout(self):
         """
@@ -158,8 +396,8 @@ class PortHandler(object):
         输出: 布尔值，表示是否超时
         功能: 检查自数据包开始时间以来是否已超过超时时间
         """
-        if self.getTimeSinceStart() > self.packet_timeout:
-            self.packet_timeout = 0  # 重置超时时间
+        if self.clock.now() - self.packet_start_ns > self.packet_timeout_ns:
+            self.packet_timeout_ns = 0  # 重置超时时间
             return True  # 已超时
 
         return False  # 未超时
@@ -169,23 +407,36 @@ class PortHandler(object):
         获取当前时间（毫秒精度）
         输入参数: 无
         输出: 浮点数，当前时间（毫秒）
-        功能: 返回当前时间，精度为毫秒
+        功能: 返回端口时钟的当前时间，截止时间、缓存有效期等毫秒时间均以此为基准
+        """
+        return self.clock.now() / 1000000.0
+
+    def getCurrentTimeNs(self):
+        """
+        获取当前时间（纳秒）
+        输入参数: 无
+        输出: 整数，端口时钟的当前时间（纳秒）
         """
-        return round(time.time() * 1000000000) / 1000000.0
+        return self.clock.now()
 
     def getTimeSinceStart(self):
         """
         获取自数据包开始时间以来的时间
         输入参数: 无
         输出: 浮点数，经过的时间（毫秒）
-        功能: 计算并返回自数据包开始时间以来经过的时间
+        功能: 计算并返回自数据包开始时间以来经过的时间；单调时钟不会回退
         """
-        time_since = self.getCurrentTime() - self.packet_start_time
-        if time_since < 0.0:
-            # 时间异常，重置开始时间
-            self.packet_start_time = self.getCurrentTime()
+        return (self.clock.now() - self.packet_start_ns) / 1000000.0
 
-        return time_since
+    def setClock(self, clock):
+        """
+        设置端口时钟
+        输入参数: clock - 提供now()（纳秒）、sleep(ns)和idle(until)的时钟对象，
+                  如MonotonicClock或VirtualClock
+        输出: 无
+        功能: 所有超时、截止时间和统计计时都使用该时钟
+        """
+        self.clock = clock
 
     def setupPort(self, cflag_baud):
         """
@@ -198,6 +449,8 @@ class PortHandler(object):
             # 如果串口已打开，先关闭
             self.closePort()
 
+        import serial  # 只在打开真实串口时导入pyserial
+
         # 创建并配置串口对象
         self.ser = serial.Serial(
             port=self.port_name,
@@ -225,7 +478,7 @@ class PortHandler(object):
         功能: 检查指定的波特率是否在支持的波特率列表中
         """
         # 支持的波特率列表
-        if baudrate in [4800, 9600, 14400, 19200, 38400, 57600, 115200, 128000, 250000, 500000, 1000000]:
+        if baudrate in [4800, 9600, 14400, 19200, 38400, 57600, 76800, 115200, 128000, 250000, 500000, 1000000]:
             return baudrate  # 返回支持的波特率
         else:
             return -1  # 不支持的波特率    
@@ -34,6 +34,143 @@ class protocol_packet_handler(object):
         """
         self.portHandler = portHandler
         self.scs_end = protocol_end
+        self.metrics = None  # 指标注册表（None表示不记录）
+        self.retry_policy = None  # 重试策略（None表示不重试）
+        self.memory_mirror = None  # 内存表镜像（None表示不缓存）
+        self.write_dedup = None  # 写入去重器（None表示不去重）
+        self.write_planner = None  # 最小差异写入规划器（None表示未挂接）
+        self.tx_start_time = 0  # 最近一次发送的开始时间（端口时钟纳秒，仅在记录指标时更新）
+        self.tx_id = BROADCAST_ID  # 最近一次发送的舵机ID（仅在记录指标时更新）
+        self.tx_instruction = 0  # 最近一次发送的指令（仅在记录指标时更新）
+
+    def setMetrics(self, metrics):
+        """
+        设置指标注册表。
+        
+        参数:
+            metrics: MetricsRegistry对象，None表示关闭记录
+        """
+        self.metrics = metrics
+
+    def setRetryPolicy(self, policy):
+        """
+        设置重试策略。
+        
+        参数:
+            policy: RetryPolicy对象，None表示不重试
+        """
+        self.retry_policy = policy
+
+    def setMemoryMirror(self, mirror):
+        """
+        设置内存表镜像。
+        
+        参数:
+            mirror: MemoryMirror对象，None表示不缓存
+        """
+        self.memory_mirror = mirror
+
+    def enableWriteDedup(self, refresh=1000.0):
+        """
+        开启目标寄存器写入去重。
+        
+        参数:
+            refresh: 强制重发间隔（毫秒），None表示从不强制重发
+            
+        返回:
+            WriteDeduplicator: 去重器对象，可读取skipped_writes和bytes_saved
+        """
+        from .write_dedup import WriteDeduplicator
+
+        self.write_dedup = WriteDeduplicator(refresh)
+        if getattr(self, 'groupSyncWrite', None) is not None:
+            self.groupSyncWrite.write_dedup = self.write_dedup
+        return self.write_dedup
+
+    def disableWriteDedup(self):
+        """
+        关闭目标寄存器写入去重。
+        """
+        self.write_dedup = None
+        if getattr(self, 'groupSyncWrite', None) is not None:
+            self.groupSyncWrite.write_dedup = None
+
+    def setWritePlanner(self, planner):
+        """
+        挂接最小差异写入规划器，使其记录与内存表镜像、写入去重记录在同样的位置失效。
+        
+        参数:
+            planner: WritePlanner对象，None表示取消挂接
+        """
+        self.write_planner = planner
+
+    def isDuplicateWrite(self, scs_id, address, data, saved_bytes):
+        """
+        检查写入是否与上次确认的值相同，相同时记入节省的字节数。
+        
+        参数:
+            scs_id: 舵机ID
+            address: 起始地址
+            data: 待写入的字节值列表
+            saved_bytes: 跳过本次写入节省的总线字节数
+            
+        返回:
+            bool: 是否可以跳过本次写入（未开启去重时为False）
+        """
+        dedup = self.write_dedup
+        if dedup is None or not dedup.isDuplicate(scs_id, address, data, self.portHandler.getCurrentTime()):
+            return False
+        dedup.skip(saved_bytes)
+        return True
+
+    def writeGoalTxRx(self, scs_id, address, data, force=False, deadline=None):
+        """
+        写入目标寄存器并接收响应，与上次确认的值相同时跳过。
+        
+        参数:
+            scs_id: 舵机ID
+            address: 起始地址
+            data: 要写入的数据列表
+            force: 是否强制发送
+            deadline: 绝对截止时间（毫秒），None表示不限制
+            
+        返回:
+            tuple: (通信结果代码, 错误码)，跳过时为(COMM_SUCCESS, 0)
+        """
+        length = len(data)
+        # 跳过时节省一个写入包（数据 + 7字节）和一个状态包（6字节）
+        if not force and self.isDuplicateWrite(scs_id, address, data, length + 7 + 6):
+            return COMM_SUCCESS, 0
+
+        result, error = self.writeTxRx(scs_id, address, length, data, deadline)
+        if result == COMM_SUCCESS and self.write_dedup is not None:
+            self.write_dedup.commit(scs_id, address, data, self.portHandler.getCurrentTime())
+        return result, error
+
+    def txLatency(self):
+        """
+        计算从最近一次发送开始到现在的时间（用于记录指标）。
+        
+        返回:
+            float: 延迟（秒），按端口时钟计算
+        """
+        return (self.portHandler.clock.now() - self.tx_start_time) / 1000000000.0
+
+    def invalidateCaches(self, scs_id, address, length):
+        """
+        使内存表镜像、写入去重记录和写入规划器记录的指定范围失效（未挂接时不做任何操作）。
+        
+        参数:
+            scs_id: 舵机ID（BROADCAST_ID表示所有舵机）
+            address: 起始地址
+            length: 字节数
+        """
+        if self.memory_mirror is not None:
+            self.memory_mirror.invalidate(scs_id, address, length)
+        if self.write_dedup is not None:
+            self.write_dedup.forget(scs_id, address, length)
+        if self.write_planner is not None:
+            self.write_planner.forget(scs_id, address, length)
 
     def scs_getend(self):
         """
@@ -205,6 +342,8 @@ class protocol_packet_handler(object):
             return "[TxRxResult] Incorrect status packet!"
         elif result == COMM_NOT_AVAILABLE:
             return "[TxRxResult] Protocol does not support this function!"
+        elif result == COMM_DEADLINE_MISS:
+            return "[TxRxResult] Transaction cannot complete before the deadline!"
         else:
             return ""
 
@@ -252,6 +391,12 @@ class protocol_packet_handler(object):
             return COMM_PORT_BUSY
         self.portHandler.is_using = True
 
+        metrics = self.metrics
+        if metrics is not None:
+            self.tx_start_time = self.portHandler.clock.now()
+            self.tx_id = txpacket[PKT_ID]
+            self.tx_instruction = txpacket[PKT_INSTRUCTION]
+
         # 检查包长度是否超限
         if total_packet_length > TXPACKET_MAX_LEN:
             self.portHandler.is_using = False
@@ -274,12 +419,18 @@ class protocol_packet_handler(object):
             self.portHandler.is_using = False
             return COMM_TX_FAIL
 
+        if metrics is not None:
+            metrics.recordTx(txpacket[PKT_ID], txpacket[PKT_INSTRUCTION], total_packet_length)
+
         return COMM_SUCCESS
 
-    def rxPacket(self):
+    def rxPacket(self, record=True):
         """
         接收数据包。
         
+        参数:
+            record: 是否按最近一次发送的指令记录指标（由调用者统一记录时为False）
+            
         返回:
             tuple: (接收到的数据包列表, 通信结果代码)
         """
@@ -315,7 +466,9 @@ class protocol_packet_handler(object):
                     if rx_length < wait_length:
                         # 检查超时
                         if self.portHandler.isPacketTimeout():
-                            if rx_length == 0:
+                            if self.portHandler.packet_deadline_bound:
+                                result = COMM_DEADLINE_MISS
+                            elif rx_length == 0:
                                 result = COMM_RX_TIMEOUT
                             else:
                                 result = COMM_RX_CORRUPT
@@ -343,18 +496,125 @@ class protocol_packet_handler(object):
             else:
                 # 检查超时
                 if self.portHandler.isPacketTimeout():
-                    if rx_length == 0:
+                    if self.portHandler.packet_deadline_bound:
+                        result = COMM_DEADLINE_MISS
+                    elif rx_length == 0:
                         result = COMM_RX_TIMEOUT
                     else:
                         result = COMM_RX_CORRUPT
                     break
 
         self.portHandler.is_using = False
+
+        if record and self.metrics is not None:
+            if result == COMM_SUCCESS:
+                self.metrics.recordRx(rxpacket[PKT_ID], self.tx_instruction, len(rxpacket), result,
+                                      rxpacket[PKT_ERROR], self.txLatency())
+            else:
+                self.metrics.recordRx(self.tx_id, self.tx_instruction, len(rxpacket), result, 0, self.txLatency())
+
         return rxpacket, result
 
-    def txRxPacket(self, txpacket):
+    def getStatusLength(self, txpacket):
+        """
+        获取指令包对应的状态包长度。
+        
+        参数:
+            txpacket: 指令包
+            
+        返回:
+            int: 状态包字节数（广播指令没有状态包，为0）
+        """
+        if txpacket[PKT_ID] == BROADCAST_ID:
+            return 0
+        elif txpacket[PKT_INSTRUCTION] == INST_READ:
+            return txpacket[PKT_PARAMETER0 + 1] + 6
+        else:
+            return 6
+
+    def checkDeadline(self, scs_id, instruction, tx_length, rx_length, deadline):
+        """
+        检查事务能否在截止时间前完成，不能完成时记入指标。
+        
+        参数:
+            scs_id: 舵机ID
+            instruction: 指令代码
+            tx_length: 发送字节数
+            rx_length: 接收字节数
+            deadline: 绝对截止时间（毫秒，与端口时钟同一基准）
+            
+        返回:
+            bool: 剩余时间是否足够完成指令包和状态包的传输
+        """
+        port = self.portHandler
+        if port.getCurrentTime() + (tx_length + rx_length) * port.tx_time_per_byte <= deadline:
+            return True
+        if self.metrics is not None:
+            self.metrics.recordDeadlineMiss(scs_id, instruction)
+        return False
+
+    def txRxPacket(self, txpacket, deadline=None):
+        """
+        发送并接收数据包（事务处理），失败时按重试策略重试。
+        
+        参数:
+            txpacket: 要发送的数据包列表
+            deadline: 绝对截止时间（毫秒，与端口时钟同一基准），None表示不限制
+            
+        返回:
+            tuple: (接收到的数据包列表, 通信结果代码, 错误码)
+        """
+        if deadline is not None:
+            return self.txRxPacketBefore(txpacket, deadline)
+
+        policy = self.retry_policy
+        if policy is None:
+            return self.txRxPacketOnce(txpacket)
+
+        start_time = self.portHandler.getCurrentTime()
+        rxpacket, result, error = self.txRxPacketOnce(txpacket)
+        if result == COMM_SUCCESS:
+            return rxpacket, result, error
+
+        # 估算一次重试的耗时
+        estimate = policy.estimateTime(self.portHandler, txpacket[PKT_LENGTH] + 4, self.getStatusLength(txpacket))
+
+        attempt = 0
+        while policy.shouldRetry(self.portHandler, txpacket[PKT_INSTRUCTION], result, attempt, start_time, estimate):
+            attempt += 1
+            if self.metrics is not None:
+                self.metrics.recordRetry(txpacket[PKT_ID], txpacket[PKT_INSTRUCTION])
+            policy.wait(self.portHandler)
+            rxpacket, result, error = self.txRxPacketOnce(txpacket)
+
+        return rxpacket, result, error
+
+    def txRxPacketBefore(self, txpacket, deadline):
+        """
+        在截止时间前发送并接收数据包。
+        
+        参数:
+            txpacket: 要发送的数据包列表
+            deadline: 绝对截止时间（毫秒，与端口时钟同一基准）
+            
+        返回:
+            tuple: (接收到的数据包列表, 通信结果代码, 错误码)；剩余时间不足以完成传输时
+                   不发送，返回COMM_DEADLINE_MISS；接收超时由截止时间决定时同样返回COMM_DEADLINE_MISS
         """
-        发送并接收数据包（事务处理）。
+        if not self.checkDeadline(txpacket[PKT_ID], txpacket[PKT_INSTRUCTION], txpacket[PKT_LENGTH] + 4,
+                                  self.getStatusLength(txpacket), deadline):
+            return None, COMM_DEADLINE_MISS, 0
+
+        # 接收超时取协议估算值与剩余时间中较小的一个，重试策略也只在剩余时间内重试
+        previous = self.portHandler.limitPacketDeadline(deadline)
+        try:
+            return self.txRxPacket(txpacket)
+        finally:
+            self.portHandler.setPacketDeadline(previous)
+
+    def txRxPacketOnce(self, txpacket):
+        """
+        发送并接收数据包（单次尝试，不重试）。
         
         参数:
             txpacket: 要发送的数据包列表
@@ -383,21 +643,26 @@ class protocol_packet_handler(object):
 
         # 接收数据包
         while True:
-            rxpacket, result = self.rxPacket()
+            rxpacket, result = self.rxPacket(False)
             if result != COMM_SUCCESS or txpacket[PKT_ID] == rxpacket[PKT_ID]:
                 break
 
         if result == COMM_SUCCESS and txpacket[PKT_ID] == rxpacket[PKT_ID]:
             error = rxpacket[PKT_ERROR]
 
+        if self.metrics is not None:
+            self.metrics.recordRx(txpacket[PKT_ID], txpacket[PKT_INSTRUCTION], len(rxpacket), result, error,
+                                  self.txLatency())
+
         return rxpacket, result, error
 
-    def ping(self, scs_id):
+    def ping(self, scs_id, deadline=None):
         """
         Ping舵机，获取模型号。
         
         参数:
             scs_id: 舵机ID
+            deadline: 绝对截止时间（毫秒），None表示不限制
             
         返回:
             tuple: (模型号, 通信结果代码, 错误码)
@@ -414,11 +679,11 @@ class protocol_packet_handler(object):
         txpacket[PKT_LENGTH] = 2
         txpacket[PKT_INSTRUCTION] = INST_PING
 
-        rxpacket, result, error = self.txRxPacket(txpacket)
+        rxpacket, result, error = self.txRxPacket(txpacket, deadline)
 
         if result == COMM_SUCCESS:
             # 读取模型号（地址3，2字节）
-            data_read, result, error = self.readTxRx(scs_id, 3, 2)
+            data_read, result, error = self.readTxRx(scs_id, 3, 2, deadline)
             if result == COMM_SUCCESS:
                 model_number = self.scs_makeword(data_read[0], data_read[1])
 
@@ -493,7 +758,7 @@ class protocol_packet_handler(object):
         data = []
 
         while True:
-            rxpacket, result = self.rxPacket()
+            rxpacket, result = self.rxPacket(False)
 
             if result != COMM_SUCCESS or rxpacket[PKT_ID] == scs_id:
                 break
@@ -503,9 +768,12 @@ class protocol_packet_handler(object):
 
             data.extend(rxpacket[PKT_PARAMETER0 : PKT_PARAMETER0+length])
 
+        if self.metrics is not None:
+            self.metrics.recordRx(scs_id, INST_READ, len(rxpacket), result, error, self.txLatency())
+
         return data, result, error
 
-    def readTxRx(self, scs_id, address, length):
+    def readTxRx(self, scs_id, address, length, deadline=None):
         """
         发送并接收读取指令（完整事务）。
         
@@ -513,6 +781,7 @@ class protocol_packet_handler(object):
             scs_id: 舵机ID
             address: 内存地址
             length: 要读取的数据长度
+            deadline: 绝对截止时间（毫秒），None表示不限制
             
         返回:
             tuple: (读取的数据列表, 通信结果代码, 错误码)
@@ -523,18 +792,28 @@ class protocol_packet_handler(object):
         if scs_id > BROADCAST_ID:
             return data, COMM_NOT_AVAILABLE, 0
 
+        # 镜像中数据有效时直接返回（错误码为该舵机最近一次状态包的错误码）
+        mirror = self.memory_mirror
+        if mirror is not None:
+            cached = mirror.lookup(scs_id, address, length, self.portHandler.getCurrentTime())
+            if cached is not None:
+                return cached, COMM_SUCCESS, mirror.lastError(scs_id)
+
         txpacket[PKT_ID] = scs_id
         txpacket[PKT_LENGTH] = 4
         txpacket[PKT_INSTRUCTION] = INST_READ
         txpacket[PKT_PARAMETER0 + 0] = address
         txpacket[PKT_PARAMETER0 + 1] = length
 
-        rxpacket, result, error = self.txRxPacket(txpacket)
+        rxpacket, result, error = self.txRxPacket(txpacket, deadline)
         if result == COMM_SUCCESS:
             error = rxpacket[PKT_ERROR]
 
             data.extend(rxpacket[PKT_PARAMETER0 : PKT_PARAMETER0+length])
 
+            if mirror is not None:
+                mirror.store(scs_id, address, data, self.portHandler.getCurrentTime(), error)
+
         return data, result, error
 
     def read1ByteTx(self, scs_id, address):
@@ -564,18 +843,19 @@ class protocol_packet_handler(object):
         data_read = data[0] if (result == COMM_SUCCESS) else 0
         return data_read, result, error
 
-    def read1ByteTxRx(self, scs_id, address):
+    def read1ByteTxRx(self, scs_id, address, deadline=None):
         """
         发送并接收1字节读取指令（完整事务）。
         
         参数:
             scs_id: 舵机ID
             address: 内存地址
+            deadline: 绝对截止时间（毫秒），None表示不限制
             
         返回:
             tuple: (读取的数据, 通信结果代码, 错误码)
         """
-        data, result, error = self.readTxRx(scs_id, address, 1)
+        data, result, error = self.readTxRx(scs_id, address, 1, deadline)
         data_read = data[0] if (result == COMM_SUCCESS) else 0
         return data_read, result, error
 
@@ -606,18 +886,19 @@ class protocol_packet_handler(object):
         data_read = self.scs_makeword(data[0], data[1]) if (result == COMM_SUCCESS) else 0
         return data_read, result, error
 
-    def read2ByteTxRx(self, scs_id, address):
+    def read2ByteTxRx(self, scs_id, address, deadline=None):
         """
         发送并接收2字节读取指令（完整事务）。
         
         参数:
             scs_id: 舵机ID
             address: 内存地址
+            deadline: 绝对截止时间（毫秒），None表示不限制
             
         返回:
             tuple: (读取的数据, 通信结果代码, 错误码)
         """
-        data, result, error = self.readTxRx(scs_id, address, 2)
+        data, result, error = self.readTxRx(scs_id, address, 2, deadline)
         data_read = self.scs_makeword(data[0], data[1]) if (result == COMM_SUCCESS) else 0
         return data_read, result, error
 
@@ -649,23 +930,24 @@ class protocol_packet_handler(object):
                                   self.scs_makeword(data[2], data[3])) if (result == COMM_SUCCESS) else 0
         return data_read, result, error
 
-    def read4ByteTxRx(self, scs_id, address):
+    def read4ByteTxRx(self, scs_id, address, deadline=None):
         """
         发送并接收4字节读取指令（完整事务）。
         
         参数:
             scs_id: 舵机ID
             address: 内存地址
+            deadline: 绝对截止时间（毫秒），None表示不限制
             
         返回:
             tuple: (读取的数据, 通信结果代码, 错误码)
         """
-        data, result, error = self.readTxRx(scs_id, address, 4)
+        data, result, error = self.readTxRx(scs_id, address, 4, deadline)
         data_read = self.scs_makedword(self.scs_makeword(data[0], data[1]),
                                   self.scs_makeword(data[2], data[3])) if (result == COMM_SUCCESS) else 0
         return data_read, result, error
 
-    def writeTxOnly(self, scs_id, address, length, data):
+    def writeTxOnly(self, scs_id, address, length, data, deadline=None):
         """
         发送写入指令（只发送，不接收响应）。
         
@@ -674,6 +956,7 @@ class protocol_packet_handler(object):
             address: 内存地址
             length: 数据长度
             data: 要写入的数据列表
+            deadline: 绝对截止时间（毫秒），None表示不限制
             
         返回:
             int: 通信结果代码
@@ -687,12 +970,18 @@ class protocol_packet_handler(object):
 
         txpacket[PKT_PARAMETER0 + 1: PKT_PARAMETER0 + 1 + length] = data[0: length]
 
+        if deadline is not None and not self.checkDeadline(scs_id, INST_WRITE, length + 7, 0, deadline):
+            return COMM_DEADLINE_MISS
+
+        # 没有应答确认，镜像和去重记录中对应范围失效
+        self.invalidateCaches(scs_id, address, length)
+
         result = self.txPacket(txpacket)
         self.portHandler.is_using = False
 
         return result
 
-    def writeTxRx(self, scs_id, address, length, data):
+    def writeTxRx(self, scs_id, address, length, data, deadline=None):
         """
         发送写入指令并接收响应。
         
@@ -701,6 +990,7 @@ class protocol_packet_handler(object):
             address: 内存地址
             length: 数据长度
             data: 要写入的数据列表
+            deadline: 绝对截止时间（毫秒），None表示不限制
             
         返回:
             tuple: (通信结果代码, 错误码)
@@ -713,7 +1003,22 @@ class protocol_packet_handler(object):
         txpacket[PKT_PARAMETER0] = address
 
         txpacket[PKT_PARAMETER0 + 1: PKT_PARAMETER0 + 1 + length] = data[0: length]
-        rxpacket, result, error = self.txRxPacket(txpacket)
+
+        # 目标寄存器被改写，去重和规划器记录失效（由writeGoalTxRx或WritePlanner调用时成功后会重新记录）
+        if self.write_dedup is not None:
+            self.write_dedup.forget(scs_id, address, length)
+        if self.write_planner is not None:
+            self.write_planner.forget(scs_id, address, length)
+
+        rxpacket, result, error = self.txRxPacket(txpacket, deadline)
+
+        # 写入成功时写穿更新镜像，否则使对应范围失效
+        mirror = self.memory_mirror
+        if mirror is not None:
+            if result == COMM_SUCCESS:
+                mirror.onWrite(scs_id, address, data[0: length], self.portHandler.getCurrentTime(), error)
+            else:
+                mirror.invalidate(scs_id, address, length)
 
         return result, error
 
@@ -732,7 +1037,7 @@ class protocol_packet_handler(object):
         data_write = [data]
         return self.writeTxOnly(scs_id, address, 1, data_write)
 
-    def write1ByteTxRx(self, scs_id, address, data):
+    def write1ByteTxRx(self, scs_id, address, data, deadline=None):
         """
         发送写入1字节指令并接收响应。
         
@@ -740,12 +1045,13 @@ class protocol_packet_handler(object):
             scs_id: 舵机ID
             address: 内存地址
             data: 要写入的数据（1字节）
+            deadline: 绝对截止时间（毫秒），None表示不限制
             
         返回:
             tuple: (通信结果代码, 错误码)
         """
         data_write = [data]
-        return self.writeTxRx(scs_id, address, 1, data_write)
+        return self.writeTxRx(scs_id, address, 1, data_write, deadline)
 
     def write2ByteTxOnly(self, scs_id, address, data):
         """
@@ -762,7 +1068,7 @@ class protocol_packet_handler(object):
         data_write = [self.scs_lobyte(data), self.scs_hibyte(data)]
         return self.writeTxOnly(scs_id, address, 2, data_write)
 
-    def write2ByteTxRx(self, scs_id, address, data):
+    def write2ByteTxRx(self, scs_id, address, data, deadline=None):
         """
         发送写入2字节指令并接收响应。
         
@@ -770,12 +1076,13 @@ class protocol_packet_handler(object):
             scs_id: 舵机ID
             address: 内存地址
             data: 要写入的数据（2字节）
+            deadline: 绝对截止时间（毫秒），None表示不限制
             
         返回:
             tuple: (通信结果代码, 错误码)
         """
         data_write = [self.scs_lobyte(data), self.scs_hibyte(data)]
-        return self.writeTxRx(scs_id, address, 2, data_write)
+        return self.writeTxRx(scs_id, address, 2, data_write, deadline)
 
     def write4ByteTxOnly(self, scs_id, address, data):
         """
@@ -795,7 +1102,7 @@ class protocol_packet_handler(object):
                       self.scs_hibyte(self.scs_hiword(data))]
         return self.writeTxOnly(scs_id, address, 4, data_write)
 
-    def write4ByteTxRx(self, scs_id, address, data):
+    def write4ByteTxRx(self, scs_id, address, data, deadline=None):
         """
         发送写入4字节指令并接收响应。
         
@@ -803,6 +1110,7 @@ class protocol_packet_handler(object):
             scs_id: 舵机ID
             address: 内存地址
             data: 要写入的数据（4字节）
+            deadline: 绝对截止时间（毫秒），None表示不限制
             
         返回:
             tuple: (通信结果代码, 错误码)
@@ -811,7 +1119,7 @@ class protocol_packet_handler(object):
                       self.scs_hibyte(self.scs_loword(data)),
                       self.scs_lobyte(self.scs_hiword(data)),
                       self.scs_hibyte(self.scs_hiword(data))]
-        return self.writeTxRx(scs_id, address, 4, data_write)
+        return self.writeTxRx(scs_id, address, 4, data_write, deadline)
 
     def regWriteTxOnly(self, scs_id, address, length, data):
         """
@@ -835,12 +1143,15 @@ class protocol_packet_handler(object):
 
         txpacket[PKT_PARAMETER0 + 1: PKT_PARAMETER0 + 1 + length] = data[0: length]
 
+        # 没有应答确认，镜像和去重记录中对应范围失效
+        self.invalidateCaches(scs_id, address, length)
+
         result = self.txPacket(txpacket)
         self.portHandler.is_using = False
 
         return result
 
-    def regWriteTxRx(self, scs_id, address, length, data):
+    def regWriteTxRx(self, scs_id, address, length, data, deadline=None):
         """
         发送注册写入指令并接收响应（不执行，等待ACTION指令触发执行）。
         
@@ -849,6 +1160,7 @@ class protocol_packet_handler(object):
             address: 内存地址
             length: 数据长度
             data: 要写入的数据列表
+            deadline: 绝对截止时间（毫秒），None表示不限制
             
         返回:
             tuple: (通信结果代码, 错误码)
@@ -862,7 +1174,10 @@ class protocol_packet_handler(object):
 
         txpacket[PKT_PARAMETER0 + 1: PKT_PARAMETER0 + 1 + length] = data[0: length]
 
-        _, result, error = self.txRxPacket(txpacket)
+        # 寄存器写入在ACTION之后才生效，镜像中对应范围失效
+        self.invalidateCaches(scs_id, address, length)
+
+        _, result, error = self.txRxPacket(txpacket, deadline)
 
         return result, error
 
@@ -918,15 +1233,19 @@ class protocol_packet_handler(object):
             else:
                 # 检查超时
                 if self.portHandler.isPacketTimeout():
-                    if rx_length == 0:
+                    if self.portHandler.packet_deadline_bound:
+                        result = COMM_DEADLINE_MISS
+                    elif rx_length == 0:
                         result = COMM_RX_TIMEOUT
                     else:
                         result = COMM_RX_CORRUPT
                     break
         self.portHandler.is_using = False
+
+        # 接收指标由GroupSyncRead按舵机记录，每个应答帧只记录一次
         return result, rxpacket
 
-    def syncWriteTxOnly(self, start_address, data_length, param, param_length):
+    def syncWriteTxOnly(self, start_address, data_length, param, param_length, deadline=None):
         """
         发送同步写入指令（只发送，不接收响应）。
         
@@ -935,6 +1254,7 @@ class protocol_packet_handler(object):
             data_length: 每个舵机的数据长度
             param: 参数数据（包含舵机ID和对应数据）
             param_length: 参数数据总长度
+            deadline: 绝对截止时间（毫秒），None表示不限制
             
         返回:
             int: 通信结果代码
@@ -950,7 +1270,13 @@ class protocol_packet_handler(object):
 
         txpacket[PKT_PARAMETER0 + 2: PKT_PARAMETER0 + 2 + param_length] = param[0: param_length]
 
-        _, result, _ = self.txRxPacket(txpacket)
+        # 同步写入没有应答确认，镜像、去重和规划器记录中每个舵机的对应范围失效
+        # （经GroupSyncWrite或WritePlanner发送成功后会重新记录）
+        if self.memory_mirror is not None or self.write_dedup is not None or self.write_planner is not None:
+            for idx in range(0, param_length, data_length + 1):
+                self.invalidateCaches(param[idx], start_address, data_length)
+
+        _, result, _ = self.txRxPacket(txpacket, deadline)
 
         return result
 
@@ -978,6 +1304,9 @@ class protocol_packet_handler(object):
         txpacket[PKT_PARAMETER0] = self.scs_lobyte(position)
         txpacket[PKT_PARAMETER0+1] = self.scs_hibyte(position)
 
+        # 校准和复位会改变舵机内部状态，整张镜像和所有去重记录失效
+        self.invalidateCaches(scs_id, 0, 256)
+
         rxpacket, result, error = self.txRxPacket(txpacket)
 
         return result, error
@@ -1003,6 +1332,9 @@ class protocol_packet_handler(object):
         txpacket[PKT_LENGTH] = 2
         txpacket[PKT_INSTRUCTION] = INST_RESET
 
+        # 校准和复位会改变舵机内部状态，整张镜像和所有去重记录失效
+        self.invalidateCaches(scs_id, 0, 256)
+
         rxpacket, result, error = self.txRxPacket(txpacket)
 
         return result, error
@@ -0,0 +1,263 @@
+#!/usr/bin/env python
+
+import threading
+
+from .scservo_def import *
+from .group_sync_read import *
+from .register_map import getRegisterMap
+
+# 默认合并窗口（毫秒）
+DEFAULT_COALESCE_WINDOW = 0.5
+
+# 默认允许合并的地址间隙（字节），间隙更大的读取分别使用一条同步读取
+DEFAULT_COALESCE_GAP = 8
+
+
+class ReadRequest(object):
+    __slots__ = ('scs_id', 'address', 'length', 'deadline', 'event', 'data', 'result', 'error')
+
+    def __init__(self, scs_id, address, length, deadline=None):
+        """
+        初始化一个待合并的读取请求
+        输入参数:
+            scs_id - 舵机ID
+            address - 起始地址
+            length - 字节数
+            deadline - 绝对截止时间（毫秒），None表示不限制
+        功能: 保存请求参数，完成后由执行线程填入结果并唤醒调用者
+        """
+        self.scs_id = scs_id
+        self.address = address
+        self.length = length
+        self.deadline = deadline
+        self.event = threading.Event()
+        self.data = []
+        self.result = COMM_RX_FAIL
+        self.error = 0
+
+
+class ReadCoalescer(object):
+    def __init__(self, ph, window=DEFAULT_COALESCE_WINDOW, max_gap=DEFAULT_COALESCE_GAP):
+        """
+        初始化读取合并器
+        输入参数:
+            ph - 协议包处理器对象（sms_sts/hls/scscl等）
+            window - 合并窗口（毫秒），第一个请求到达后等待该时间收集其他线程的请求
+            max_gap - 允许合并的地址间隙（字节）
+        功能: 多个线程同时读取同一总线上的舵机时，把窗口内到达的请求合并为一条覆盖
+              地址并集的同步读取，再从共享的应答中分别完成每个请求；总线忙时到达的
+              请求自动进入下一批；ReadPos等字段读取按协议的内存表选择地址和符号位
+        """
+        self.ph = ph
+        self.register_map = getRegisterMap(ph)
+        self.window = window
+        self.max_gap = max_gap
+        self.lock = threading.Lock()  # 保护待处理队列
+        self.pending = []  # 待处理的请求
+        self.leader_active = False  # 是否已有线程负责执行当前这一批
+        self.batches = 0  # 执行的批次数
+        self.transactions = 0  # 实际发送的总线事务数
+        self.requests = 0  # 完成的请求数
+
+    def read(self, scs_id, address, length, deadline=None):
+        """
+        读取舵机数据
+        输入参数:
+            scs_id - 舵机ID
+            address - 起始地址
+            length - 字节数
+            deadline - 绝对截止时间（毫秒），None表示不限制
+        输出: (数据列表, 通信结果, 错误代码) 元组，与readTxRx相同
+        功能: 提交请求并阻塞到结果就绪；第一个进入空队列的线程负责在窗口结束后执行
+              整批请求，其余线程只等待
+        """
+        request = ReadRequest(scs_id, address, length, deadline)
+        with self.lock:
+            self.pending.append(request)
+            leader = not self.leader_active
+            if leader:
+                self.leader_active = True
+
+        if not leader:
+            request.event.wait()
+            return request.data, request.result, request.error
+
+        if self.window > 0:
+            self.ph.portHandler.clock.sleep(int(self.window * 1000000))
+
+        with self.ph.portHandler.bus_lock:
+            # 获得总线后再取出队列，等待总线期间到达的请求也在这一批中
+            with self.lock:
+                batch = self.pending
+                self.pending = []
+                self.leader_active = False
+            try:
+                self.execute(batch)
+            finally:
+                for pending_request in batch:
+                    pending_request.event.set()
+
+        return request.data, request.result, request.error
+
+    def plan(self, batch):
+        """
+        划分同步读取
+        输入参数: batch - 请求列表
+        输出: 列表，每项为(起始地址, 长度, 请求列表)
+        功能: 按地址排序后合并重叠或间隙不超过max_gap的请求
+        """
+        spans = []
+        for request in sorted(batch, key=lambda item: item.address):
+            end = request.address + request.length
+            if spans and request.address <= spans[-1][1] + self.max_gap:
+                span = spans[-1]
+                span[1] = max(span[1], end)
+                span[2].append(request)
+            else:
+                spans.append([request.address, end, [request]])
+        return [(start, end - start, requests) for start, end, requests in spans]
+
+    def execute(self, batch):
+        """
+        执行一批请求
+        输入参数: batch - 请求列表
+        输出: 无
+        功能: 每个地址区间发送一条同步读取（只有一个舵机时使用普通读取），
+              再把应答按请求的地址和长度分发给各个请求；区间的截止时间取其中最早的请求截止时间
+        """
+        self.batches += 1
+        for start, length, requests in self.plan(batch):
+            scs_ids = []
+            deadline = None
+            for request in requests:
+                if request.scs_id not in scs_ids:
+                    scs_ids.append(request.scs_id)
+                if request.deadline is not None and (deadline is None or request.deadline < deadline):
+                    deadline = request.deadline
+
+            self.transactions += 1
+            self.requests += len(requests)
+            if len(scs_ids) == 1:
+                data, result, error = self.ph.readTxRx(scs_ids[0], start, length, deadline)
+                for request in requests:
+                    request.result = result
+                    request.error = error
+                    if result == COMM_SUCCESS:
+                        offset = request.address - start
+                        request.data = data[offset:offset + request.length]
+                continue
+
+            groupSyncRead = GroupSyncRead(self.ph, start, length)
+            for scs_id in scs_ids:
+                groupSyncRead.addParam(scs_id)
+            result = groupSyncRead.txRxPacket(deadline)
+
+            for request in requests:
+                available, error = groupSyncRead.isAvailable(request.scs_id, request.address, request.length)
+                if available:
+                    request.data = groupSyncRead.getBytes(request.scs_id, request.address, request.length)
+                    request.result = COMM_SUCCESS
+                    request.error = error
+                else:
+                    request.result = result if result != COMM_SUCCESS else COMM_RX_FAIL
+
+    def read1ByteTxRx(self, scs_id, address, deadline=None):
+        """
+        合并读取1字节数据（与protocol_packet_handler.read1ByteTxRx相同）
+        输入参数:
+            scs_id - 舵机ID
+            address - 内存地址
+            deadline - 绝对截止时间（毫秒），None表示不限制
+        输出: (数据值, 通信结果, 错误代码) 元组
+        """
+        data, result, error = self.read(scs_id, address, 1, deadline)
+        data_read = data[0] if (result == COMM_SUCCESS) else 0
+        return data_read, result, error
+
+    def read2ByteTxRx(self, scs_id, address, deadline=None):
+        """
+        合并读取2字节数据（与protocol_packet_handler.read2ByteTxRx相同）
+        输入参数:
+            scs_id - 舵机ID
+            address - 内存地址
+            deadline - 绝对截止时间（毫秒），None表示不限制
+        输出: (数据值, 通信结果, 错误代码) 元组
+        """
+        data, result, error = self.read(scs_id, address, 2, deadline)
+        data_read = self.ph.scs_makeword(data[0], data[1]) if (result == COMM_SUCCESS) else 0
+        return data_read, result, error
+
+    def read4ByteTxRx(self, scs_id, address, deadline=None):
+        """
+        合并读取4字节数据（与protocol_packet_handler.read4ByteTxRx相同）
+        输入参数:
+            scs_id - 舵机ID
+            address - 内存地址
+            deadline - 绝对截止时间（毫秒），None表示不限制
+        输出: (数据值, 通信结果, 错误代码) 元组
+        """
+        data, result, error = self.read(scs_id, address, 4, deadline)
+        data_read = self.ph.scs_makedword(self.ph.scs_makeword(data[0], data[1]),
+                                          self.ph.scs_makeword(data[2], data[3])) if (result == COMM_SUCCESS) else 0
+        return data_read, result, error
+
+    def readFields(self, scs_id, names, deadline=None):
+        """
+        合并读取若干字段
+        输入参数:
+            scs_id - 舵机ID
+            names - 字段名元组（见register_map中的寄存器定义）
+            deadline - 绝对截止时间（毫秒），None表示不限制
+        输出: (值列表, 通信结果, 错误代码) 元组；值与names一一对应，为主机格式，通信失败时为0
+        功能: 按协议的内存表读取覆盖所有字段的区间，并按字段的符号位转换
+        """
+        start, length = self.register_map.span(names)
+        data, result, error = self.read(scs_id, start, length, deadline)
+        if result != COMM_SUCCESS:
+            return [0] * len(names), result, error
+        values = self.register_map.getDecoder(start, length).decode(data)
+        return [values[name] for name in names], result, error
+
+    def ReadPos(self, scs_id, deadline=None):
+        """
+        读取当前位置（与协议类的ReadPos相同）
+        输入参数:
+            scs_id - 舵机ID
+            deadline - 绝对截止时间（毫秒），None表示不限制
+        输出: (位置, 通信结果, 错误代码) 元组
+        """
+        values, scs_comm_result, scs_error = self.readFields(scs_id, ('present_position',), deadline)
+        return values[0], scs_comm_result, scs_error
+
+    def ReadSpeed(self, scs_id, deadline=None):
+        """
+        读取当前速度（与协议类的ReadSpeed相同）
+        输入参数:
+            scs_id - 舵机ID
+            deadline - 绝对截止时间（毫秒），None表示不限制
+        输出: (速度, 通信结果, 错误代码) 元组
+        """
+        values, scs_comm_result, scs_error = self.readFields(scs_id, ('present_speed',), deadline)
+        return values[0], scs_comm_result, scs_error
+
+    def ReadPosSpeed(self, scs_id, deadline=None):
+        """
+        读取当前位置和速度（与协议类的ReadPosSpeed相同）
+        输入参数:
+            scs_id - 舵机ID
+            deadline - 绝对截止时间（毫秒），None表示不限制
+        输出: (位置, 速度, 通信结果, 错误代码) 元组
+        """
+        values, scs_comm_result, scs_error = self.readFields(scs_id, ('present_position', 'present_speed'), deadline)
+        return values[0], values[1], scs_comm_result, scs_error
+
+    def ReadMoving(self, scs_id, deadline=None):
+        """
+        读取运动状态（与协议类的ReadMoving相同）
+        输入参数:
+            scs_id - 舵机ID
+            deadline - 绝对截止时间（毫秒），None表示不限制
+        输出: (运动状态, 通信结果, 错误代码) 元组
+        """
+        values, scs_comm_result, scs_error = self.readFields(scs_id, ('moving',), deadline)
+        return values[0], scs_comm_result, scs_error
@@ -0,0 +1,168 @@
+#!/usr/bin/env python
+
+from .scservo_def import *
+from .group_sync_read import *
+from .register_map import getRegisterMap
+
+# 每个应答帧的舵机应答延迟（毫秒）
+DEFAULT_RESPONSE_DELAY = 0.05
+
+# 每次事务的主机延迟（毫秒），主要是USB转串口的接收延迟，常见转接器约1毫秒
+DEFAULT_HOST_LATENCY = 1.0
+
+# 指令包和应答帧的固定字节数
+READ_PACKET_LENGTH = 8  # HEADER0 HEADER1 ID LEN INST ADDR DATA_LEN CHKSUM
+SYNC_READ_PACKET_LENGTH = 8  # 同上，另加每个舵机一个ID字节
+STATUS_FRAME_LENGTH = 6  # HEADER0 HEADER1 ID LEN ERROR ... CHKSUM
+
+
+class ReadPlanner(object):
+    def __init__(self, ph, response_delay=DEFAULT_RESPONSE_DELAY, host_latency=DEFAULT_HOST_LATENCY):
+        """
+        初始化读取区间规划器
+        输入参数:
+            ph - 协议包处理器对象（sms_sts/hls/scscl）
+            response_delay - 每个应答帧的舵机应答延迟（毫秒），可用LatencyProfiler.servoTurnaround测得
+            host_latency - 每次事务的固定主机延迟（毫秒）
+        功能: 把要读取的字段划分为若干连续区间，使按当前波特率估算的总线时间最小：
+              每次事务付出指令包、帧头和延迟的固定开销，合并区间则要多读中间不需要的字节；
+              规划结果按(字段集合, 舵机数, 波特率, 浪费上限)缓存
+        """
+        self.ph = ph
+        self.port = ph.portHandler
+        self.register_map = getRegisterMap(ph)
+        self.response_delay = response_delay
+        self.host_latency = host_latency
+        self.plans = {}  # (字段集合, 舵机数, 波特率, 浪费上限) -> 区间列表
+        self.groups = {}  # (起始地址, 长度, 舵机ID元组) -> GroupSyncRead
+
+    def transactionCost(self, data_length, count=1):
+        """
+        估算一次读取事务的时间
+        输入参数:
+            data_length - 每个舵机读取的字节数
+            count - 舵机数，1为READ，大于1为SYNC_READ
+        输出: 浮点数，毫秒
+        """
+        tx_length = READ_PACKET_LENGTH if count == 1 else SYNC_READ_PACKET_LENGTH + count
+        rx_length = count * (STATUS_FRAME_LENGTH + data_length)
+        return (tx_length + rx_length) * self.port.tx_time_per_byte + count * self.response_delay + self.host_latency
+
+    def cost(self, spans, count=1):
+        """
+        估算读取计划的时间
+        输入参数:
+            spans - 区间列表，每项为(起始地址, 长度)
+            count - 舵机数
+        输出: 浮点数，毫秒
+        """
+        return sum(self.transactionCost(length, count) for _, length in spans)
+
+    def plan(self, names, count=1, max_waste=None):
+        """
+        规划读取区间
+        输入参数:
+            names - 字段名集合（见register_map中的寄存器定义）
+            count - 每次事务读取的舵机数
+            max_waste - 每个区间最多包含的不需要的字节数，None表示不限制；
+                        可用于避免读取未定义的地址
+        输出: 区间列表，每项为(起始地址, 长度)，按地址排序
+        功能: 字段按地址排序后，最优划分中每个区间一定覆盖连续的若干字段，
+              用动态规划在O(n²)内求出总时间最小的划分
+        """
+        names = frozenset(names)
+        key = (names, count, self.port.getBaudRate(), max_waste)
+        spans = self.plans.get(key)
+        if spans is not None:
+            return spans
+
+        registers = sorted((self.register_map[name] for name in names), key=lambda register: register.address)
+        total = len(registers)
+        best = [0.0] + [None] * total  # best[i]: 前i个字段的最小时间
+        choice = [0] * (total + 1)  # choice[i]: 最后一个区间的第一个字段
+        for end in range(1, total + 1):
+            stop = registers[end - 1].address + registers[end - 1].length
+            useful = 0
+            for start in range(end - 1, -1, -1):
+                useful += registers[start].length
+                length = stop - registers[start].address
+                if max_waste is not None and length - useful > max_waste and start < end - 1:
+                    break  # 起点再往前浪费只会更多
+                cost = best[start] + self.transactionCost(length, count)
+                if best[end] is None or cost < best[end]:
+                    best[end] = cost
+                    choice[end] = start
+
+        spans = []
+        end = total
+        while end > 0:
+            start = choice[end]
+            address = registers[start].address
+            spans.append((address, registers[end - 1].address + registers[end - 1].length - address))
+            end = start
+        spans.reverse()
+        self.plans[key] = spans
+        return spans
+
+    def read(self, scs_id, names, max_waste=None, deadline=None):
+        """
+        按规划读取单个舵机的字段
+        输入参数:
+            scs_id - 舵机ID
+            names - 字段名集合
+            max_waste - 每个区间最多包含的不需要的字节数
+            deadline - 绝对截止时间（毫秒），None表示不限制
+        输出: (字段字典, 通信结果, 错误代码) 元组；字段字典为字段名 -> 主机格式值，
+              通信失败时只包含失败之前读到的区间
+        """
+        names = frozenset(names)
+        values = {}
+        error = 0
+        for start, length in self.plan(names, 1, max_waste):
+            data, result, error = self.ph.readTxRx(scs_id, start, length, deadline)
+            if result != COMM_SUCCESS:
+                return values, result, error
+            decoder = self.register_map.getDecoder(start, length)
+            for name, value in zip(decoder.names, decoder.values(data)):
+                if name in names:
+                    values[name] = value
+        return values, COMM_SUCCESS, error
+
+    def syncRead(self, scs_ids, names, max_waste=None):
+        """
+        按规划同步读取多个舵机的字段
+        输入参数:
+            scs_ids - 舵机ID列表
+            names - 字段名集合
+            max_waste - 每个区间最多包含的不需要的字节数
+        输出: (结果字典, 通信结果) 元组；结果字典为舵机ID -> {字段名: 主机格式值}，
+              只包含所有区间都有有效应答的舵机；通信结果为第一个失败区间的结果
+        功能: 每个区间一次同步读取，GroupSyncRead按(区间, 舵机ID)缓存复用
+        """
+        names = frozenset(names)
+        scs_ids = tuple(scs_ids)
+        rows = dict((scs_id, {}) for scs_id in scs_ids)
+        result = COMM_SUCCESS
+        for start, length in self.plan(names, len(scs_ids), max_waste):
+            groupSyncRead = self.groups.get((start, length, scs_ids))
+            if groupSyncRead is None:
+                groupSyncRead = self.groups[(start, length, scs_ids)] = GroupSyncRead(self.ph, start, length)
+                for scs_id in scs_ids:
+                    groupSyncRead.addParam(scs_id)
+            span_result = groupSyncRead.txRxPacket()
+            if result == COMM_SUCCESS:
+                result = span_result
+
+            decoder = self.register_map.getDecoder(start, length)
+            data_table = groupSyncRead.data_table
+            for scs_id in scs_ids:
+                values = rows.get(scs_id)
+                if values is None:
+                    continue
+                if not groupSyncRead.isAvailable(scs_id, start, length)[0]:
+                    del rows[scs_id]
+                    continue
+                for name, value in zip(decoder.names, decoder.values(data_table[scs_id], 1)):
+                    if name in names:
+                        values[name] = value
+        return rows, result
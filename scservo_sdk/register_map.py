@@ -0,0 +1,316 @@
+#!/usr/bin/env python
+
+import struct
+
+from .scservo_def import *
+from .sms_sts import *
+from .hls import *
+from .scscl import *
+
+# 访问属性
+ACCESS_READ = 'r'  # 只读
+ACCESS_READ_WRITE = 'rw'  # 读写
+
+# 存储区
+AREA_EPROM = 'eprom'  # 掉电保存，写入前需要解锁
+AREA_SRAM = 'sram'  # 掉电丢失
+
+# 寄存器定义：(名称, 地址, 字节数, 符号位, 访问属性, 存储区)，符号位为None表示无符号；
+# 有符号寄存器为符号-数值编码（最高位为符号，其余为绝对值），与scs_tohost一致
+SMS_STS_REGISTERS = (
+    ('model', SMS_STS_MODEL_L, 2, None, ACCESS_READ, AREA_EPROM),
+    ('id', SMS_STS_ID, 1, None, ACCESS_READ_WRITE, AREA_EPROM),
+    ('baud_rate', SMS_STS_BAUD_RATE, 1, None, ACCESS_READ_WRITE, AREA_EPROM),
+    ('min_angle_limit', SMS_STS_MIN_ANGLE_LIMIT_L, 2, None, ACCESS_READ_WRITE, AREA_EPROM),
+    ('max_angle_limit', SMS_STS_MAX_ANGLE_LIMIT_L, 2, None, ACCESS_READ_WRITE, AREA_EPROM),
+    ('cw_dead', SMS_STS_CW_DEAD, 1, None, ACCESS_READ_WRITE, AREA_EPROM),
+    ('ccw_dead', SMS_STS_CCW_DEAD, 1, None, ACCESS_READ_WRITE, AREA_EPROM),
+    ('ofs', SMS_STS_OFS_L, 2, 11, ACCESS_READ_WRITE, AREA_EPROM),
+    ('mode', SMS_STS_MODE, 1, None, ACCESS_READ_WRITE, AREA_EPROM),
+    ('torque_enable', SMS_STS_TORQUE_ENABLE, 1, None, ACCESS_READ_WRITE, AREA_SRAM),
+    ('acc', SMS_STS_ACC, 1, None, ACCESS_READ_WRITE, AREA_SRAM),
+    ('goal_position', SMS_STS_GOAL_POSITION_L, 2, 15, ACCESS_READ_WRITE, AREA_SRAM),
+    ('goal_time', SMS_STS_GOAL_TIME_L, 2, None, ACCESS_READ_WRITE, AREA_SRAM),
+    ('goal_speed', SMS_STS_GOAL_SPEED_L, 2, 15, ACCESS_READ_WRITE, AREA_SRAM),
+    ('lock', SMS_STS_LOCK, 1, None, ACCESS_READ_WRITE, AREA_SRAM),
+    ('present_position', SMS_STS_PRESENT_POSITION_L, 2, 15, ACCESS_READ, AREA_SRAM),
+    ('present_speed', SMS_STS_PRESENT_SPEED_L, 2, 15, ACCESS_READ, AREA_SRAM),
+    ('present_load', SMS_STS_PRESENT_LOAD_L, 2, 10, ACCESS_READ, AREA_SRAM),
+    ('present_voltage', SMS_STS_PRESENT_VOLTAGE, 1, None, ACCESS_READ, AREA_SRAM),
+    ('present_temperature', SMS_STS_PRESENT_TEMPERATURE, 1, None, ACCESS_READ, AREA_SRAM),
+    ('moving', SMS_STS_MOVING, 1, None, ACCESS_READ, AREA_SRAM),
+    ('present_current', SMS_STS_PRESENT_CURRENT_L, 2, None, ACCESS_READ, AREA_SRAM),
+)
+
+HLS_REGISTERS = (
+    ('model', HLS_MODEL_L, 2, None, ACCESS_READ, AREA_EPROM),
+    ('id', HLS_ID, 1, None, ACCESS_READ_WRITE, AREA_EPROM),
+    ('baud_rate', HLS_BAUD_RATE, 1, None, ACCESS_READ_WRITE, AREA_EPROM),
+    ('min_angle_limit', HLS_MIN_ANGLE_LIMIT_L, 2, None, ACCESS_READ_WRITE, AREA_EPROM),
+    ('max_angle_limit', HLS_MAX_ANGLE_LIMIT_L, 2, None, ACCESS_READ_WRITE, AREA_EPROM),
+    ('cw_dead', HLS_CW_DEAD, 1, None, ACCESS_READ_WRITE, AREA_EPROM),
+    ('ccw_dead', HLS_CCW_DEAD, 1, None, ACCESS_READ_WRITE, AREA_EPROM),
+    ('ofs', HLS_OFS_L, 2, 11, ACCESS_READ_WRITE, AREA_EPROM),
+    ('mode', HLS_MODE, 1, None, ACCESS_READ_WRITE, AREA_EPROM),
+    ('torque_enable', HLS_TORQUE_ENABLE, 1, None, ACCESS_READ_WRITE, AREA_SRAM),
+    ('acc', HLS_ACC, 1, None, ACCESS_READ_WRITE, AREA_SRAM),
+    ('goal_position', HLS_GOAL_POSITION_L, 2, 15, ACCESS_READ_WRITE, AREA_SRAM),
+    ('goal_torque', HLS_GOAL_TORQUE_L, 2, None, ACCESS_READ_WRITE, AREA_SRAM),
+    ('goal_speed', HLS_GOAL_SPEED_L, 2, 15, ACCESS_READ_WRITE, AREA_SRAM),
+    ('lock', HLS_LOCK, 1, None, ACCESS_READ_WRITE, AREA_SRAM),
+    ('present_position', HLS_PRESENT_POSITION_L, 2, 15, ACCESS_READ, AREA_SRAM),
+    ('present_speed', HLS_PRESENT_SPEED_L, 2, 15, ACCESS_READ, AREA_SRAM),
+    ('present_load', HLS_PRESENT_LOAD_L, 2, 10, ACCESS_READ, AREA_SRAM),
+    ('present_voltage', HLS_PRESENT_VOLTAGE, 1, None, ACCESS_READ, AREA_SRAM),
+    ('present_temperature', HLS_PRESENT_TEMPERATURE, 1, None, ACCESS_READ, AREA_SRAM),
+    ('moving', HLS_MOVING, 1, None, ACCESS_READ, AREA_SRAM),
+    ('present_current', HLS_PRESENT_CURRENT_L, 2, None, ACCESS_READ, AREA_SRAM),
+)
+
+SCSCL_REGISTERS = (
+    ('model', SCSCL_MODEL_L, 2, None, ACCESS_READ, AREA_EPROM),
+    ('id', SCSCL_BAUD_RATE - 1, 1, None, ACCESS_READ_WRITE, AREA_EPROM),  # scscl.py中没有SCSCL_ID常量
+    ('baud_rate', SCSCL_BAUD_RATE, 1, None, ACCESS_READ_WRITE, AREA_EPROM),
+    ('min_angle_limit', SCSCL_MIN_ANGLE_LIMIT_L, 2, None, ACCESS_READ_WRITE, AREA_EPROM),
+    ('max_angle_limit', SCSCL_MAX_ANGLE_LIMIT_L, 2, None, ACCESS_READ_WRITE, AREA_EPROM),
+    ('cw_dead', SCSCL_CW_DEAD, 1, None, ACCESS_READ_WRITE, AREA_EPROM),
+    ('ccw_dead', SCSCL_CCW_DEAD, 1, None, ACCESS_READ_WRITE, AREA_EPROM),
+    ('torque_enable', SCSCL_TORQUE_ENABLE, 1, None, ACCESS_READ_WRITE, AREA_SRAM),
+    ('goal_position', SCSCL_GOAL_POSITION_L, 2, None, ACCESS_READ_WRITE, AREA_SRAM),
+    ('goal_time', SCSCL_GOAL_TIME_L, 2, 10, ACCESS_READ_WRITE, AREA_SRAM),
+    ('goal_speed', SCSCL_GOAL_SPEED_L, 2, None, ACCESS_READ_WRITE, AREA_SRAM),
+    ('lock', SCSCL_LOCK, 1, None, ACCESS_READ_WRITE, AREA_SRAM),
+    ('present_position', SCSCL_PRESENT_POSITION_L, 2, None, ACCESS_READ, AREA_SRAM),
+    ('present_speed', SCSCL_PRESENT_SPEED_L, 2, 15, ACCESS_READ, AREA_SRAM),
+    ('present_load', SCSCL_PRESENT_LOAD_L, 2, 10, ACCESS_READ, AREA_SRAM),
+    ('present_voltage', SCSCL_PRESENT_VOLTAGE, 1, None, ACCESS_READ, AREA_SRAM),
+    ('present_temperature', SCSCL_PRESENT_TEMPERATURE, 1, None, ACCESS_READ, AREA_SRAM),
+    ('moving', SCSCL_MOVING, 1, None, ACCESS_READ, AREA_SRAM),
+    ('present_current', SCSCL_PRESENT_CURRENT_L, 2, None, ACCESS_READ, AREA_SRAM),
+)
+
+# 状态区间（当前位置到当前电流），三种协议相同
+STATUS_START_ADDRESS = SMS_STS_PRESENT_POSITION_L
+STATUS_DATA_LENGTH = SMS_STS_PRESENT_CURRENT_H + 1 - SMS_STS_PRESENT_POSITION_L
+
+
+class Register(object):
+    __slots__ = ('name', 'address', 'length', 'sign_bit', 'access', 'area')
+
+    def __init__(self, name, address, length, sign_bit=None, access=ACCESS_READ_WRITE, area=AREA_SRAM):
+        """
+        初始化寄存器定义
+        输入参数:
+            name - 字段名
+            address - 起始地址（双字节寄存器为低字节地址）
+            length - 字节数（1或2）
+            sign_bit - 符号位，None表示无符号
+            access - 访问属性（ACCESS_READ/ACCESS_READ_WRITE）
+            area - 存储区（AREA_EPROM/AREA_SRAM）
+        """
+        self.name = name
+        self.address = address
+        self.length = length
+        self.sign_bit = sign_bit
+        self.access = access
+        self.area = area
+
+    def __repr__(self):
+        return 'Register(%r, %d, %d)' % (self.name, self.address, self.length)
+
+
+class SpanDecoder(object):
+    def __init__(self, registers, start_address, data_length, protocol_end):
+        """
+        初始化区间解码器
+        输入参数:
+            registers - 寄存器列表（按地址排序）
+            start_address - 区间起始地址
+            data_length - 区间长度
+            protocol_end - 协议端序（0为小端，1为大端）
+        功能: 区间内完整包含的寄存器按地址顺序编入一个struct格式串，寄存器之间的间隙跳过，
+              一次unpack得到所有字段；只对有符号字段做符号-数值转换
+        """
+        self.start_address = start_address
+        self.data_length = data_length
+        self.protocol_end = protocol_end
+        self.registers = [register for register in registers if register.address >= start_address and
+                          register.address + register.length <= start_address + data_length]
+        self.names = tuple(register.name for register in self.registers)
+        self.signed = [(index, 1 << register.sign_bit, ~(1 << register.sign_bit))
+                       for index, register in enumerate(self.registers) if register.sign_bit is not None]
+
+        layout = ['>' if protocol_end else '<']
+        position = start_address
+        for register in self.registers:
+            if register.address > position:
+                layout.append('%dx' % (register.address - position))
+            layout.append('B' if register.length == 1 else 'H')
+            position = register.address + register.length
+        if start_address + data_length > position:
+            layout.append('%dx' % (start_address + data_length - position))
+        self.struct = struct.Struct(''.join(layout))
+
+    def values(self, data, offset=0):
+        """
+        解码为值列表
+        输入参数:
+            data - 字节序列（bytes/bytearray/memoryview或字节值列表），从offset开始为区间数据
+            offset - 区间数据在data中的偏移（同步读取的data_table中为1，跳过错误位）
+        输出: 列表，与names一一对应的主机格式值
+        """
+        if isinstance(data, list):
+            data = bytearray(data)
+        values = list(self.struct.unpack_from(data, offset))
+        for index, bit, mask in self.signed:
+            value = values[index]
+            if value & bit:
+                values[index] = -(value & mask)
+        return values
+
+    def decode(self, data, offset=0):
+        """
+        解码为字典
+        输入参数:
+            data - 字节序列
+            offset - 区间数据在data中的偏移
+        输出: 字典，字段名 -> 主机格式值
+        """
+        return dict(zip(self.names, self.values(data, offset)))
+
+    def decodeArrays(self, rows, offset=0):
+        """
+        批量解码
+        输入参数:
+            rows - 字节序列列表，每项从offset开始为一个舵机的区间数据
+            offset - 区间数据在每项中的偏移
+        输出: 字典，字段名 -> 每个舵机的值；安装了NumPy时为int32数组，否则为列表
+        功能: 有NumPy时把所有行拼接后用带偏移的结构化dtype一次解析，符号位按列向量化处理
+        """
+        try:
+            import numpy  # 只在批量解码时导入，NumPy是可选依赖
+        except ImportError:
+            columns = dict((name, []) for name in self.names)
+            for data in rows:
+                for name, value in zip(self.names, self.values(data, offset)):
+                    columns[name].append(value)
+            return columns
+
+        size = self.struct.size
+        buffer = b''.join(bytes(data[offset:offset + size]) for data in rows)
+        order = '>' if self.protocol_end else '<'
+        dtype = numpy.dtype({
+            'names': list(self.names),
+            'formats': ['u1' if register.length == 1 else order + 'u2' for register in self.registers],
+            'offsets': [register.address - self.start_address for register in self.registers],
+            'itemsize': size,
+        })
+        table = numpy.frombuffer(buffer, dtype=dtype)
+        columns = {}
+        for register in self.registers:
+            column = table[register.name].astype(numpy.int32)
+            if register.sign_bit is not None:
+                bit = 1 << register.sign_bit
+                column = numpy.where(column & bit, -(column & ~bit), column)
+            columns[register.name] = column
+        return columns
+
+
+class RegisterMap(object):
+    def __init__(self, name, registers, protocol_end=0):
+        """
+        初始化型号内存表
+        输入参数:
+            name - 型号名称（sms_sts/hls/scscl）
+            registers - 寄存器定义元组，格式同SMS_STS_REGISTERS
+            protocol_end - 协议端序（0为小端，1为大端）
+        功能: 按名称和地址索引寄存器，按区间缓存解码器
+        """
+        self.name = name
+        self.protocol_end = protocol_end
+        self.registers = sorted((Register(*definition) for definition in registers),
+                                key=lambda register: register.address)
+        self.by_name = dict((register.name, register) for register in self.registers)
+        self.by_address = dict((register.address, register) for register in self.registers)
+        self.decoders = {}  # (起始地址, 长度) -> SpanDecoder
+
+    def __getitem__(self, name):
+        return self.by_name[name]
+
+    def __contains__(self, name):
+        return name in self.by_name
+
+    def span(self, names):
+        """
+        计算覆盖多个字段的最小区间
+        输入参数: names - 字段名列表
+        输出: (起始地址, 长度) 元组
+        """
+        registers = [self.by_name[name] for name in names]
+        start = min(register.address for register in registers)
+        return start, max(register.address + register.length for register in registers) - start
+
+    def getDecoder(self, start_address, data_length):
+        """
+        获取区间解码器
+        输入参数:
+            start_address - 起始地址
+            data_length - 长度
+        输出: SpanDecoder对象，按区间缓存
+        """
+        key = (start_address, data_length)
+        decoder = self.decoders.get(key)
+        if decoder is None:
+            decoder = self.decoders[key] = SpanDecoder(self.registers, start_address, data_length, self.protocol_end)
+        return decoder
+
+    def decode(self, start_address, data, offset=0):
+        """
+        解码一段内存
+        输入参数:
+            start_address - data对应的起始地址
+            data - 字节序列
+            offset - 区间数据在data中的偏移
+        输出: 字典，区间内完整包含的字段名 -> 主机格式值
+        """
+        return self.getDecoder(start_address, len(data) - offset).decode(data, offset)
+
+    def encode(self, name, value):
+        """
+        把字段值转换为字节
+        输入参数:
+            name - 字段名
+            value - 主机格式值（有符号字段可以为负数）
+        输出: 字节值列表，按协议端序
+        """
+        register = self.by_name[name]
+        if register.sign_bit is not None and value < 0:
+            value = -value | (1 << register.sign_bit)
+        if register.length == 1:
+            return [value & 0xFF]
+        if self.protocol_end:
+            return [(value >> 8) & 0xFF, value & 0xFF]
+        return [value & 0xFF, (value >> 8) & 0xFF]
+
+
+# 协议 -> 内存表
+REGISTER_MAPS = {
+    'sms_sts': RegisterMap('sms_sts', SMS_STS_REGISTERS, 0),
+    'hls': RegisterMap('hls', HLS_REGISTERS, 0),
+    'scscl': RegisterMap('scscl', SCSCL_REGISTERS, 1),
+}
+
+
+def getRegisterMap(ph):
+    """
+    获取协议对应的内存表
+    输入参数: ph - 协议包处理器对象（sms_sts/hls/scscl）或协议名称
+    输出: RegisterMap对象；未知协议按端序使用sms_sts或scscl的内存表
+    """
+    if isinstance(ph, str):
+        return REGISTER_MAPS[ph]
+    if isinstance(ph, hls):
+        return REGISTER_MAPS['hls']
+    if isinstance(ph, scscl) or ph.scs_end:
+        return REGISTER_MAPS['scscl']
+    return REGISTER_MAPS['sms_sts']
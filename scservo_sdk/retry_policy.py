@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+
+from .scservo_def import *
+
+# 默认可重试的通信结果
+DEFAULT_RETRY_RESULTS = (COMM_RX_TIMEOUT, COMM_RX_CORRUPT)
+
+# 默认可重试的指令（幂等指令）；REG_WRITE和ACTION重复执行会改变语义，不重试；
+# SYNC_WRITE没有状态包，发送失败（COMM_TX_FAIL等）说明端口本身出错，也不重试
+DEFAULT_RETRY_INSTRUCTIONS = (INST_PING, INST_READ, INST_WRITE, INST_SYNC_READ)
+
+
+class RetryPolicy(object):
+    def __init__(self, max_retries=2, retry_results=DEFAULT_RETRY_RESULTS,
+                 retry_instructions=DEFAULT_RETRY_INSTRUCTIONS, budget=None, backoff=0.0, turnaround=0.5):
+        """
+        初始化重试策略
+        输入参数:
+            max_retries - 最大重试次数（不含首次尝试）
+            retry_results - 可重试的通信结果代码
+            retry_instructions - 可重试的指令代码（应只包含幂等指令）
+            budget - 每次调用的总时间预算（毫秒），None表示只受端口截止时间限制
+            backoff - 每次重试前的等待时间（毫秒）
+            turnaround - 舵机应答延迟余量（毫秒），用于估算一次重试的耗时
+        功能: 决定失败的事务是否重试；只有在剩余时间足够完成一次重试时才重试
+        """
+        self.max_retries = max_retries
+        self.retry_results = frozenset(retry_results)
+        self.retry_instructions = frozenset(retry_instructions)
+        self.budget = budget
+        self.backoff = backoff
+        self.turnaround = turnaround
+
+    def estimateTime(self, port, tx_length, rx_length):
+        """
+        估算一次事务的耗时
+        输入参数:
+            port - PortHandler对象
+            tx_length - 发送字节数
+            rx_length - 期望接收字节数
+        输出: 浮点数，估算耗时（毫秒）
+        功能: 按每字节传输时间加应答延迟余量估算
+        """
+        return (tx_length + rx_length) * port.tx_time_per_byte + self.turnaround
+
+    def remainingTime(self, port, start_time):
+        """
+        计算剩余时间
+        输入参数:
+            port - PortHandler对象
+            start_time - 首次尝试的开始时间（毫秒）
+        输出: 浮点数，剩余时间（毫秒），不受限制时为None
+        功能: 取端口截止时间和时间预算中较早者计算剩余时间
+        """
+        now = port.getCurrentTime()
+        remaining = None
+        if port.packet_deadline is not None:
+            remaining = port.packet_deadline - now
+        if self.budget is not None:
+            budget_remaining = start_time + self.budget - now
+            remaining = budget_remaining if remaining is None else min(remaining, budget_remaining)
+        return remaining
+
+    def shouldRetry(self, port, instruction, result, attempt, start_time, estimate):
+        """
+        判断是否重试
+        输入参数:
+            port - PortHandler对象
+            instruction - 指令代码
+            result - 上一次尝试的通信结果
+            attempt - 已重试次数
+            start_time - 首次尝试的开始时间（毫秒）
+            estimate - 一次重试的估算耗时（毫秒）
+        输出: 布尔值，表示是否应重试
+        功能: 检查重试次数、结果类型、指令幂等性和剩余时间
+        """
+        if attempt >= self.max_retries:
+            return False
+        if result not in self.retry_results:
+            return False
+        if instruction not in self.retry_instructions:
+            return False
+
+        remaining = self.remainingTime(port, start_time)
+        if remaining is not None and self.backoff + estimate > remaining:
+            return False
+
+        return True
+
+    def wait(self, port):
+        """
+        重试前等待
+        输入参数: port - 串口处理器，使用其时钟等待
+        输出: 无
+        功能: 按backoff设置等待
+        """
+        if self.backoff > 0:
+            port.clock.sleep(int(self.backoff * 1000000))
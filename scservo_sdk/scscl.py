@@ -57,30 +57,32 @@ class scscl(protocol_packet_handler):
         protocol_packet_handler.__init__(self, portHandler, 1)
         self.groupSyncWrite = GroupSyncWrite(self, SCSCL_GOAL_POSITION_L, 6)
 
-    def WritePos(self, scs_id, position, time, speed):
+    def WritePos(self, scs_id, position, time, speed, force=False, deadline=None):
         txpacket = [self.scs_lobyte(position), self.scs_hibyte(position), self.scs_lobyte(time), self.scs_hibyte(time), self.scs_lobyte(speed), self.scs_hibyte(speed)]
-        return self.writeTxRx(scs_id, SCSCL_GOAL_POSITION_L, len(txpacket), txpacket)
+        return self.writeGoalTxRx(scs_id, SCSCL_GOAL_POSITION_L, txpacket, force, deadline)
 
-    def ReadPos(self, scs_id):
-        scs_present_position, scs_comm_result, scs_error = self.read2ByteTxRx(scs_id, SCSCL_PRESENT_POSITION_L)
+    def ReadPos(self, scs_id, deadline=None):
+        scs_present_position, scs_comm_result, scs_error = self.read2ByteTxRx(scs_id, SCSCL_PRESENT_POSITION_L, deadline)
         return scs_present_position, scs_comm_result, scs_error
 
-    def ReadSpeed(self, scs_id):
-        scs_present_speed, scs_comm_result, scs_error = self.read2ByteTxRx(scs_id, SCSCL_PRESENT_SPEED_L)
+    def ReadSpeed(self, scs_id, deadline=None):
+        scs_present_speed, scs_comm_result, scs_error = self.read2ByteTxRx(scs_id, SCSCL_PRESENT_SPEED_L, deadline)
         return self.scs_tohost(scs_present_speed, 15), scs_comm_result, scs_error
 
-    def ReadPosSpeed(self, scs_id):
-        scs_present_position_speed, scs_comm_result, scs_error = self.read4ByteTxRx(scs_id, SCSCL_PRESENT_POSITION_L)
+    def ReadPosSpeed(self, scs_id, deadline=None):
+        scs_present_position_speed, scs_comm_result, scs_error = self.read4ByteTxRx(scs_id, SCSCL_PRESENT_POSITION_L, deadline)
         scs_present_position = self.scs_loword(scs_present_position_speed)
         scs_present_speed = self.scs_hiword(scs_present_position_speed)
         return scs_present_position, self.scs_tohost(scs_present_speed, 15), scs_comm_result, scs_error
 
-    def ReadMoving(self, scs_id):
-        moving, scs_comm_result, scs_error = self.read1ByteTxRx(scs_id, SCSCL_MOVING)
+    def ReadMoving(self, scs_id, deadline=None):
+        moving, scs_comm_result, scs_error = self.read1ByteTxRx(scs_id, SCSCL_MOVING, deadline)
         return moving, scs_comm_result, scs_error
 
-    def SyncWritePos(self, scs_id, position, time, speed):
+    def SyncWritePos(self, scs_id, position, time, speed, force=False):
         txpacket = [self.scs_lobyte(position), self.scs_hibyte(position), self.scs_lobyte(time), self.scs_hibyte(time), self.scs_lobyte(speed), self.scs_hibyte(speed)]
+        if not force and self.isDuplicateWrite(scs_id, SCSCL_GOAL_POSITION_L, txpacket, 1 + len(txpacket)):
+            return True
         return self.groupSyncWrite.addParam(scs_id, txpacket)
 
     def RegWritePos(self, scs_id, position, time, speed):
@@ -94,8 +96,10 @@ class scscl(protocol_packet_handler):
         txpacket = [0, 0, 0, 0]
         return self.writeTxRx(scs_id, SCSCL_MIN_ANGLE_LIMIT_L, len(txpacket), txpacket)
 
-    def WritePWM(self, scs_id, time):
-        return self.write2ByteTxRx(scs_id, SCSCL_GOAL_TIME_L, self.scs_toscs(time, 10))
+    def WritePWM(self, scs_id, time, force=False, deadline=None):
+        time = self.scs_toscs(time, 10)
+        txpacket = [self.scs_lobyte(time), self.scs_hibyte(time)]
+        return self.writeGoalTxRx(scs_id, SCSCL_GOAL_TIME_L, txpacket, force, deadline)
 
     def LockEprom(self, scs_id):
         return self.write1ByteTxRx(scs_id, SCSCL_LOCK, 1)
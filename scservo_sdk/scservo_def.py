@@ -6,6 +6,11 @@ BROADCAST_ID = 0xFE  # 254
 # 最大舵机ID
 MAX_ID = 0xFC  # 252
 
+# 按ID索引的表的长度（覆盖ID字节的全部取值），以及用于整表清空的空表
+ID_TABLE_SIZE = 0x100
+EMPTY_ID_MEMBERS = bytes(ID_TABLE_SIZE)
+EMPTY_ID_TABLE = (None,) * ID_TABLE_SIZE
+
 # SCS协议数据字节序标志（0为小端格式，1为大端格式）
 SCS_END = 0
 
@@ -30,3 +35,4 @@ COMM_RX_WAITING = -5  # 正在接收状态数据包
 COMM_RX_TIMEOUT = -6  # 接收状态数据包超时
 COMM_RX_CORRUPT = -7  # 状态数据包校验错误
 COMM_NOT_AVAILABLE = -9  # 功能不可用
+COMM_DEADLINE_MISS = -10  # 截止时间前无法完成事务
@@ -0,0 +1,335 @@
+#!/usr/bin/env python
+
+import random
+import threading
+
+from .scservo_def import *
+from .protocol_packet_handler import *
+from .port_handler import *
+from .sms_sts import *
+
+# 仿真舵机的默认型号（与STS3215的型号寄存器值一致）
+SIM_DEFAULT_MODEL = 0x0309
+
+# 仿真舵机的默认应答延迟（毫秒）
+SIM_DEFAULT_TURNAROUND = 0.05
+
+# 舵机波特率代码 -> 实际波特率
+SIM_BAUDRATES = [1000000, 500000, 250000, 128000, 115200, 76800, 57600, 38400]
+
+
+class SimServo(object):
+    def __init__(self, scs_id, model=SIM_DEFAULT_MODEL, baud_code=SMS_STS_1M, protocol_end=0):
+        """
+        初始化仿真舵机
+        输入参数:
+            scs_id - 舵机ID
+            model - 型号
+            baud_code - 波特率代码（SMS_STS_1M等）
+            protocol_end - 协议端序（0为小端，1为大端）
+        功能: 建立一张256字节的内存表并填入型号、ID和波特率
+        """
+        self.memory = bytearray(256)
+        self.protocol_end = protocol_end
+        self.setWord(SMS_STS_MODEL_L, model)
+        self.memory[SMS_STS_ID] = scs_id
+        self.memory[SMS_STS_BAUD_RATE] = baud_code
+        self.memory[SMS_STS_LOCK] = 1
+        self.memory[SMS_STS_PRESENT_VOLTAGE] = 120
+        self.memory[SMS_STS_PRESENT_TEMPERATURE] = 30
+        self.registered = None  # REG_WRITE暂存的(地址, 数据)
+        self.return_delay = None  # 该舵机的应答延迟（毫秒），None表示使用端口的turnaround
+        self.baud_codes = None  # 该舵机接受的波特率代码集合，None表示全部；写入其他代码时保持原波特率
+        self.error = 0  # 状态包中报告的错误位（ERRBIT_OVERLOAD等）
+
+    def setWord(self, address, value):
+        """
+        写入一个16位字
+        输入参数:
+            address - 低字节地址
+            value - 字值
+        输出: 无
+        """
+        if self.protocol_end == 0:
+            self.memory[address], self.memory[address + 1] = value & 0xFF, (value >> 8) & 0xFF
+        else:
+            self.memory[address], self.memory[address + 1] = (value >> 8) & 0xFF, value & 0xFF
+
+    def getBaudRate(self):
+        """
+        获取舵机当前波特率
+        输入参数: 无
+        输出: 整数，波特率
+        """
+        return SIM_BAUDRATES[self.memory[SMS_STS_BAUD_RATE] % len(SIM_BAUDRATES)]
+
+    def write(self, address, data):
+        """
+        写入内存表
+        输入参数:
+            address - 起始地址
+            data - 字节值列表
+        输出: 无
+        功能: 写入数据；写入目标位置时当前位置立即跟随，便于验证读写；不接受的波特率代码被忽略
+        """
+        baud_code = self.memory[SMS_STS_BAUD_RATE]
+        self.memory[address:address + len(data)] = bytearray(data)
+        if self.baud_codes is not None and self.memory[SMS_STS_BAUD_RATE] not in self.baud_codes:
+            self.memory[SMS_STS_BAUD_RATE] = baud_code
+        end = address + len(data)
+        if address <= SMS_STS_GOAL_POSITION_L < end:
+            self.memory[SMS_STS_PRESENT_POSITION_L] = self.memory[SMS_STS_GOAL_POSITION_L]
+            self.memory[SMS_STS_PRESENT_POSITION_H] = self.memory[SMS_STS_GOAL_POSITION_H]
+
+
+class SimSerial(object):
+    def __init__(self, port, turnaround=SIM_DEFAULT_TURNAROUND, latency=0.0, tx_latency=0.0, jitter=0.0,
+                 drop_rate=0.0, seed=0, echo=False):
+        """
+        初始化仿真串口
+        输入参数:
+            port - 所属的SimPortHandler
+            turnaround - 舵机应答延迟（毫秒）
+            latency - USB转串口的接收延迟（毫秒），应答在总线上传输完成后再经过该时间才能读取
+            tx_latency - USB转串口的发送延迟（毫秒），write返回后再经过该时间数据才开始上线
+            jitter - 收发延迟的随机抖动上限（毫秒）
+            drop_rate - 应答丢失概率（0~1），用于仿真超时
+            seed - 随机数种子，保证仿真结果可复现
+            echo - 是否仿真单线半双工转接器，发送的字节原样回到接收端
+        功能: 实现与pyserial相同的write/read/in_waiting接口；舵机的应答按波特率计算
+              的传输时间和应答延迟，在端口时钟到达对应时间后才能读取；读取时没有
+              可读数据则通知端口时钟空闲，虚拟时钟据此直接跳到下一个应答可读的时间
+        """
+        self.port = port
+        self.turnaround = int(turnaround * 1000000)  # 纳秒
+        self.latency = int(latency * 1000000)  # 纳秒
+        self.tx_latency = int(tx_latency * 1000000)  # 纳秒
+        self.jitter = int(jitter * 1000000)  # 纳秒
+        self.drop_rate = drop_rate
+        self.random = random.Random(seed)
+        self.echo = echo
+        self.rx_queue = []  # [可读取时间(纳秒), 数据(bytearray)]，按时间排序
+        self.bus_free = 0  # 总线上最后一个应答传输完成的时间（纳秒）
+        self.tx_end = 0  # 最近一次写入的最后一个字节上线的时间（纳秒）
+        self.lock = threading.Lock()
+
+    def close(self):
+        pass
+
+    def flush(self):
+        # 与tcdrain相同，等待最后一个字节发送完成
+        clock = self.port.clock
+        clock.sleep(self.tx_end - clock.now())
+
+    def reset_input_buffer(self):
+        # 只丢弃已经到达的数据，尚在传输中的应答之后仍会到达
+        now = self.port.clock.now()
+        with self.lock:
+            while self.rx_queue and self.rx_queue[0][0] <= now:
+                del self.rx_queue[0]
+
+    @property
+    def in_waiting(self):
+        now = self.port.clock.now()
+        with self.lock:
+            return sum(len(data) for ready, data in self.rx_queue if ready <= now)
+
+    def read(self, length):
+        clock = self.port.clock
+        now = clock.now()
+        out = bytearray()
+        with self.lock:
+            while self.rx_queue and len(out) < length and self.rx_queue[0][0] <= now:
+                data = self.rx_queue[0][1]
+                take = length - len(out)
+                out.extend(data[:take])
+                if take >= len(data):
+                    del self.rx_queue[0]
+                else:
+                    del data[:take]
+            next_ready = self.rx_queue[0][0] if self.rx_queue else None
+        if not out:
+            clock.idle(next_ready)
+        return bytes(out)
+
+    def readinto(self, buffer):
+        clock = self.port.clock
+        now = clock.now()
+        count = 0
+        with self.lock:
+            while self.rx_queue and count < len(buffer) and self.rx_queue[0][0] <= now:
+                data = self.rx_queue[0][1]
+                take = min(len(buffer) - count, len(data))
+                buffer[count:count + take] = data[:take]
+                count += take
+                if take >= len(data):
+                    del self.rx_queue[0]
+                else:
+                    del data[:take]
+            next_ready = self.rx_queue[0][0] if self.rx_queue else None
+        if not count:
+            clock.idle(next_ready)
+        return count
+
+    def write(self, packet):
+        packet = bytearray(packet)
+        now = self.port.clock.now()
+        tx_time_per_byte = int(self.port.tx_time_per_byte * 1000000)  # 纳秒
+        responses = self.port.handlePacket(packet)
+
+        # 指令包经过发送延迟后上线，应答从发送结束加应答延迟后开始，依次占用总线
+        tx_start = now + self.tx_latency
+        if self.jitter:
+            tx_start += self.random.randint(0, self.jitter)
+        wire_time = max(tx_start, self.bus_free) + len(packet) * tx_time_per_byte
+        self.tx_end = wire_time
+        with self.lock:
+            if self.echo:
+                self.rx_queue.append([wire_time + self.latency, bytearray(packet)])
+            for frame in responses:
+                servo = self.port.servos.get(frame[PKT_ID])
+                if servo is not None and servo.return_delay is not None:
+                    wire_time += int(servo.return_delay * 1000000)
+                else:
+                    wire_time += self.turnaround
+                wire_time += len(frame) * tx_time_per_byte
+                if self.drop_rate and self.random.random() < self.drop_rate:
+                    continue
+                ready = wire_time + self.latency
+                if self.jitter:
+                    ready += self.random.randint(0, self.jitter)
+                self.rx_queue.append([ready, frame])
+            self.bus_free = wire_time
+        return len(packet)
+
+
+class SimPortHandler(PortHandler):
+    def __init__(self, servo_ids=(), port_name='sim', model=SIM_DEFAULT_MODEL, protocol_end=0,
+                 turnaround=SIM_DEFAULT_TURNAROUND, latency=0.0, tx_latency=0.0, jitter=0.0, drop_rate=0.0, seed=0,
+                 echo=False, clock=None):
+        """
+        初始化仿真总线端口
+        输入参数:
+            servo_ids - 总线上的舵机ID列表
+            port_name - 端口名称（仅用于显示）
+            model - 舵机型号
+            protocol_end - 协议端序（0为小端，1为大端）
+            turnaround - 舵机应答延迟（毫秒）
+            latency - USB转串口的接收延迟（毫秒）
+            tx_latency - USB转串口的发送延迟（毫秒）
+            jitter - 收发延迟的随机抖动上限（毫秒）
+            drop_rate - 应答丢失概率（0~1）
+            seed - 随机数种子
+            echo - 是否仿真回显发送字节的单线转接器
+            clock - 端口时钟，None表示单调时钟；使用VirtualClock时仿真快于实时且结果确定
+        功能: 无需硬件的总线仿真，按协议应答PING、READ、WRITE、REG_WRITE、ACTION、
+              SYNC_READ和SYNC_WRITE指令，用于基准测试和离线验证
+        """
+        PortHandler.__init__(self, port_name)
+        if clock is not None:
+            self.setClock(clock)
+        self.protocol_end = protocol_end
+        self.servos = dict((scs_id, SimServo(scs_id, model, SMS_STS_1M, protocol_end)) for scs_id in servo_ids)
+        self.sim_options = {'turnaround': turnaround, 'latency': latency, 'tx_latency': tx_latency, 'jitter': jitter,
+                            'drop_rate': drop_rate, 'seed': seed, 'echo': echo}
+
+    def setupPort(self, cflag_baud):
+        """
+        配置仿真串口
+        输入参数: cflag_baud - 标准波特率值
+        输出: 布尔值，始终为True
+        功能: 创建仿真串口对象代替pyserial
+        """
+        if self.is_open:
+            self.closePort()
+
+        self.ser = SimSerial(self, **self.sim_options)
+        self.is_open = True
+        self.tx_time_per_byte = (1000.0 / self.baudrate) * 10.0
+        return True
+
+    def makeStatus(self, scs_id, error, data):
+        """
+        生成状态包
+        输入参数:
+            scs_id - 舵机ID
+            error - 错误位
+            data - 参数字节
+        输出: bytearray，完整的状态包
+        """
+        frame = bytearray([0xFF, 0xFF, scs_id, len(data) + 2, error])
+        frame.extend(data)
+        frame.append(~sum(frame[PKT_ID:]) & 0xFF)
+        return frame
+
+    def handlePacket(self, packet):
+        """
+        处理一个指令包
+        输入参数: packet - 主机发送的完整指令包
+        输出: 列表，舵机按顺序返回的状态包
+        功能: 校验指令包后执行指令；只有波特率与端口一致的舵机才会应答
+        """
+        if len(packet) < 6 or packet[PKT_HEADER0] != 0xFF or packet[PKT_HEADER1] != 0xFF:
+            return []
+        total_length = packet[PKT_LENGTH] + 4
+        if len(packet) < total_length or (~sum(packet[PKT_ID:total_length - 1]) & 0xFF) != packet[total_length - 1]:
+            return []
+
+        scs_id = packet[PKT_ID]
+        instruction = packet[PKT_INSTRUCTION]
+        params = packet[PKT_PARAMETER0:total_length - 1]
+
+        def listening(servo_id):
+            servo = self.servos.get(servo_id)
+            return servo if servo is not None and servo.getBaudRate() == self.baudrate else None
+
+        responses = []
+        if instruction == INST_SYNC_READ:
+            address, length = params[0], params[1]
+            for servo_id in params[2:]:
+                servo = listening(servo_id)
+                if servo is not None:
+                    responses.append(self.makeStatus(servo_id, servo.error, servo.memory[address:address + length]))
+            return responses
+
+        if instruction == INST_SYNC_WRITE:
+            address, length = params[0], params[1]
+            for index in range(2, len(params) - length, length + 1):
+                servo = listening(params[index])
+                if servo is not None:
+                    servo.write(address, params[index + 1:index + 1 + length])
+            return responses
+
+        if scs_id == BROADCAST_ID:
+            targets = [servo_id for servo_id in sorted(self.servos) if listening(servo_id) is not None]
+        elif listening(scs_id) is not None:
+            targets = [scs_id]
+        else:
+            targets = []
+
+        for servo_id in targets:
+            servo = self.servos[servo_id]
+            data = bytearray()
+            if instruction == INST_READ:
+                data = servo.memory[params[0]:params[0] + params[1]]
+            elif instruction == INST_WRITE:
+                servo.write(params[0], params[1:])
+            elif instruction == INST_REG_WRITE:
+                servo.registered = (params[0], params[1:])
+            elif instruction == INST_ACTION:
+                if servo.registered is not None:
+                    servo.write(*servo.registered)
+                    servo.registered = None
+            elif instruction not in (INST_PING, INST_RESET, INST_OFSCAL):
+                continue
+
+            if scs_id != BROADCAST_ID:
+                responses.append(self.makeStatus(servo_id, servo.error, data))
+
+            # 写入ID寄存器后舵机改用新ID
+            new_id = servo.memory[SMS_STS_ID]
+            if new_id != servo_id:
+                del self.servos[servo_id]
+                self.servos[new_id] = servo
+
+        return responses
@@ -37,17 +37,17 @@ SMS_STS_MODE = 33               # 工作模式设置
 SMS_STS_TORQUE_ENABLE = 40    # 扭矩使能控制
 SMS_STS_ACC = 41              # 加速度设置
 SMS_STS_GOAL_POSITION_L = 42  # 目标位置低字节
-SMS_STS_GO极_POSITION_H = 43  # 目标位置高字节
+SMS_STS_GOAL_POSITION_H = 43  # 目标位置高字节
 SMS_STS_GOAL_TIME_L = 44      # 运动时间低字节
 SMS_STS_GOAL_TIME_H = 45      # 运动时间高字节
-SMS_STS_GOAL_SP极D_L = 46     # 目标速度低字节
+SMS_STS_GOAL_SPEED_L = 46     # 目标速度低字节
 SMS_STS_GOAL_SPEED_H = 47     # 目标速度高字节
 SMS_STS_LOCK = 55             # EPROM锁设置
 
 # -------SRAM(只读)--------
 SMS_STS_PRESENT_POSITION_L = 56   # 当前位置低字节
 SMS_STS_PRESENT_POSITION_H = 57   # 当前位置高字节
-SMS_ST极_PRESENT_SPEED_L = 58     # 当前速度低字节
+SMS_STS_PRESENT_SPEED_L = 58     # 当前速度低字节
 SMS_STS_PRESENT_SPEED_H = 59      # 当前速度高字节
 SMS_STS_PRESENT_LOAD_L = 60       # 当前负载低字节
 SMS_STS_PRESENT_LOAD_H = 61       # 当前负载高字节
@@ -67,7 +67,7 @@ class sms_sts(protocol_packet_handler):
         protocol_packet_handler.__init__(self, portHandler, 0)
         self.groupSyncWrite = GroupSyncWrite(self, SMS_STS_ACC, 7)
 
-    def WritePosEx(self, scs_id, position, speed, acc):
+    def WritePosEx(self, scs_id, position, speed, acc, force=False, deadline=None):
         """
         扩展位置控制函数（带加速度和速度控制）
         输入参数: 
@@ -75,56 +75,66 @@ class sms_sts(protocol_packet_handler):
             position - 目标位置(0-4095)
             speed - 运动速度(0-1023)
             acc - 加速度(0-255)
+            force - 开启写入去重时，是否强制发送与上次相同的值
+            deadline - 绝对截止时间（毫秒），None表示不限制
         输出: (通信结果, 错误代码) 元组
         功能: 控制舵机以指定加速度和速度运动到指定位置
         """
         position = self.scs_toscs(position, 15)
         txpacket = [acc, self.scs_lobyte(position), self.scs_hibyte(position), 0, 0, self.scs_lobyte(speed), self.scs_hibyte(speed)]
-        return self.writeTxRx(scs_id, SMS_STS_ACC, len(txpacket), txpacket)
+        return self.writeGoalTxRx(scs_id, SMS_STS_ACC, txpacket, force, deadline)
 
-    def ReadPos(self, scs_id):
+    def ReadPos(self, scs_id, deadline=None):
         """
         读取舵机当前位置
-        输入参数: scs_id - 舵机ID
+        输入参数:
+            scs_id - 舵机ID
+            deadline - 绝对截止时间（毫秒），None表示不限制
         输出: (当前位置, 通信结果, 错误代码) 元组
         功能: 从舵机读取当前实际位置值
         """
-        scs_present_position, scs_comm_result, scs_error = self.read2ByteTxRx(scs_id, SMS_STS_PRESENT_POSITION_L)
+        scs_present_position, scs_comm_result, scs_error = self.read2ByteTxRx(scs_id, SMS_STS_PRESENT_POSITION_L, deadline)
         return self.scs_tohost(scs_present_position, 15), scs_comm_result, scs_error
 
-    def ReadSpeed(self, scs_id):
+    def ReadSpeed(self, scs_id, deadline=None):
         """
         读取舵机当前速度
-        输入参数: scs_id - 舵机ID
+        输入参数:
+            scs_id - 舵机ID
+            deadline - 绝对截止时间（毫秒），None表示不限制
         输出: (当前速度, 通信结果, 错误代码) 元组
         功能: 从舵机读取当前实际速度值
         """
-        scs_present_speed, scs_comm_result, scs_error =极self.read2ByteTxRx(scs_id, SMS_STS_PRESENT_SPEED_L)
-        return self.sc极tohost(scs_present_speed, 15), scs_comm_result, scs_error
+        scs_present_speed, scs_comm_result, scs_error = self.read2ByteTxRx(scs_id, SMS_STS_PRESENT_SPEED_L, deadline)
+        return self.scs_tohost(scs_present_speed, 15), scs_comm_result, scs_error
 
-    def ReadPosSpeed(self, scs_id):
+    def ReadPosSpeed(self, scs_id, deadline=None):
         """
         同时读取舵机当前位置和速度
-        输入参数: scs_id - 舵机ID
+        输入参数:
+            scs_id - 舵机ID
+            deadline - 绝对截止时间（毫秒），None表示不限制
         输出: (当前位置, 当前速度, 通信结果, 错误代码) 元组
         功能: 一次性读取舵机的当前位置和速度信息
         """
-        scs_present_position_speed, scs_comm_result, scs_error = self.read4ByteTxRx(scs_id, SMS_STS_PRESENT_POSITION_L)
+        scs_present_position_speed, scs_comm_result, scs_error = self.read4ByteTxRx(scs_id, SMS_STS_PRESENT_POSITION_L, deadline)
         scs_present_position = self.scs_loword(scs_present_position_speed)
         scs_present_speed = self.scs_hiword(scs_present_position_speed)
         return self.scs_tohost(scs_present_position, 15), self.scs_tohost(scs_present_speed, 15), scs_comm_result, scs_error
 
-    def ReadMoving(self, scs_id):
+    def ReadMoving(self, scs_id, deadline=None):
         """
         读取舵机运动状态
-        输入参数: scs_id - 舵机ID
+        输入参数:
+            scs_id - 舵机ID
+            deadline - 绝对截止时间（毫秒），None表示不限制
         输出: (运动状态, 通信结果, 错误代码) 元组
         功能: 检查舵机是否正在运动（1表示运动中，0表示静止）
         """
-        moving, scs_comm_result, scs_error = self.read1ByteTxRx(scs_id, SMS_STS_MOVING)
+        moving, scs_comm_result, scs_error = self.read1ByteTxRx(scs_id, SMS_STS_MOVING, deadline)
         return moving, scs_comm_result, scs_error
 
-    def SyncWritePosEx(self, scs_id, position, speed, acc):
+    def SyncWritePosEx(self, scs_id, position, speed, acc, force=False):
         """
         同步扩展位置控制（用于多舵机同步控制）
         输入参数: 
@@ -132,11 +142,14 @@ class sms_sts(protocol_packet_handler):
             position - 目标位置
             speed - 运动速度
             acc - 加速度
-        输出: 添加参数是否成功
+            force - 开启写入去重时，是否强制发送与上次相同的值
+        输出: 添加参数是否成功（与上次发送的值相同而被跳过时也返回True）
         功能: 将舵机控制参数添加到同步写入组，用于多舵机同步控制
         """
         position = self.scs_toscs(position, 15)
         txpacket = [acc, self.scs_lobyte(position), self.scs_hibyte(position), 0, 0, self.scs_lobyte(speed), self.scs_hibyte(speed)]
+        if not force and self.isDuplicateWrite(scs_id, SMS_STS_ACC, txpacket, 1 + len(txpacket)):
+            return True
         return self.groupSyncWrite.addParam(scs_id, txpacket)
 
     def RegWritePosEx(self, scs_id, position, speed, acc):
@@ -151,8 +164,8 @@ class sms_sts(protocol_packet_handler):
         功能: 将控制指令写入寄存器，需要调用RegAction执行
         """
         position = self.scs_toscs(position, 15)
-        txpacket = [极acc, self.scs_lobyte(position), self.scs_hibyte(position), 0, 0, self.scs_lobyte(speed), self.scs_hibyte(speed)]
-        return self.regWriteTxRx(scs_id, SMS_STS_ACC极, len(txpacket), txpacket)
+        txpacket = [acc, self.scs_lobyte(position), self.scs_hibyte(position), 0, 0, self.scs_lobyte(speed), self.scs_hibyte(speed)]
+        return self.regWriteTxRx(scs_id, SMS_STS_ACC, len(txpacket), txpacket)
 
     def RegAction(self):
         """
@@ -172,19 +185,21 @@ class sms_sts(protocol_packet_handler):
         """
         return self.write1ByteTxRx(scs_id, SMS_STS_MODE, 1)
 
-    def WriteSpec(self, scs_id, speed, acc):
+    def WriteSpec(self, scs_id, speed, acc, force=False, deadline=None):
         """
         速度控制函数（用于轮式模式）
         输入参数: 
             scs_id - 舵机ID
             speed - 目标速度
             acc - 加速度
+            force - 开启写入去重时，是否强制发送与上次相同的值
+            deadline - 绝对截止时间（毫秒），None表示不限制
         输出: (通信结果, 错误代码) 元组
         功能: 在轮式模式下控制舵机的旋转速度和加速度
         """
         speed = self.scs_toscs(speed, 15)
         txpacket = [acc, 0, 0, 0, 0, self.scs_lobyte(speed), self.scs_hibyte(speed)]
-        return self.writeTxRx(scs_id, SMS_STS_ACC, len(txpacket), txpacket)
+        return self.writeGoalTxRx(scs_id, SMS_STS_ACC, txpacket, force, deadline)
 
     def LockEprom(self, scs_id):
         """
@@ -193,7 +208,7 @@ class sms_sts(protocol_packet_handler):
         输出: (通信结果, 错误代码) 元组
         功能: 锁定舵机的EPROM存储器，防止意外写入
         """
-        return self.write1Byte极Rx(scs_id, SMS_STS_LOCK, 1)
+        return self.write1ByteTxRx(scs_id, SMS_STS_LOCK, 1)
 
     def unLockEprom(self, scs_id):
         """
@@ -0,0 +1,171 @@
+#!/usr/bin/env python
+
+from .scservo_def import *
+from .group_sync_read import *
+from .register_map import getRegisterMap
+
+# 遥测字段定义：字段名 -> 内存表中的寄存器名（地址、字节数和符号位由协议的内存表给出）
+TELEMETRY_FIELDS = {
+    'load': 'present_load',
+    'voltage': 'present_voltage',
+    'temperature': 'present_temperature',
+    'current': 'present_current',
+}
+
+# 默认数据陈旧度目标（毫秒）
+DEFAULT_STALENESS = {
+    'load': 100.0,
+    'voltage': 1000.0,
+    'temperature': 1000.0,
+    'current': 100.0,
+}
+
+# 默认每个舵机的应答延迟余量（毫秒）
+DEFAULT_TURNAROUND = 0.5
+
+
+class TelemetryPoller:
+    def __init__(self, ph, scs_ids, group_size=4, staleness=None, turnaround=DEFAULT_TURNAROUND):
+        """
+        初始化遥测轮询器
+        输入参数:
+            ph - 协议包处理器对象
+            scs_ids - 需要采集遥测数据的舵机ID列表
+            group_size - 每次同步读取的最大舵机数量
+            staleness - 字段名到陈旧度目标（毫秒）的字典，覆盖默认值
+            turnaround - 每个舵机的应答延迟余量（毫秒），用于估算事务耗时
+        功能: 在控制周期的空闲时间内分组轮流读取电压、温度、负载和电流，
+              并维护带时间戳的最新值缓存
+        """
+        self.ph = ph
+        self.register_map = getRegisterMap(ph)
+        self.scs_ids = list(scs_ids)
+        self.group_size = max(1, group_size)
+        self.turnaround = turnaround
+
+        self.staleness = dict(DEFAULT_STALENESS)  # 各字段的陈旧度目标
+        if staleness:
+            self.staleness.update(staleness)
+
+        self.cache = {}  # 缓存：舵机ID -> {字段名: (值, 时间戳)}
+        self.next_index = 0  # 轮询起始位置
+        self.last_result = COMM_SUCCESS  # 上一次读取的通信结果
+        self.skip_count = 0  # 因时间不足而跳过的次数
+
+    def get(self, scs_id, field):
+        """
+        获取缓存的遥测值
+        输入参数:
+            scs_id - 舵机ID
+            field - 字段名（'load', 'voltage', 'temperature', 'current'）
+        输出: (值, 时间戳) 元组，无数据时返回None
+        功能: 返回指定舵机指定字段的最新缓存值及其读取时间（毫秒）
+        """
+        return self.cache.get(scs_id, {}).get(field)
+
+    def getAge(self, scs_id, field, now=None):
+        """
+        获取缓存值的年龄
+        输入参数:
+            scs_id - 舵机ID
+            field - 字段名
+            now - 当前时间（毫秒），None表示读取端口时钟
+        输出: 浮点数，距上次读取经过的时间（毫秒），无数据时返回None
+        功能: 计算指定字段缓存值的年龄
+        """
+        entry = self.get(scs_id, field)
+        if entry is None:
+            return None
+        if now is None:
+            now = self.ph.portHandler.getCurrentTime()
+        return now - entry[1]
+
+    def isStale(self, scs_id, field, now=None):
+        """
+        检查缓存值是否陈旧
+        输入参数:
+            scs_id - 舵机ID
+            field - 字段名
+            now - 当前时间（毫秒），None表示读取端口时钟
+        输出: 布尔值，无数据或超过陈旧度目标时为True
+        功能: 判断指定字段是否需要重新读取
+        """
+        age = self.getAge(scs_id, field, now)
+        return age is None or age >= self.staleness[field]
+
+    def estimateTime(self, count, data_length):
+        """
+        估算一次同步读取的耗时
+        输入参数:
+            count - 舵机数量
+            data_length - 每个舵机读取的字节数
+        输出: 浮点数，估算耗时（毫秒）
+        功能: 根据每字节传输时间和应答延迟余量估算事务耗时
+        """
+        tx_length = 8 + count  # HEADER0 HEADER1 ID LEN INST START_ADDR DATA_LEN ID... CHKSUM
+        rx_length = (6 + data_length) * count
+        return (tx_length + rx_length) * self.ph.portHandler.tx_time_per_byte + self.turnaround * count
+
+    def poll(self, deadline=None):
+        """
+        在截止时间前执行一次遥测读取
+        输入参数: deadline - 绝对截止时间（毫秒，与端口时钟同一基准），None表示不限制
+        输出: (通信结果, 已更新的舵机ID列表) 元组
+        功能: 按轮询顺序挑选有陈旧字段的舵机，只读取覆盖陈旧字段的地址区间；
+              若估算耗时超出截止时间则缩小分组，连一个舵机都放不下时跳过本次读取并返回COMM_DEADLINE_MISS
+        """
+        port = self.ph.portHandler
+        now = port.getCurrentTime()
+
+        # 按轮询顺序挑选需要刷新的舵机及其陈旧字段
+        group = []
+        fields = set()
+        count = len(self.scs_ids)
+        for i in range(count):
+            scs_id = self.scs_ids[(self.next_index + i) % count]
+            stale = [field for field in self.staleness if self.isStale(scs_id, field, now)]
+            if stale:
+                group.append(scs_id)
+                fields.update(stale)
+                if len(group) >= self.group_size:
+                    break
+
+        if not group:
+            return COMM_SUCCESS, []
+
+        # 计算覆盖所有陈旧字段的最小地址区间
+        start_address, data_length = self.register_map.span([TELEMETRY_FIELDS[field] for field in fields])
+
+        # 缩小分组直到能在截止时间内完成
+        if deadline is not None:
+            while group and now + self.estimateTime(len(group), data_length) > deadline:
+                group.pop()
+            if not group:
+                self.skip_count += 1
+                return COMM_DEADLINE_MISS, []
+
+        groupSyncRead = GroupSyncRead(self.ph, start_address, data_length)
+        for scs_id in group:
+            groupSyncRead.addParam(scs_id)
+
+        result = groupSyncRead.txRxPacket(deadline)
+        self.last_result = result
+
+        # 更新缓存：区间内完整包含的遥测字段都按内存表解码（含符号位转换）
+        decoder = self.register_map.getDecoder(start_address, data_length)
+        timestamp = port.getCurrentTime()
+        updated = []
+        for scs_id in group:
+            available, _ = groupSyncRead.isAvailable(scs_id, start_address, data_length)
+            if not available:
+                continue
+            values = decoder.decode(groupSyncRead.data_table[scs_id], 1)
+            entry = self.cache.setdefault(scs_id, {})
+            for field, name in TELEMETRY_FIELDS.items():
+                if name in values:
+                    entry[field] = (values[name], timestamp)
+            updated.append(scs_id)
+
+        # 下一次从本组最后一个舵机之后开始
+        self.next_index = (self.scs_ids.index(group[-1]) + 1) % count
+        return result, updated
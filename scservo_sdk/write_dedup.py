@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+
+from .scservo_def import *
+
+# 默认强制重发间隔（毫秒），用于在舵机复位后恢复目标值
+DEFAULT_REFRESH = 1000.0
+
+
+class WriteDeduplicator(object):
+    def __init__(self, refresh=DEFAULT_REFRESH):
+        """
+        初始化写入去重器
+        输入参数: refresh - 强制重发间隔（毫秒），None表示从不强制重发
+        功能: 记录每个舵机最近一次确认写入的目标寄存器值，与之相同的写入被跳过；
+              超过重发间隔后即使值相同也重新发送，以便从舵机侧复位中恢复
+        """
+        self.refresh = refresh
+        self.last = {}  # 舵机ID -> {起始地址: (数据, 确认时间)}
+        self.skipped_writes = 0  # 跳过的写入次数
+        self.bytes_saved = 0  # 节省的总线字节数
+
+    def isDuplicate(self, scs_id, address, data, now):
+        """
+        检查写入是否与上次确认的值相同
+        输入参数:
+            scs_id - 舵机ID
+            address - 起始地址
+            data - 待写入的字节值列表
+            now - 当前时间（毫秒）
+        输出: 布尔值，相同且未到重发时间时为True
+        """
+        entry = self.last.get(scs_id, {}).get(address)
+        if entry is None or entry[0] != tuple(data):
+            return False
+        if self.refresh is not None and now - entry[1] >= self.refresh:
+            return False
+        return True
+
+    def skip(self, saved_bytes):
+        """
+        记录一次跳过的写入
+        输入参数: saved_bytes - 本次跳过节省的总线字节数
+        输出: 无
+        """
+        self.skipped_writes += 1
+        self.bytes_saved += saved_bytes
+
+    def commit(self, scs_id, address, data, now):
+        """
+        记录一次已确认的写入
+        输入参数:
+            scs_id - 舵机ID
+            address - 起始地址
+            data - 已写入的字节值列表
+            now - 确认时间（毫秒）
+        输出: 无
+        """
+        self.last.setdefault(scs_id, {})[address] = (tuple(data), now)
+
+    def forget(self, scs_id, address=0, length=256):
+        """
+        丢弃与指定范围重叠的记录
+        输入参数:
+            scs_id - 舵机ID，BROADCAST_ID表示所有舵机
+            address - 起始地址
+            length - 字节数
+        输出: 无
+        功能: 其他途径写入了目标寄存器或写入失败时调用，保证下次写入不会被跳过
+        """
+        if scs_id == BROADCAST_ID:
+            for current_id in list(self.last):
+                self.forget(current_id, address, length)
+            return
+
+        entries = self.last.get(scs_id)
+        if not entries:
+            return
+        end = address + length
+        for start in [start for start, entry in entries.items() if start < end and address < start + len(entry[0])]:
+            del entries[start]
+
+    def reset(self):
+        """
+        清空所有记录
+        输入参数: 无
+        输出: 无
+        功能: 舵机上电或重新连接后调用，下次写入全部重新发送
+        """
+        self.last = {}
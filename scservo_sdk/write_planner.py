@@ -0,0 +1,272 @@
+#!/usr/bin/env python
+
+from .scservo_def import *
+from .protocol_packet_handler import TXPACKET_MAX_LEN
+from .group_sync_write import *
+from .register_map import getRegisterMap
+from .read_planner import DEFAULT_RESPONSE_DELAY, DEFAULT_HOST_LATENCY, STATUS_FRAME_LENGTH
+
+# 指令包的固定字节数
+WRITE_PACKET_LENGTH = 7  # HEADER0 HEADER1 ID LEN INST ADDR ... CHKSUM
+SYNC_WRITE_PACKET_LENGTH = 8  # HEADER0 HEADER1 ID LEN INST ADDR DATA_LEN ... CHKSUM，另加每个舵机一个ID字节
+
+
+class WritePlanner(object):
+    def __init__(self, ph, response_delay=DEFAULT_RESPONSE_DELAY, host_latency=DEFAULT_HOST_LATENCY):
+        """
+        初始化最小差异写入规划器
+        输入参数:
+            ph - 协议包处理器对象（sms_sts/hls/scscl）
+            response_delay - 单个写入等待状态包时的舵机应答延迟（毫秒）
+            host_latency - 单个写入每次事务的固定主机延迟（毫秒）
+        功能: 按字节记录每个舵机最近一次写入（或读回）的寄存器值，只发送与记录不同的寄存器；
+              两段变化之间的寄存器值已知时可以原样重发以合并为一个写入区间，
+              按当前波特率估算的代价决定合并还是拆分。寄存器不会被拆开写入，避免出现半个新值；
+              创建时挂接到ph，其他途径的写入、复位和校正会通过ph.invalidateCaches使记录失效
+        """
+        self.ph = ph
+        self.port = ph.portHandler
+        self.register_map = getRegisterMap(ph)
+        self.response_delay = response_delay
+        self.host_latency = host_latency
+        self.memory = {}  # 舵机ID -> bytearray(256)，已知的寄存器值
+        self.known = {}  # 舵机ID -> bytearray(256)，对应字节是否已知
+        self.packets = 0  # 发送的写入包数
+        self.tx_bytes = 0  # 发送的写入包字节数（不含状态包）
+        ph.setWritePlanner(self)
+
+    def remember(self, scs_id, address, data):
+        """
+        记录舵机的寄存器值
+        输入参数:
+            scs_id - 舵机ID
+            address - 起始地址
+            data - 字节值列表
+        输出: 无
+        功能: 写入成功后自动调用；读回舵机内存后也可以调用，使后续写入可以跨越这些字节合并
+        """
+        memory = self.memory.get(scs_id)
+        if memory is None:
+            memory = self.memory[scs_id] = bytearray(256)
+            self.known[scs_id] = bytearray(256)
+        memory[address:address + len(data)] = bytearray(data)
+        self.known[scs_id][address:address + len(data)] = b'\x01' * len(data)
+
+    def forget(self, scs_id, address=0, length=256):
+        """
+        丢弃记录
+        输入参数:
+            scs_id - 舵机ID（BROADCAST_ID表示所有舵机）
+            address - 起始地址
+            length - 字节数
+        输出: 无
+        功能: 写入失败、舵机复位或其他途径修改了寄存器时调用，下次写入会重新发送
+        """
+        if scs_id == BROADCAST_ID:
+            for known in self.known.values():
+                known[address:address + length] = bytes(length)
+            return
+        known = self.known.get(scs_id)
+        if known is not None:
+            known[address:address + length] = bytes(length)
+
+    def changes(self, scs_id, values):
+        """
+        找出与记录不同的寄存器
+        输入参数:
+            scs_id - 舵机ID
+            values - 字典，字段名 -> 主机格式值
+        输出: (变化列表, 期望字节) 元组；变化列表为[(寄存器, 字节值列表), ...]按地址排序，
+              期望字节为字典，地址 -> 字节值
+        """
+        memory = self.memory.get(scs_id)
+        known = self.known.get(scs_id)
+        desired = {}
+        changed = []
+        for name, value in values.items():
+            register = self.register_map[name]
+            data = self.register_map.encode(name, value)
+            for offset, byte in enumerate(data):
+                desired[register.address + offset] = byte
+            address = register.address
+            if memory is None or not all(known[address:address + len(data)]) or \
+                    memory[address:address + len(data)] != bytearray(data):
+                changed.append((register, data))
+        changed.sort(key=lambda item: item[0].address)
+        return changed, desired
+
+    def spanData(self, scs_id, desired, start, end):
+        """
+        获取区间内要发送的字节
+        输入参数:
+            scs_id - 舵机ID
+            desired - 字典，地址 -> 期望字节值
+            start - 起始地址
+            end - 结束地址（不含）
+        输出: 字节值列表；区间内有既不在期望值中也没有记录的字节时返回None
+        """
+        memory = self.memory.get(scs_id)
+        known = self.known.get(scs_id)
+        data = []
+        for address in range(start, end):
+            byte = desired.get(address)
+            if byte is None:
+                if memory is None or not known[address]:
+                    return None
+                byte = memory[address]
+            data.append(byte)
+        return data
+
+    def writeCost(self, length):
+        """
+        估算一次单个写入的时间
+        输入参数: length - 数据字节数
+        输出: 浮点数，毫秒（写入包、状态包、应答延迟和主机延迟）
+        """
+        return ((WRITE_PACKET_LENGTH + length + STATUS_FRAME_LENGTH) * self.port.tx_time_per_byte +
+                self.response_delay + self.host_latency)
+
+    def frameCost(self, length, count):
+        """
+        估算一帧同步写入的时间
+        输入参数:
+            length - 每个舵机的数据字节数
+            count - 舵机数
+        输出: 浮点数，毫秒（同步写入没有状态包）
+        """
+        return (SYNC_WRITE_PACKET_LENGTH + count * (1 + length)) * self.port.tx_time_per_byte
+
+    def plan(self, scs_id, values):
+        """
+        规划单个舵机的写入
+        输入参数:
+            scs_id - 舵机ID
+            values - 字典，字段名 -> 主机格式值
+        输出: 列表，每项为(起始地址, 字节值列表)；与记录完全相同时为空列表
+        功能: 对变化的寄存器按地址做动态规划，每个区间覆盖连续的若干变化寄存器，
+              区间内的其他字节必须已知
+        """
+        changed, desired = self.changes(scs_id, values)
+        total = len(changed)
+        best = [0.0] + [None] * total
+        choice = [None] * (total + 1)  # (第一个寄存器, 区间数据)
+        for end in range(1, total + 1):
+            last = changed[end - 1][0]
+            stop = last.address + last.length
+            for start in range(end - 1, -1, -1):
+                data = self.spanData(scs_id, desired, changed[start][0].address, stop)
+                if data is None:
+                    break  # 起点再往前仍然包含未知字节
+                cost = best[start] + self.writeCost(len(data))
+                if best[end] is None or cost < best[end]:
+                    best[end] = cost
+                    choice[end] = (start, data)
+
+        spans = []
+        end = total
+        while end > 0:
+            start, data = choice[end]
+            spans.append((changed[start][0].address, data))
+            end = start
+        spans.reverse()
+        return spans
+
+    def planSync(self, targets):
+        """
+        规划多个舵机的同步写入
+        输入参数: targets - 字典，舵机ID -> {字段名: 主机格式值}
+        输出: 列表，每项为(起始地址, 长度, [(舵机ID, 字节值列表), ...])，按起始地址排序；
+              没有变化时为空列表
+        功能: 所有舵机变化过的寄存器按地址做动态规划，每帧覆盖连续的若干寄存器，
+              只包含在该区间内有变化的舵机；帧的代价为帧头加每个舵机的ID和数据，
+              所以合并两帧要权衡重发的中间字节和省下的帧头与ID字节
+        """
+        desired = {}
+        changed = {}  # 舵机ID -> 变化的寄存器地址集合
+        registers = {}  # 地址 -> 寄存器
+        for scs_id, values in targets.items():
+            items, desired[scs_id] = self.changes(scs_id, values)
+            if items:
+                changed[scs_id] = set(register.address for register, _ in items)
+                for register, _ in items:
+                    registers[register.address] = register
+        units = [registers[address] for address in sorted(registers)]
+
+        total = len(units)
+        best = [0.0] + [None] * total
+        choice = [None] * (total + 1)  # (第一个寄存器, 长度, 帧内容)
+        for end in range(1, total + 1):
+            stop = units[end - 1].address + units[end - 1].length
+            for start in range(end - 1, -1, -1):
+                address = units[start].address
+                items = []
+                for scs_id in sorted(changed):
+                    if any(address <= changed_address < stop for changed_address in changed[scs_id]):
+                        data = self.spanData(scs_id, desired[scs_id], address, stop)
+                        if data is None:
+                            items = None
+                            break
+                        items.append((scs_id, data))
+                if items is None:
+                    break  # 起点再往前仍然包含该舵机的未知字节
+                cost = best[start] + self.frameCost(stop - address, len(items))
+                if best[end] is None or cost < best[end]:
+                    best[end] = cost
+                    choice[end] = (start, stop - address, items)
+
+        frames = []
+        end = total
+        while end > 0:
+            start, length, items = choice[end]
+            frames.append((units[start].address, length, items))
+            end = start
+        frames.reverse()
+        return frames
+
+    def write(self, scs_id, values, deadline=None):
+        """
+        写入单个舵机
+        输入参数:
+            scs_id - 舵机ID
+            values - 字典，字段名 -> 主机格式值
+            deadline - 绝对截止时间（毫秒），None表示不限制
+        输出: (通信结果, 错误代码) 元组；没有变化时为(COMM_SUCCESS, 0)
+        功能: 按plan逐个区间写入并等待状态包，成功的区间记入记录；失败时丢弃该区间的记录并返回
+        """
+        error = 0
+        for address, data in self.plan(scs_id, values):
+            result, error = self.ph.writeTxRx(scs_id, address, len(data), data, deadline)
+            self.packets += 1
+            self.tx_bytes += WRITE_PACKET_LENGTH + len(data)
+            if result != COMM_SUCCESS:
+                self.forget(scs_id, address, len(data))
+                return result, error
+            self.remember(scs_id, address, data)
+        return COMM_SUCCESS, error
+
+    def syncWrite(self, targets):
+        """
+        同步写入多个舵机
+        输入参数: targets - 字典，舵机ID -> {字段名: 主机格式值}
+        输出: 通信结果代码，有帧发送失败时为第一个失败的结果
+        功能: 按planSync发送同步写入帧，超过一帧容量时分为多帧；同步写入没有应答，发送成功即记入记录
+        """
+        result = COMM_SUCCESS
+        for address, length, frame_items in self.planSync(targets):
+            capacity = (TXPACKET_MAX_LEN - SYNC_WRITE_PACKET_LENGTH) // (1 + length)
+            for index in range(0, len(frame_items), capacity):
+                items = frame_items[index:index + capacity]
+                groupSyncWrite = GroupSyncWrite(self.ph, address, length)
+                for scs_id, data in items:
+                    groupSyncWrite.addParam(scs_id, data)
+                frame_result = groupSyncWrite.txPacket()
+                self.packets += 1
+                self.tx_bytes += SYNC_WRITE_PACKET_LENGTH + len(items) * (1 + length)
+                for scs_id, data in items:
+                    if frame_result == COMM_SUCCESS:
+                        self.remember(scs_id, address, data)
+                    else:
+                        self.forget(scs_id, address, length)
+                if result == COMM_SUCCESS:
+                    result = frame_result
+        return result
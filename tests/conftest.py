@@ -0,0 +1,46 @@
+#!/usr/bin/env python
+
+import pytest
+
+from scservo_sdk import *
+from scservo_sdk.bench import makeSimBus
+from scservo_sdk.clock import VirtualClock
+
+# 模拟总线的默认选项；测试用indirect参数化覆盖，例如
+# @pytest.mark.parametrize('bus', [{'scs_ids': [1, 2, 3]}], indirect=True)
+BUS_OPTIONS = {'scs_ids': [1, 2], 'latency': 0.0, 'virtual_clock': False}
+
+# 按协议参数化模拟总线
+PROTOCOLS = [
+    pytest.param({'protocol': sms_sts, 'protocol_end': 0}, id='sms_sts'),
+    pytest.param({'protocol': hls, 'protocol_end': 0}, id='hls'),
+    pytest.param({'protocol': scscl, 'protocol_end': 1}, id='scscl'),
+]
+
+
+@pytest.fixture
+def bus(request):
+    """
+    模拟总线
+    输出: (portHandler, packetHandler) 元组
+    功能: 选项为BUS_OPTIONS加上参数化给出的覆盖项，其余选项原样传给makeSimBus；
+          virtual_clock为True时使用新的VirtualClock，等待不占用实际时间
+    """
+    options = dict(BUS_OPTIONS)
+    options.update(getattr(request, 'param', {}))
+    scs_ids = options.pop('scs_ids')
+    if options.pop('virtual_clock'):
+        options['clock'] = VirtualClock()
+    return makeSimBus(scs_ids, **options)
+
+
+def goalPosition(portHandler, scs_id):
+    """
+    读取模拟舵机的目标位置
+    输入参数:
+        portHandler - 模拟总线的端口
+        scs_id - 舵机ID
+    输出: 整数，内存表中的目标位置原始值（小端）
+    """
+    memory = portHandler.servos[scs_id].memory
+    return memory[SMS_STS_GOAL_POSITION_L] | (memory[SMS_STS_GOAL_POSITION_H] << 8)
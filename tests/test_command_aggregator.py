@@ -0,0 +1,49 @@
+#!/usr/bin/env python
+
+from scservo_sdk import *
+from scservo_sdk.command_aggregator import CommandAggregator
+from conftest import goalPosition
+
+
+def failWrites(portHandler):
+    portHandler.writePort = lambda packet: 0
+
+
+def restoreWrites(portHandler):
+    del portHandler.writePort
+
+
+def test_failed_frame_is_requeued(bus):
+    portHandler, packetHandler = bus
+    aggregator = CommandAggregator(packetHandler)
+    aggregator.WritePosEx(1, 100, 0, 0)
+    aggregator.WritePosEx(2, 200, 0, 0)
+
+    failWrites(portHandler)
+    assert aggregator.flush() == COMM_TX_FAIL
+    restoreWrites(portHandler)
+    assert aggregator.flush() == COMM_SUCCESS
+
+    assert goalPosition(portHandler, 1) == 100
+    assert goalPosition(portHandler, 2) == 200
+    stats = aggregator.getStats()
+    assert stats['failed_frames'] == 1
+    assert stats['requeued'] == 2
+    assert stats['sent'] == 2
+
+
+def test_newer_command_wins_over_failed_frame(bus):
+    portHandler, packetHandler = bus
+    aggregator = CommandAggregator(packetHandler)
+    aggregator.WritePosEx(1, 100, 0, 0)
+
+    def failAndResubmit(packet):
+        aggregator.WritePosEx(1, 300, 0, 0)
+        return 0
+    portHandler.writePort = failAndResubmit
+    aggregator.flush()
+    restoreWrites(portHandler)
+    aggregator.flush()
+
+    assert goalPosition(portHandler, 1) == 300
+    assert aggregator.getStats()['dropped'] == 1
@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+
+import pytest
+
+from scservo_sdk import *
+from scservo_sdk.bench import StaticSerial, measureAllocations
+from scservo_sdk.compiled_cycle import CompiledCycle
+
+# 六个舵机，虚拟时钟，只测量SDK自身
+pytestmark = pytest.mark.parametrize('bus', [{'scs_ids': [1, 2, 3, 4, 5, 6], 'virtual_clock': True}], indirect=True)
+
+
+class ChunkedSerial(StaticSerial):
+    def __init__(self, response, chunk):
+        """
+        初始化分段应答的串口
+        输入参数:
+            response - 每次收到同步读取指令后返回的应答字节
+            chunk - 每次读取最多返回的字节数，使接收分多次完成
+        """
+        StaticSerial.__init__(self, response)
+        self.chunk = chunk
+        self.position = self.size
+
+    def reset_input_buffer(self):
+        self.position = self.size
+
+    def write(self, packet):
+        if packet[PKT_INSTRUCTION] == INST_SYNC_READ:
+            self.position = 0
+        return len(packet)
+
+    def readinto(self, buffer):
+        count = min(self.chunk, self.size - self.position, len(buffer))
+        buffer[:count] = self.response[self.position:self.position + count]
+        self.position += count
+        return count
+
+
+def chunkedCycle(bus, chunk):
+    portHandler, packetHandler = bus
+    scs_ids = sorted(portHandler.servos)
+    portHandler.setTxTiming(TX_TIMING_RETURN)
+    response = bytearray()
+    for scs_id in scs_ids:
+        servo = portHandler.servos[scs_id]
+        servo.setWord(SMS_STS_PRESENT_POSITION_L, 1000 + scs_id)
+        response.extend(portHandler.makeStatus(scs_id, 0, servo.memory[
+            SMS_STS_PRESENT_POSITION_L:SMS_STS_PRESENT_POSITION_L + 4]))
+    portHandler.ser = ChunkedSerial(response, chunk)
+    cycle = CompiledCycle(packetHandler, scs_ids, SMS_STS_ACC, 7, SMS_STS_PRESENT_POSITION_L, 4)
+    return cycle, scs_ids
+
+
+def test_partial_reads_complete_the_cycle(bus):
+    cycle, scs_ids = chunkedCycle(bus, 5)
+    assert cycle.run() == COMM_SUCCESS
+    for scs_id in scs_ids:
+        assert cycle.isAvailable(scs_id) == (True, 0)
+        assert cycle.getWord(scs_id, SMS_STS_PRESENT_POSITION_L) == 1000 + scs_id
+
+
+def test_partial_reads_do_not_allocate(bus):
+    cycle, scs_ids = chunkedCycle(bus, 3)
+    assert cycle.run() == COMM_SUCCESS
+
+    # 校验和只能由内置sum计算，每次会创建临时迭代器和结果整数，返回前即由引用计数释放，
+    # 不会进入垃圾回收；上限是一次校验和而不是每帧一次，说明这些对象没有在周期内累积
+    overhead = measureAllocations(lambda: None, 1000)[1]
+    probe = memoryview(bytearray(b'\xff' * 8))
+    allowance = measureAllocations(lambda: cycle.checksum(probe), 1000)[1] - overhead
+    retained, transient = measureAllocations(cycle.run, 1000)
+    assert retained == 0
+    assert transient - overhead <= allowance
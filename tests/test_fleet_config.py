@@ -0,0 +1,36 @@
+#!/usr/bin/env python
+
+import pytest
+
+from scservo_sdk import *
+from scservo_sdk.fleet_config import FleetConfigurator
+
+# 写入EPROM后的等待使用虚拟时钟
+pytestmark = pytest.mark.parametrize('bus', [{'virtual_clock': True}], indirect=True)
+
+
+@pytest.fixture
+def configurator(bus):
+    return FleetConfigurator(bus[1])
+
+
+def test_negative_offset_uses_sign_bit(bus, configurator):
+    portHandler, packetHandler = bus
+    assert configurator.apply({1: {SMS_STS_OFS_L: -5}}) == (COMM_SUCCESS, {})
+    memory = portHandler.servos[1].memory
+    assert list(memory[SMS_STS_OFS_L:SMS_STS_OFS_L + 2]) == [5, 0x08]
+    offset, result, error = packetHandler.read2ByteTxRx(1, SMS_STS_OFS_L)
+    assert packetHandler.scs_tohost(offset, 11) == -5
+
+
+def test_empty_config_sends_nothing(bus, configurator):
+    portHandler, packetHandler = bus
+    assert configurator.apply({1: {}}) == (COMM_SUCCESS, {})
+    assert configurator.frames == 0
+    assert configurator.verify({1: {}}) == (COMM_SUCCESS, {})
+
+
+def test_empty_servo_config_is_ignored(bus, configurator):
+    portHandler, packetHandler = bus
+    assert configurator.apply({1: {}, 2: {SMS_STS_CW_DEAD: 3}}) == (COMM_SUCCESS, {})
+    assert portHandler.servos[2].memory[SMS_STS_CW_DEAD] == 3
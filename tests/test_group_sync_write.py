@@ -0,0 +1,26 @@
+#!/usr/bin/env python
+
+from scservo_sdk import *
+
+
+def test_change_param_in_place(bus):
+    portHandler, packetHandler = bus
+    groupSyncWrite = GroupSyncWrite(packetHandler, SMS_STS_GOAL_POSITION_L, 2)
+    groupSyncWrite.addParam(1, [1, 2])
+    groupSyncWrite.addParam(2, [3, 4])
+    groupSyncWrite.makeParam()
+    assert groupSyncWrite.changeParam(1, [5, 6])
+    assert groupSyncWrite.is_param_changed is False
+    assert groupSyncWrite.param == [1, 5, 6, 2, 3, 4]
+
+
+def test_change_short_param_rebuilds(bus):
+    portHandler, packetHandler = bus
+    groupSyncWrite = GroupSyncWrite(packetHandler, SMS_STS_GOAL_POSITION_L, 2)
+    groupSyncWrite.addParam(1, [5])
+    groupSyncWrite.addParam(2, [7, 8])
+    groupSyncWrite.makeParam()
+    assert groupSyncWrite.changeParam(1, [1, 2])
+    assert groupSyncWrite.txPacket() == COMM_SUCCESS
+    assert groupSyncWrite.param == [1, 1, 2, 2, 7, 8]
+    assert portHandler.servos[2].memory[SMS_STS_GOAL_POSITION_L:SMS_STS_GOAL_POSITION_L + 2] == bytearray([7, 8])
@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+
+import pytest
+
+from scservo_sdk import *
+from scservo_sdk.compiled_cycle import CompiledCycle
+from scservo_sdk.instrumentation import MetricsRegistry
+
+pytestmark = pytest.mark.parametrize('bus', [{'scs_ids': [1, 2, 3]}], indirect=True)
+
+
+@pytest.fixture
+def metrics(bus):
+    metrics = MetricsRegistry()
+    bus[1].setMetrics(metrics)
+    return metrics
+
+
+@pytest.fixture
+def wire(bus):
+    return bus[0].enableBusStats()
+
+
+def syncReadTotals(metrics):
+    totals = {'responses': 0, 'rx_bytes': 0}
+    for (scs_id, instruction), stats in metrics.snapshot().items():
+        if instruction == INST_SYNC_READ:
+            totals['responses'] += stats['responses']
+            totals['rx_bytes'] += stats['rx_bytes']
+    return totals
+
+
+def groupSyncRead(packetHandler, scs_ids):
+    groupSyncRead = GroupSyncRead(packetHandler, SMS_STS_PRESENT_POSITION_L, 4)
+    for scs_id in scs_ids:
+        groupSyncRead.addParam(scs_id)
+    return groupSyncRead.txRxPacket()
+
+
+def compiledCycle(packetHandler, scs_ids):
+    return CompiledCycle(packetHandler, scs_ids, read_address=SMS_STS_PRESENT_POSITION_L, read_length=4).run()
+
+
+@pytest.mark.parametrize('transaction', [groupSyncRead, compiledCycle])
+def test_sync_read_counts_each_reply_once(bus, metrics, wire, transaction):
+    portHandler, packetHandler = bus
+    assert transaction(packetHandler, [1, 2, 3]) == COMM_SUCCESS
+    assert syncReadTotals(metrics) == {'responses': 3, 'rx_bytes': 30}
+    assert wire.usage[INST_SYNC_READ].rx_bytes == 30
+
+
+@pytest.mark.parametrize('transaction', [groupSyncRead, compiledCycle])
+def test_sync_read_counts_partial_reply_bytes(bus, metrics, wire, transaction):
+    portHandler, packetHandler = bus
+    del portHandler.servos[3]
+    assert transaction(packetHandler, [1, 2, 3]) != COMM_SUCCESS
+    assert syncReadTotals(metrics) == {'responses': 3, 'rx_bytes': 20}
+    assert wire.usage[INST_SYNC_READ].rx_bytes == 20
+    assert metrics.snapshot()[(3, INST_SYNC_READ)]['responses'] == 1
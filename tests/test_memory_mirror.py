@@ -0,0 +1,30 @@
+#!/usr/bin/env python
+
+import pytest
+
+from scservo_sdk import *
+from scservo_sdk.memory_mirror import MemoryMirror
+
+
+@pytest.fixture
+def mirror(bus):
+    mirror = MemoryMirror()
+    bus[1].setMemoryMirror(mirror)
+    return mirror
+
+
+def test_zero_ttl_never_hits(bus, mirror):
+    portHandler, packetHandler = bus
+    packetHandler.read2ByteTxRx(1, SMS_STS_PRESENT_POSITION_L)
+    packetHandler.read2ByteTxRx(1, SMS_STS_PRESENT_POSITION_L)
+    assert mirror.getStats()['hits'] == 0
+
+
+def test_hit_returns_last_error(bus, mirror):
+    portHandler, packetHandler = bus
+    portHandler.servos[1].error = ERRBIT_OVERLOAD
+    first = packetHandler.read1ByteTxRx(1, SMS_STS_TORQUE_ENABLE)
+    second = packetHandler.read1ByteTxRx(1, SMS_STS_TORQUE_ENABLE)
+    assert mirror.getStats()['hits'] == 1
+    assert first == second
+    assert second[2] == ERRBIT_OVERLOAD
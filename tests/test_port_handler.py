@@ -0,0 +1,31 @@
+#!/usr/bin/env python
+
+import pytest
+
+from scservo_sdk import *
+
+
+@pytest.mark.parametrize('bus', [{'echo': True}], indirect=True)
+def test_echo_detection_is_opt_in(bus):
+    portHandler, packetHandler = bus
+    assert portHandler.openPort()
+    assert portHandler.echo_mode == ECHO_OFF
+    assert portHandler.echo is False
+
+    portHandler.setEchoMode(ECHO_AUTO)
+    assert portHandler.echo is True
+    assert packetHandler.ReadPos(1)[1] == COMM_SUCCESS
+
+
+@pytest.mark.parametrize('bus', [{'virtual_clock': True}], indirect=True)
+def test_millisecond_timeout_respects_deadline(bus):
+    portHandler, packetHandler = bus
+    previous = portHandler.limitPacketDeadline(portHandler.getDeadline(1.0))
+    try:
+        portHandler.setPacketTimeoutMillis(50)
+        assert portHandler.packet_deadline_bound
+        assert portHandler.packet_timeout_ns <= 1000000
+        portHandler.clock.sleep(2000000)
+        assert portHandler.isPacketTimeout()
+    finally:
+        portHandler.setPacketDeadline(previous)
@@ -0,0 +1,29 @@
+#!/usr/bin/env python
+
+import pytest
+
+from scservo_sdk import *
+from scservo_sdk.read_coalescer import ReadCoalescer
+from conftest import PROTOCOLS
+
+
+@pytest.mark.parametrize('bus', PROTOCOLS, indirect=True)
+def test_field_reads_match_protocol(bus):
+    portHandler, packetHandler = bus
+    servo = portHandler.servos[1]
+    servo.setWord(SMS_STS_PRESENT_POSITION_L, 0x8000 | 1234)
+    servo.setWord(SMS_STS_PRESENT_SPEED_L, 0x8000 | 56)
+    servo.memory[SMS_STS_MOVING] = 1
+    coalescer = ReadCoalescer(packetHandler, window=0)
+
+    assert coalescer.ReadPos(1) == packetHandler.ReadPos(1)
+    assert coalescer.ReadSpeed(1) == packetHandler.ReadSpeed(1)
+    assert coalescer.ReadPosSpeed(1) == packetHandler.ReadPosSpeed(1)
+    assert coalescer.ReadMoving(1) == packetHandler.ReadMoving(1)
+
+
+def test_expired_deadline_is_passed_through(bus):
+    portHandler, packetHandler = bus
+    coalescer = ReadCoalescer(packetHandler, window=0)
+    deadline = portHandler.getCurrentTime() - 1.0
+    assert coalescer.ReadPos(1, deadline)[1] == COMM_DEADLINE_MISS
@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+
+import pytest
+
+from scservo_sdk import *
+from scservo_sdk.fleet_state import FleetState, FLEET_START_ADDRESS, FLEET_DATA_LENGTH
+from scservo_sdk.register_map import getRegisterMap, STATUS_START_ADDRESS, STATUS_DATA_LENGTH
+from conftest import PROTOCOLS
+
+
+def statusRows(register_map):
+    rows = []
+    for index in range(4):
+        data = bytearray(STATUS_DATA_LENGTH)
+        for name, value in (('present_position', 1000 + index), ('present_speed', -20 * index),
+                            ('present_load', -index), ('present_current', 300 + index)):
+            register = register_map[name]
+            if register.sign_bit is None:
+                value = abs(value)
+            offset = register.address - STATUS_START_ADDRESS
+            data[offset:offset + register.length] = bytearray(register_map.encode(name, value))
+        rows.append([index] + list(data))
+    return rows
+
+
+@pytest.mark.parametrize('protocol', ['sms_sts', 'hls', 'scscl'])
+def test_decode_arrays_matches_values(protocol):
+    register_map = getRegisterMap(protocol)
+    decoder = register_map.getDecoder(STATUS_START_ADDRESS, STATUS_DATA_LENGTH)
+    rows = statusRows(register_map)
+    columns = decoder.decodeArrays(rows, 1)
+    for index, data in enumerate(rows):
+        for name, value in zip(decoder.names, decoder.values(data, 1)):
+            assert int(columns[name][index]) == value
+
+
+@pytest.mark.parametrize('protocol', ['sms_sts', 'hls', 'scscl'])
+def test_decode_arrays_numpy(protocol):
+    numpy = pytest.importorskip('numpy')
+    register_map = getRegisterMap(protocol)
+    decoder = register_map.getDecoder(STATUS_START_ADDRESS, STATUS_DATA_LENGTH)
+    rows = statusRows(register_map)
+    columns = decoder.decodeArrays(rows, 1)
+    for name in decoder.names:
+        assert isinstance(columns[name], numpy.ndarray)
+        assert columns[name].tolist() == [decoder.decode(data, 1)[name] for data in rows]
+
+
+@pytest.mark.parametrize('bus', PROTOCOLS, indirect=True)
+def test_fleet_state_uses_protocol_register_map(bus):
+    portHandler, packetHandler = bus
+    servo = portHandler.servos[1]
+    servo.setWord(SMS_STS_PRESENT_POSITION_L, 0x8000 | 1234)
+    servo.setWord(SMS_STS_PRESENT_SPEED_L, 0x8000 | 56)
+    groupSyncRead = GroupSyncRead(packetHandler, FLEET_START_ADDRESS, FLEET_DATA_LENGTH)
+    groupSyncRead.addParam(1)
+    assert groupSyncRead.txRxPacket() == COMM_SUCCESS
+
+    fleet = FleetState()
+    assert fleet.update(groupSyncRead) == 1
+    position, speed, _, _ = packetHandler.ReadPosSpeed(1)
+    view = fleet.get(1)
+    assert (view.position, view.speed) == (position, speed)
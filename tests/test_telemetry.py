@@ -0,0 +1,32 @@
+#!/usr/bin/env python
+
+import pytest
+
+from scservo_sdk import *
+from scservo_sdk.telemetry import TelemetryPoller
+from conftest import PROTOCOLS
+
+
+@pytest.mark.parametrize('bus', PROTOCOLS, indirect=True)
+def test_poll_decodes_protocol_registers(bus):
+    portHandler, packetHandler = bus
+    servo = portHandler.servos[1]
+    servo.setWord(SMS_STS_PRESENT_LOAD_L, (1 << 10) | 100)
+    servo.memory[SMS_STS_PRESENT_VOLTAGE] = 120
+    servo.memory[SMS_STS_PRESENT_TEMPERATURE] = 40
+    servo.setWord(SMS_STS_PRESENT_CURRENT_L, 300)
+    poller = TelemetryPoller(packetHandler, [1])
+
+    assert poller.poll() == (COMM_SUCCESS, [1])
+    values = dict((field, poller.get(1, field)[0]) for field in ('load', 'voltage', 'temperature', 'current'))
+    assert values == {'load': -100, 'voltage': 120, 'temperature': 40, 'current': 300}
+
+
+def test_poll_reads_only_stale_span(bus):
+    portHandler, packetHandler = bus
+    poller = TelemetryPoller(packetHandler, [1], staleness={'voltage': 1e9, 'temperature': 1e9})
+    poller.poll()
+    portHandler.servos[1].memory[SMS_STS_PRESENT_VOLTAGE] = 99
+    poller.cache[1]['load'] = (0, -1e9)
+    poller.poll()
+    assert poller.get(1, 'voltage')[0] != 99
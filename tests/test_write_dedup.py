@@ -0,0 +1,56 @@
+#!/usr/bin/env python
+
+import pytest
+
+from scservo_sdk import *
+from conftest import goalPosition
+
+
+@pytest.fixture
+def dedup(bus):
+    return bus[1].enableWriteDedup(refresh=None)
+
+
+def test_identical_goal_is_skipped(bus, dedup):
+    portHandler, packetHandler = bus
+    packetHandler.WritePosEx(1, 100, 0, 0)
+    packetHandler.WritePosEx(1, 100, 0, 0)
+    assert dedup.skipped_writes == 1
+
+
+def test_tx_only_write_forgets_record(bus, dedup):
+    portHandler, packetHandler = bus
+    packetHandler.WritePosEx(1, 100, 0, 0)
+    packetHandler.write2ByteTxOnly(1, SMS_STS_GOAL_POSITION_L, 300)
+    assert goalPosition(portHandler, 1) == 300
+    packetHandler.WritePosEx(1, 100, 0, 0)
+    assert dedup.skipped_writes == 0
+    assert goalPosition(portHandler, 1) == 100
+
+
+def test_reg_write_forgets_record(bus, dedup):
+    portHandler, packetHandler = bus
+    packetHandler.WritePosEx(1, 100, 0, 0)
+    packetHandler.regWriteTxRx(1, SMS_STS_GOAL_POSITION_L, 2, [44, 1])
+    packetHandler.action(1)
+    packetHandler.WritePosEx(1, 100, 0, 0)
+    assert dedup.skipped_writes == 0
+    assert goalPosition(portHandler, 1) == 100
+
+
+def test_raw_sync_write_forgets_record(bus, dedup):
+    portHandler, packetHandler = bus
+    packetHandler.WritePosEx(1, 100, 0, 0)
+    packetHandler.syncWriteTxOnly(SMS_STS_GOAL_POSITION_L, 2, [1, 44, 1], 3)
+    packetHandler.WritePosEx(1, 100, 0, 0)
+    assert dedup.skipped_writes == 0
+
+
+def test_broadcast_write_forgets_all_servos(bus, dedup):
+    portHandler, packetHandler = bus
+    packetHandler.WritePosEx(1, 100, 0, 0)
+    packetHandler.WritePosEx(2, 100, 0, 0)
+    packetHandler.write2ByteTxOnly(BROADCAST_ID, SMS_STS_GOAL_POSITION_L, 300)
+    packetHandler.WritePosEx(1, 100, 0, 0)
+    packetHandler.WritePosEx(2, 100, 0, 0)
+    assert dedup.skipped_writes == 0
@@ -0,0 +1,65 @@
+#!/usr/bin/env python
+
+import pytest
+
+from scservo_sdk import *
+from scservo_sdk.compiled_cycle import CompiledCycle
+from scservo_sdk.write_planner import WritePlanner
+from conftest import goalPosition
+
+
+@pytest.fixture
+def planner(bus):
+    return WritePlanner(bus[1])
+
+
+def test_identical_write_is_skipped(bus, planner):
+    portHandler, packetHandler = bus
+    planner.write(1, {'goal_position': 100})
+    assert planner.plan(1, {'goal_position': 100}) == []
+
+
+def test_tx_only_write_forgets_record(bus, planner):
+    portHandler, packetHandler = bus
+    planner.write(1, {'goal_position': 100})
+    packetHandler.write2ByteTxOnly(1, SMS_STS_GOAL_POSITION_L, 300)
+    assert goalPosition(portHandler, 1) == 300
+    assert planner.write(1, {'goal_position': 100}) == (COMM_SUCCESS, 0)
+    assert goalPosition(portHandler, 1) == 100
+
+
+def test_direct_write_forgets_record(bus, planner):
+    portHandler, packetHandler = bus
+    planner.write(1, {'goal_position': 100})
+    packetHandler.write2ByteTxRx(1, SMS_STS_GOAL_POSITION_L, 300)
+    planner.write(1, {'goal_position': 100})
+    assert goalPosition(portHandler, 1) == 100
+
+
+def test_group_sync_write_forgets_record(bus, planner):
+    portHandler, packetHandler = bus
+    planner.syncWrite({1: {'goal_position': 100}, 2: {'goal_position': 100}})
+    groupSyncWrite = GroupSyncWrite(packetHandler, SMS_STS_GOAL_POSITION_L, 2)
+    groupSyncWrite.addParam(2, [44, 1])
+    groupSyncWrite.txPacket()
+    assert planner.planSync({1: {'goal_position': 100}, 2: {'goal_position': 100}}) == [
+        (SMS_STS_GOAL_POSITION_L, 2, [(2, [100, 0])])]
+
+
+def test_compiled_cycle_forgets_record(bus, planner):
+    portHandler, packetHandler = bus
+    planner.write(1, {'goal_position': 100})
+    cycle = CompiledCycle(packetHandler, [1], SMS_STS_GOAL_POSITION_L, 2)
+    cycle.setWord(1, SMS_STS_GOAL_POSITION_L, 300)
+    assert cycle.run() == COMM_SUCCESS
+    assert goalPosition(portHandler, 1) == 300
+    planner.write(1, {'goal_position': 100})
+    assert goalPosition(portHandler, 1) == 100
+
+
+def test_broadcast_reset_forgets_all_servos(bus, planner):
+    portHandler, packetHandler = bus
+    planner.syncWrite({1: {'goal_position': 100}, 2: {'goal_position': 100}})
+    packetHandler.invalidateCaches(BROADCAST_ID, 0, 256)
+    assert len(planner.plan(1, {'goal_position': 100})) == 1
+    assert len(planner.plan(2, {'goal_position': 100})) == 1